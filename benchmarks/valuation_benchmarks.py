@@ -0,0 +1,351 @@
+"""Benchmarks of the valuation hot paths on synthetic universes (1 to 10,000 tickers).
+
+Every benchmark runs one function over all tickers of a universe (Morningstar-shaped datasets and daily price
+histories, see 'SyntheticUniverse') and records its wall time (time.perf_counter, best/ median of several repeats)
+and peak memory (tracemalloc, separate run). Results are saved as JSON per git commit, so runs of different commits
+can be compared. The universe only uses numpy/ pandas and the batch benchmarks are only registered if their functions
+exist, so the suite also runs on older commits. Run from the repository root:
+
+    python -m benchmarks.valuation_benchmarks --sizes 1 10 100 1000 10000
+    python -m benchmarks.valuation_benchmarks --compare <commit> [<commit>]
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+from src.beta.beta_estimator import BetaEstimator
+from src.evaluation.evaluator import Evaluator
+from src.intrinsic_value.growth_rate_calculator import GrowthRateCalculator
+from src.intrinsic_value.intrinsic_value_estimator import IntrinsicValueEstimator
+from src.utils.assessment_period import AssessmentPeriod
+from src.utils.calculation_utils import CalculationUtils
+from src.utils.data_frequency import DataFrequency
+from src.utils.database_utils import DatabaseUtils
+
+try:
+    from src.utils.fundamentals_panel import FundamentalsPanel
+except ImportError:
+    FundamentalsPanel = None
+
+class SyntheticUniverse:
+    """Synthetic universe of 'number_of_tickers' companies: one dataset per ticker (metrics x years with string years
+    like 'MorningstarScraper.combine_morningstar_data', with and without the estimated historical values) and aligned
+    daily price histories (geometric Brownian motion, column 'Adj Close') of every ticker and one benchmark."""
+
+    # Metrics added by 'DatabaseUtils.add_estimated_historical_values_to_dataset':
+    ESTIMATED_METRICS = ['capex_mil', 'shares_mil', 'equity_ratio_pct']
+    # Base values (latest year) and growth rates (%) of the metrics calculated by
+    # 'DatabaseUtils.add_calculated_historical_values_to_dataset':
+    BASE_VALUES = {'revenue': (5000.0, 2000.0), 'operating_income': (900.0, 400.0), 'net_income': (600.0, 300.0),
+                   'eps': (4.0, 2.0), 'operating_cash_flow': (1000.0, 400.0), 'free_cash_flow': (700.0, 300.0)}
+    # Mean & standard deviation of the remaining metrics:
+    METRIC_DISTRIBUTIONS = {'dividends': (1.5, 0.5), 'bvps': (25.0, 8.0), 'payout_ratio': (40.0, 20.0),
+                            'interest_coverage_ratio': (12.0, 6.0), 'operating_margin_pct': (18.0, 6.0),
+                            'net_margin_pct': (12.0, 6.0), 'gross_margin_pct': (40.0, 8.0),
+                            'return_on_equity_pct': (16.0, 8.0), 'return_on_assets_pct': (8.0, 4.0),
+                            'return_on_invested_capital_pct': (12.0, 6.0), 'free_cash_flow_to_revenue': (10.0, 5.0),
+                            'current_ratio': (1.8, 0.6), 'debt_to_equity_ratio': (0.8, 0.4),
+                            'capex_as_pct_of_sales': (5.0, 2.0), 'free_cash_flow_to_shares': (5.0, 2.0)}
+
+    def __init__(self, number_of_tickers, number_of_days=757, number_of_years=10, seed=0):
+        random_generator = np.random.default_rng(seed)
+        self.tickers = ['T{:05d}'.format(number) for number in range(number_of_tickers)]
+        self.years = [str(year) for year in range(2023 - number_of_years + 1, 2024)]
+
+        # Fundamentals (one dataset per ticker):
+        self.datasets = [SyntheticUniverse.generate_dataset(random_generator, self.years) for ticker in self.tickers]
+        self.transposed_datasets = [dataset.T for dataset in self.datasets]
+        self.datasets_without_estimates = [dataset.drop(SyntheticUniverse.ESTIMATED_METRICS)
+                                           for dataset in self.datasets]
+
+        # Prices (all tickers share the benchmark's trading days):
+        dates = pd.bdate_range(end='2024-12-31', periods=number_of_days, name='Date')
+        self.benchmark_prices = SyntheticUniverse.generate_prices(random_generator, dates)
+        self.stock_prices = [SyntheticUniverse.generate_prices(random_generator, dates) for ticker in self.tickers]
+        self.price_matrix = np.column_stack([prices['Adj Close'].to_numpy() for prices in self.stock_prices])
+
+    @staticmethod
+    def generate_dataset(random_generator, years):
+        """Function to generate one company's dataset (metrics x years) incl. growth rates, the historical values
+        calculated from them and the estimated historical values."""
+        rows = {}
+        for key, (mean, std) in SyntheticUniverse.BASE_VALUES.items():
+            growth_rates = np.round(random_generator.normal(6.0, 12.0, len(years)), 3)
+            base_value = abs(random_generator.normal(mean, std))
+            rows[key + '_growth'] = growth_rates
+            # Historical values via growth rates (like 'DatabaseUtils.calculate_historical_values_via_growth_rates'):
+            growth_factors = np.cumprod(1 + growth_rates[:0:-1] / 100.0)
+            rows[key + '_mil' if key != 'eps' else key] = base_value / np.concatenate([growth_factors[::-1], [1.0]])
+        for metric, (mean, std) in SyntheticUniverse.METRIC_DISTRIBUTIONS.items():
+            rows[metric] = np.round(random_generator.normal(mean, std, len(years)), 3)
+        dataset = pd.DataFrame.from_dict(rows, orient='index', columns=years)
+
+        return DatabaseUtils.add_estimated_historical_values_to_dataset(dataset)
+
+    @staticmethod
+    def generate_prices(random_generator, dates, start_price=50.0, annual_drift=0.06, annual_volatility=0.25):
+        """Function to generate a daily price history in the layout of 'YahooFinanceScraper.scrape_price_data'."""
+        daily_returns = random_generator.normal(annual_drift / 252, annual_volatility / np.sqrt(252), len(dates))
+        return pd.DataFrame({'Adj Close': start_price * np.exp(np.cumsum(daily_returns))}, index=dates)
+
+    def create_panel(self, derived=True):
+        """Function to create a 'FundamentalsPanel' of all datasets. Without 'derived', the panel contains no
+        calculated/ estimated historical values and is returned with its base values (input of
+        'DatabaseUtils.derive_panel_values')."""
+        ticker_to_dataset = dict(zip(self.tickers, self.datasets))
+        if derived:
+            return FundamentalsPanel.from_datasets(ticker_to_dataset)
+
+        derived_metrics = [key + '_mil' if key != 'eps' else key for key in SyntheticUniverse.BASE_VALUES]
+        base_values = pd.DataFrame([dataset.loc[derived_metrics].iloc[:, -1].to_numpy() for dataset in self.datasets],
+                                   index=self.tickers, columns=list(SyntheticUniverse.BASE_VALUES))
+        metrics = [metric for metric in self.datasets[0].index
+                   if metric not in derived_metrics + SyntheticUniverse.ESTIMATED_METRICS]
+        return FundamentalsPanel.from_datasets(ticker_to_dataset, metrics=metrics), base_values
+
+
+class BenchmarkSuite:
+    """Registry & runner of the benchmarks. A benchmark maps a 'SyntheticUniverse' to a workload (function without
+    arguments processing all tickers); only the workload is measured, not the preparation of its inputs."""
+
+    RESULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+    DEFAULT_SIZES = [1, 10, 100, 1000]
+
+    # Settings of the workloads:
+    BETA_PERIOD = AssessmentPeriod.THREE_YEARS
+    DISCOUNT_RATES = [0.08, 0.09, 0.10]
+
+    def __init__(self, sizes=None, repeats=3, seed=0, benchmark_names=None):
+        self.sizes = BenchmarkSuite.DEFAULT_SIZES if sizes is None else sizes
+        self.repeats = repeats
+        self.seed = seed
+        self.benchmarks = BenchmarkSuite.define_benchmarks()
+        if benchmark_names is not None:
+            unknown_names = [name for name in benchmark_names if name not in self.benchmarks]
+            if unknown_names:
+                raise ValueError(f"Unknown benchmarks {unknown_names}. Available: {list(self.benchmarks)}")
+            self.benchmarks = {name: self.benchmarks[name] for name in benchmark_names}
+
+    @staticmethod
+    def define_benchmarks():
+        """Function to define all benchmarks (name -> function creating the workload of a universe). Per-ticker
+        functions first, followed by their batch variants (suffix '_panel'/ 'estimate_betas')."""
+
+        def median_cagr(universe):
+            series = [dataset.loc['revenue_mil'] for dataset in universe.datasets]
+            return lambda: [GrowthRateCalculator.calculate_median_cagr(s, AssessmentPeriod.TEN_YEARS) for s in series]
+
+        def median_growth_rates(universe):
+            return lambda: [CalculationUtils.calculate_median_growth_rates(dataset)
+                            for dataset in universe.transposed_datasets]
+
+        def beta(universe):
+            return lambda: [BetaEstimator.estimate_beta(prices, universe.benchmark_prices, BenchmarkSuite.BETA_PERIOD,
+                                                        DataFrequency.DAILY) for prices in universe.stock_prices]
+
+        def discounted_cash_flow_model(universe):
+            inputs = [(dataset.loc['free_cash_flow_mil'], dataset.loc['shares_mil'].iloc[-1])
+                      for dataset in universe.datasets]
+            return lambda: [IntrinsicValueEstimator.apply_discounted_cash_flow_model(
+                free_cash_flows, shares, 0.05, BenchmarkSuite.DISCOUNT_RATES, 0.02, 10)
+                for free_cash_flows, shares in inputs]
+
+        def estimated_historical_values(universe):
+            return lambda: [DatabaseUtils.add_estimated_historical_values_to_dataset(dataset)
+                            for dataset in universe.datasets_without_estimates]
+
+        def assess_metrics(universe):
+            return lambda: [Evaluator.assess_metrics(dataset) for dataset in universe.transposed_datasets]
+
+        benchmarks = {'growth_rate_calculator.calculate_median_cagr': median_cagr,
+                      'calculation_utils.calculate_median_growth_rates': median_growth_rates,
+                      'beta_estimator.estimate_beta': beta,
+                      'intrinsic_value_estimator.apply_discounted_cash_flow_model': discounted_cash_flow_model,
+                      'database_utils.add_estimated_historical_values_to_dataset': estimated_historical_values,
+                      'evaluator.assess_metrics': assess_metrics}
+
+        # Batch variants (only on commits that provide them):
+        if hasattr(BetaEstimator, 'estimate_betas'):
+            def betas(universe):
+                benchmark_prices = universe.benchmark_prices['Adj Close'].to_numpy()
+                return lambda: BetaEstimator.estimate_betas(universe.price_matrix, benchmark_prices,
+                                                            BenchmarkSuite.BETA_PERIOD, DataFrequency.DAILY)
+
+            benchmarks['beta_estimator.estimate_betas'] = betas
+
+        if FundamentalsPanel is not None:
+            def median_growth_rates_panel(universe):
+                panel = universe.create_panel()
+                return lambda: CalculationUtils.calculate_median_growth_rates_panel(panel)
+
+            def derive_panel_values(universe):
+                panel, base_values = universe.create_panel(derived=False)
+                return lambda: DatabaseUtils.derive_panel_values(panel, base_values)
+
+            def assess_metrics_panel(universe):
+                panel = universe.create_panel()
+                return lambda: Evaluator.assess_metrics_panel(panel)
+
+            panel_benchmarks = {'calculation_utils.calculate_median_growth_rates_panel':
+                                    (CalculationUtils, median_growth_rates_panel),
+                                'database_utils.derive_panel_values': (DatabaseUtils, derive_panel_values),
+                                'evaluator.assess_metrics_panel': (Evaluator, assess_metrics_panel)}
+            benchmarks.update({name: create_workload for name, (owner, create_workload) in panel_benchmarks.items()
+                               if hasattr(owner, name.split('.')[1])})
+
+        return benchmarks
+
+    @staticmethod
+    def measure(workload, repeats):
+        """Function to measure a workload: wall times of 'repeats' runs and the peak memory (bytes allocated on top
+        of the memory in use before, via tracemalloc) of one additional run."""
+        seconds = []
+        for repeat in range(repeats):
+            start_time = time.perf_counter()
+            workload()
+            seconds.append(time.perf_counter() - start_time)
+
+        # Separate run, since tracing slows down allocations:
+        tracemalloc.start()
+        try:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+            workload()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return seconds, peak - baseline
+
+    def run(self):
+        """Function to run all benchmarks for all universe sizes. Returns the list of result dictionaries."""
+        results = []
+        for size in self.sizes:
+            universe = SyntheticUniverse(size, seed=self.seed)
+
+            for name, create_workload in self.benchmarks.items():
+                seconds, peak_memory = BenchmarkSuite.measure(create_workload(universe), self.repeats)
+                result = {'benchmark': name, 'tickers': size, 'repeats': self.repeats,
+                          'min_seconds': min(seconds), 'median_seconds': statistics.median(seconds),
+                          'microseconds_per_ticker': min(seconds) / size * 1e6, 'peak_memory_bytes': peak_memory}
+                results.append(result)
+                print(f"{name:<60} {size:>6} tickers: {result['min_seconds']:>10.4f}s "
+                      f"({result['microseconds_per_ticker']:>10.1f}us/ ticker), peak {peak_memory / 2 ** 20:>9.2f} MiB")
+
+        return results
+
+    @staticmethod
+    def describe_environment():
+        """Function to describe the commit (short hash, '-dirty' for uncommitted changes) and the environment."""
+        repository = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+        def git(*arguments):
+            try:
+                return subprocess.run(['git', *arguments], cwd=repository, capture_output=True, text=True,
+                                      check=True).stdout.strip()
+            except (OSError, subprocess.CalledProcessError):
+                return None
+
+        commit = git('rev-parse', '--short', 'HEAD') or 'unknown'
+        # Ignore untracked files (e.g. earlier results), only modified tracked files make a run 'dirty':
+        if git('status', '--porcelain', '--untracked-files=no'):
+            commit += '-dirty'
+
+        return {'commit': commit, 'created': datetime.datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(), 'numpy': np.__version__, 'pandas': pd.__version__,
+                'machine': platform.platform()}
+
+    def save(self, results, path=None):
+        """Function to save results (incl. commit & environment) as JSON. Default path: 'results/<commit>.json'.
+        Returns the path."""
+        report = dict(BenchmarkSuite.describe_environment(), seed=self.seed, results=results)
+        if path is None:
+            os.makedirs(BenchmarkSuite.RESULT_DIRECTORY, exist_ok=True)
+            path = os.path.join(BenchmarkSuite.RESULT_DIRECTORY, report['commit'] + '.json')
+
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        return path
+
+    @staticmethod
+    def load(reference):
+        """Function to load a report via its path or (the prefix of) its commit in the result directory."""
+        if os.path.isfile(reference):
+            path = reference
+        else:
+            paths = sorted(glob.glob(os.path.join(BenchmarkSuite.RESULT_DIRECTORY, reference + '*.json')))
+            if len(paths) != 1:
+                raise ValueError(f"Expected one report for '{reference}', found {len(paths)}.")
+            path = paths[0]
+
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    @staticmethod
+    def compare(base_report, new_report):
+        """Function to compare two reports. Returns a dataframe indexed by (benchmark, tickers) with the best wall
+        times and peak memory of both reports and their ratios (new/ base; < 1 means faster/ smaller)."""
+        def to_frame(report):
+            return pd.DataFrame(report['results']).set_index(['benchmark', 'tickers'])[
+                ['min_seconds', 'peak_memory_bytes']]
+
+        comparison = to_frame(base_report).join(to_frame(new_report), how='inner', lsuffix='_base', rsuffix='_new')
+        comparison['time_ratio'] = comparison['min_seconds_new'] / comparison['min_seconds_base']
+        comparison['memory_ratio'] = comparison['peak_memory_bytes_new'] / comparison['peak_memory_bytes_base']
+        return comparison
+
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description='Benchmark the valuation hot paths on synthetic universes.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BenchmarkSuite.DEFAULT_SIZES,
+                        help='Numbers of tickers of the universes.')
+    parser.add_argument('--repeats', type=int, default=3, help='Timed runs per benchmark and size.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--benchmarks', nargs='+', help='Names of the benchmarks to run (default: all).')
+    parser.add_argument('--output', help='Result file (default: results/<commit>.json).')
+    parser.add_argument('--compare', nargs='+', metavar='REPORT',
+                        help='Compare two reports (paths or commits), or one report with the current run.')
+    parser.add_argument('--list', action='store_true', help='List all benchmarks.')
+    arguments = parser.parse_args(arguments)
+
+    if arguments.compare is not None and len(arguments.compare) > 2:
+        parser.error(f'--compare takes one or two reports, got {len(arguments.compare)}.')
+    return arguments
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    if arguments.list:
+        print('\n'.join(BenchmarkSuite.define_benchmarks()))
+        return
+
+    reports = [] if arguments.compare is None else [BenchmarkSuite.load(r) for r in arguments.compare]
+    if len(reports) < 2:
+        suite = BenchmarkSuite(arguments.sizes, arguments.repeats, arguments.seed, arguments.benchmarks)
+        results = suite.run()
+        path = suite.save(results, arguments.output)
+        print(f'Results: {path}')
+        reports.append(BenchmarkSuite.load(path))
+
+    if arguments.compare is not None:
+        base_report, new_report = reports
+        comparison = BenchmarkSuite.compare(base_report, new_report)
+        print(f"{base_report['commit']} -> {new_report['commit']}:")
+        if comparison.empty:
+            print('No common benchmarks/ sizes.')
+            return
+        with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_columns', None,
+                               'display.float_format', '{:.4g}'.format):
+            print(comparison[['min_seconds_base', 'min_seconds_new', 'time_ratio', 'memory_ratio']])
+
+if __name__ == "__main__":
+    main()
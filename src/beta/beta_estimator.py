@@ -1,18 +1,22 @@
+import warnings
 import pandas as pd
 import numpy as np
 from src.utils.calculation_utils import CalculationUtils
+from src.utils.assessment_period import AssessmentPeriod
 
 class BetaEstimator:
     def __init__(self):
         raise NotImplementedError("This class should not be instantiated.")
 
     @staticmethod
-    def estimate_beta(stock_prices, benchmark_prices, period, data_frequency):
+    def estimate_beta(stock_prices, benchmark_prices, period, data_frequency, quiet=False):
         """Function to estimate a beta factor based on stock and benchmark price data,
-        The calculation can be done for different timeframes, e.g. 1-year beta factor."""
+        The calculation can be done for different timeframes, e.g. 1-year beta factor.
+        With 'quiet' nothing is printed."""
 
         if data_frequency.value not in ["daily", "monthly"]:
-            print("Invalid data frequency.")
+            if not quiet:
+                print("Invalid data frequency.")
             return np.nan
 
         # Determine required datapoints:
@@ -20,7 +24,8 @@ class BetaEstimator:
 
         # Create subsets of stock/ benchmark data:
         if data_points_required > len(stock_prices) or data_points_required > len(benchmark_prices):
-            print("Not enough data points!")
+            if not quiet:
+                print("Not enough data points!")
             return np.nan
         else:
             stock_subset = stock_prices.iloc[-data_points_required:]
@@ -62,4 +67,132 @@ class BetaEstimator:
         # Calculate cumulative returns
         return_data['Cumulative_Returns'] = (1 + return_data['Returns']).cumprod()
 
-        return return_data
\ No newline at end of file
+        return return_data
+
+    @staticmethod
+    def estimate_betas(stock_prices, benchmark_prices, period, data_frequency):
+        """Vectorized variant of 'estimate_beta' for many stocks at once. 'stock_prices' is a matrix of aligned
+        prices (observations x stocks; DataFrame or array), 'benchmark_prices' the benchmark's prices (Series, array
+        or DataFrame with column 'Adj Close'). Benchmark statistics are computed only once.
+        Returns one beta per stock (Series for DataFrame input, array otherwise)."""
+
+        if data_frequency.value not in ["daily", "monthly"]:
+            print("Invalid data frequency.")
+            return np.nan
+
+        stock_matrix = BetaEstimator.convert_to_price_matrix(stock_prices)
+        benchmark_vector = BetaEstimator.convert_to_price_matrix(benchmark_prices)[:, 0]
+
+        # Determine required datapoints:
+        data_points_required = BetaEstimator.determine_required_datapoints(period, data_frequency)
+
+        if data_points_required > len(stock_matrix) or data_points_required > len(benchmark_vector):
+            print("Not enough data points!")
+            return np.nan
+
+        stock_subset = stock_matrix[-data_points_required:]
+        benchmark_subset = benchmark_vector[-data_points_required:]
+
+        # Cumulative returns relative to the first observation (as in 'calculate_cumulative_returns'):
+        stock_cumulative_returns = stock_subset[1:] / stock_subset[0]
+        benchmark_cumulative_returns = benchmark_subset[1:] / benchmark_subset[0]
+
+        # Covariances of all stocks with the benchmark & variance of the benchmark:
+        benchmark_deviations = benchmark_cumulative_returns - benchmark_cumulative_returns.mean()
+        stock_deviations = stock_cumulative_returns - stock_cumulative_returns.mean(axis=0)
+        covariances = benchmark_deviations @ stock_deviations
+        benchmark_variance = benchmark_deviations @ benchmark_deviations
+
+        betas = covariances / benchmark_variance
+
+        if isinstance(stock_prices, pd.DataFrame):
+            return pd.Series(betas, index=stock_prices.columns, name='beta')
+        return betas
+
+    @staticmethod
+    def estimate_rolling_betas(stock_prices, benchmark_prices, data_frequency, periods=None):
+        """Function to estimate rolling betas of many stocks (see 'estimate_betas') for every observation and every
+        window length ('determine_required_datapoints' of each period; default: all assessment periods).
+        Window sums are updated via prefix sums, hence every window costs O(1) per stock instead of a full
+        covariance computation. Returns a dictionary mapping each period to an array (observations x stocks) or a
+        DataFrame for DataFrame input; entries without enough preceding observations are NaN."""
+
+        if data_frequency.value not in ["daily", "monthly"]:
+            print("Invalid data frequency.")
+            return np.nan
+
+        if periods is None:
+            periods = [p for p in AssessmentPeriod]
+
+        stock_matrix = BetaEstimator.convert_to_price_matrix(stock_prices)
+        benchmark_vector = BetaEstimator.convert_to_price_matrix(benchmark_prices)[:, 0]
+        number_of_observations = min(len(stock_matrix), len(benchmark_vector))
+        stock_matrix = stock_matrix[-number_of_observations:]
+        benchmark_vector = benchmark_vector[-number_of_observations:]
+
+        # Center prices (covariances are shift invariant) to keep the prefix sums numerically stable:
+        with warnings.catch_warnings():
+            # All-NaN columns stay NaN anyway:
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            stock_centered = stock_matrix - np.nanmean(stock_matrix, axis=0)
+            benchmark_centered = benchmark_vector - np.nanmean(benchmark_vector)
+
+        # Missing prices (e.g. before an IPO) enter the prefix sums as 0 and are counted separately, so only windows
+        # containing a missing price are NaN:
+        valid = ~np.isnan(stock_centered) & ~np.isnan(benchmark_centered)[:, np.newaxis]
+        stock_centered = np.where(valid, stock_centered, 0.0)
+        benchmark_centered = np.where(np.isnan(benchmark_centered), 0.0, benchmark_centered)
+
+        def prefix_sum(values):
+            return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)], axis=0)
+
+        stock_sums = prefix_sum(stock_centered)
+        benchmark_sums = prefix_sum(benchmark_centered)
+        cross_sums = prefix_sum(stock_centered * benchmark_centered[:, np.newaxis])
+        benchmark_square_sums = prefix_sum(benchmark_centered ** 2)
+        missing_counts = prefix_sum((~valid).astype('float64'))
+
+        rolling_betas = {}
+
+        for period in periods:
+            data_points_required = BetaEstimator.determine_required_datapoints(period, data_frequency)
+            betas = np.full(stock_matrix.shape, np.nan)
+
+            if data_points_required <= number_of_observations:
+                # Window ending at observation 'end': first observation is the base of the cumulative returns,
+                # covariances are computed over the remaining observations (first + 1, ..., end):
+                ends = np.arange(data_points_required - 1, number_of_observations)
+                firsts = ends - data_points_required + 1
+                count = data_points_required - 1
+
+                def window_sum(sums):
+                    return sums[ends + 1] - sums[firsts + 1]
+
+                stock_window = window_sum(stock_sums)
+                benchmark_window = window_sum(benchmark_sums)
+                covariances = window_sum(cross_sums) - stock_window * benchmark_window[:, np.newaxis] / count
+                benchmark_variances = window_sum(benchmark_square_sums) - benchmark_window ** 2 / count
+
+                # Cumulative returns divide prices by the window's first price (NaN, if it is missing):
+                price_ratios = benchmark_vector[firsts][:, np.newaxis] / stock_matrix[firsts]
+                window_betas = price_ratios * covariances / benchmark_variances[:, np.newaxis]
+                betas[ends] = np.where(window_sum(missing_counts) > 0, np.nan, window_betas)
+
+            if isinstance(stock_prices, pd.DataFrame):
+                betas = pd.DataFrame(betas, index=stock_prices.index[-number_of_observations:],
+                                     columns=stock_prices.columns)
+            rolling_betas[period] = betas
+
+        return rolling_betas
+
+    @staticmethod
+    def convert_to_price_matrix(price_data):
+        """Function to convert price data (DataFrame with column 'Adj Close', DataFrame with one column per stock,
+        Series or array) to a float64 matrix (observations x stocks)."""
+        if isinstance(price_data, pd.DataFrame) and 'Adj Close' in price_data.columns:
+            price_data = price_data['Adj Close']
+
+        price_matrix = np.asarray(price_data, dtype='float64')
+        if price_matrix.ndim == 1:
+            price_matrix = price_matrix[:, np.newaxis]
+        return price_matrix
@@ -1,29 +1,36 @@
+import io
 import pandas as pd
 import ssl
 import time
+import urllib.request
 
 class DamodaranScraper:
+    # Table 'Ratings, Spreads and Interest Coverage Ratios'
+    SPREAD_URL = 'https://pages.stern.nyu.edu/~adamodar/pc/ratings.xls'
+    # Table 'Risk Premiums for Other Markets'
+    RISK_PREMIUMS_URL = 'https://pages.stern.nyu.edu/~adamodar/pc/datasets/ctryprem.xlsx'
+
     def __init__(self):
         raise NotImplementedError("This class should not be instantiated.")
 
+    @staticmethod
+    def download_file(url):
+        """Function to download a file. Certificate verification is disabled for this request only (to avoid the
+        SSL certification error of the NYU Stern pages) instead of patching the default HTTPS context globally."""
+        with urllib.request.urlopen(url, context=ssl._create_unverified_context()) as response:
+            return io.BytesIO(response.read())
+
     @staticmethod
     def scrape_data():
         """Function to get data from http://pages.stern.nyu.edu/~adamodar/"""
 
-        # Prerequisites to avoid SSL certification error
-        ssl._create_default_https_context = ssl._create_unverified_context
-
-        # Define URLs to retrieve data from:
-        # Table 'Ratings, Spreads and Interest Coverage Ratios'
-        spread_url = 'https://pages.stern.nyu.edu/~adamodar/pc/ratings.xls'
-        # Table 'Risk Premiums for Other Markets'
-        risk_premiums_url = 'https://pages.stern.nyu.edu/~adamodar/pc/datasets/ctryprem.xlsx'
-
         # Get data. Pause between both tables to avoid excessive webscraping:
-        spread_table = pd.read_excel(spread_url, sheet_name=0, skiprows=17, header=0, nrows=15, usecols='A:D,F:I')
+        spread_table = pd.read_excel(DamodaranScraper.download_file(DamodaranScraper.SPREAD_URL), sheet_name=0,
+                                     skiprows=17, header=0, nrows=15, usecols='A:D,F:I')
         time.sleep(5.0)
-        risk_premiums = pd.read_excel(risk_premiums_url, sheet_name='Regional Simple Averages', skiprows=3, header=0,
-                                      nrows=9, usecols='A,C')
+        risk_premiums = pd.read_excel(DamodaranScraper.download_file(DamodaranScraper.RISK_PREMIUMS_URL),
+                                      sheet_name='Regional Simple Averages', skiprows=3, header=0, nrows=9,
+                                      usecols='A,C')
 
         return spread_table, risk_premiums
 
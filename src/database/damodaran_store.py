@@ -0,0 +1,119 @@
+import datetime
+import os
+import threading
+import pandas as pd
+
+from src.database.damodaran_scraper import DamodaranScraper
+from src.utils.excel_importer import ExcelImporter
+
+class DamodaranStore:
+    """Local store for dated snapshots ('vintages') of the parsed Damodaran tables 'spread_nonfinancials',
+    'spread_financials' and 'risk_premiums'. Every vintage is parsed/ scraped once; loaded snapshots are memoized
+    in-process, so a batch run reads each vintage from disk at most once."""
+
+    TABLE_NAMES = ['spread_nonfinancials', 'spread_financials', 'risk_premiums']
+
+    # In-process memo shared by all store instances: (store directory, vintage) -> tuple of tables
+    _memo = {}
+    _memo_lock = threading.Lock()
+
+    def __init__(self, store_directory):
+        self.store_directory = os.path.abspath(store_directory)
+        os.makedirs(self.store_directory, exist_ok=True)
+
+    @staticmethod
+    def is_vintage(name):
+        """Function to check whether a name is a valid vintage, i.e. an ISO date like '2024-01-05'."""
+        try:
+            return datetime.date.fromisoformat(name).isoformat() == name
+        except (TypeError, ValueError):
+            return False
+
+    def vintages(self):
+        """Function to list all stored vintages (ISO dates), oldest first. Other directories are ignored."""
+        vintages = []
+        for name in os.listdir(self.store_directory):
+            path = os.path.join(self.store_directory, name)
+            if not DamodaranStore.is_vintage(name):
+                continue
+            if os.path.isdir(path) and all(os.path.exists(os.path.join(path, table_name + '.pkl'))
+                                           for table_name in DamodaranStore.TABLE_NAMES):
+                vintages.append(name)
+        return sorted(vintages)
+
+    def latest_vintage(self):
+        vintages = self.vintages()
+        return vintages[-1] if vintages else None
+
+    def save_snapshot(self, spread_nonfinancials, spread_financials, risk_premiums, vintage=None):
+        """Function to store the parsed tables as a new vintage (ISO date, default: today's date). Returns the
+        vintage."""
+        if vintage is None:
+            vintage = datetime.date.today().isoformat()
+        if not DamodaranStore.is_vintage(vintage):
+            raise ValueError(f"Invalid vintage '{vintage}' (expected an ISO date like '2024-01-05').")
+
+        snapshot_directory = os.path.join(self.store_directory, vintage)
+        os.makedirs(snapshot_directory, exist_ok=True)
+
+        tables = (spread_nonfinancials, spread_financials, risk_premiums)
+        for table_name, table in zip(DamodaranStore.TABLE_NAMES, tables):
+            table.to_pickle(os.path.join(snapshot_directory, table_name + '.pkl'))
+
+        with DamodaranStore._memo_lock:
+            DamodaranStore._memo[(self.store_directory, vintage)] = tuple(table.copy() for table in tables)
+
+        return vintage
+
+    def load_snapshot(self, vintage=None):
+        """Function to load the tables of a vintage (default: latest vintage). Returns a tuple of copies
+        (spread_nonfinancials, spread_financials, risk_premiums) or None, if the vintage does not exist."""
+        if vintage is None:
+            vintage = self.latest_vintage()
+            if vintage is None:
+                return None
+
+        key = (self.store_directory, vintage)
+        with DamodaranStore._memo_lock:
+            tables = DamodaranStore._memo.get(key)
+
+        if tables is None:
+            snapshot_directory = os.path.join(self.store_directory, vintage)
+            if not os.path.isdir(snapshot_directory):
+                print(f"Damodaran snapshot '{vintage}' does not exist. Return None.")
+                return None
+
+            tables = tuple(pd.read_pickle(os.path.join(snapshot_directory, table_name + '.pkl'))
+                           for table_name in DamodaranStore.TABLE_NAMES)
+            with DamodaranStore._memo_lock:
+                DamodaranStore._memo[key] = tables
+
+        # Return copies, so callers cannot alter the memoized tables:
+        return tuple(table.copy() for table in tables)
+
+    def get_tables(self, vintage=None, max_age_days=None):
+        """Function to get the tables of a vintage. If no vintage is requested, the latest one is used; if there is
+        none (or it is older than 'max_age_days'), the tables are scraped once and stored as today's vintage."""
+        if vintage is not None:
+            return self.load_snapshot(vintage)
+
+        latest_vintage = self.latest_vintage()
+        if latest_vintage is not None and (max_age_days is None or (
+                datetime.date.today() - datetime.date.fromisoformat(latest_vintage)).days <= max_age_days):
+            return self.load_snapshot(latest_vintage)
+
+        spread_table, risk_premiums = DamodaranScraper.scrape_data()
+        tables = DamodaranScraper.modify_damodaran_data(spread_table, risk_premiums)
+        return self.load_snapshot(self.save_snapshot(*tables))
+
+    def import_excel_snapshot(self, spread_file_name, risk_premiums_file_name, vintage=None):
+        """Function to store tables from local Damodaran Excel files (see 'ExcelImporter') as a vintage."""
+        spread_table = ExcelImporter.import_spread_tables_excel(spread_file_name)
+        risk_premiums = ExcelImporter.import_risk_premiums_excel(risk_premiums_file_name)
+        tables = DamodaranScraper.modify_damodaran_data(spread_table, risk_premiums)
+        return self.save_snapshot(*tables, vintage=vintage)
+
+    @staticmethod
+    def clear_memo():
+        with DamodaranStore._memo_lock:
+            DamodaranStore._memo.clear()
@@ -0,0 +1,128 @@
+import json
+import os
+import tempfile
+import uuid
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.utils.fundamentals_panel import FundamentalsPanel
+
+class FundamentalsStore:
+    """Local columnar (Parquet) store for the ticker x metric x fiscal-year panel. Every fiscal year lives in its own
+    directory and every append writes new files only, so history is never rewritten. Files hold one row per
+    (ticker, fiscal year) and one column per metric, hence metric subsets can be loaded without reading the rest."""
+
+    MANIFEST_FILE_NAME = 'manifest.json'
+
+    def __init__(self, store_directory):
+        self.store_directory = store_directory
+        os.makedirs(store_directory, exist_ok=True)
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self):
+        path = os.path.join(self.store_directory, FundamentalsStore.MANIFEST_FILE_NAME)
+        if not os.path.exists(path):
+            return {'tickers': {}, 'metrics': []}
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save_manifest(self):
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.store_directory, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            json.dump(self._manifest, file)
+        os.replace(temporary_path, os.path.join(self.store_directory, FundamentalsStore.MANIFEST_FILE_NAME))
+
+    def _year_directory(self, year):
+        return os.path.join(self.store_directory, 'fiscal_year={}'.format(int(year)))
+
+    def tickers(self):
+        return list(self._manifest['tickers'].keys())
+
+    def metrics(self):
+        return list(self._manifest['metrics'])
+
+    def years(self, ticker=None):
+        if ticker is not None:
+            return sorted(self._manifest['tickers'].get(ticker, []))
+        return sorted(set(year for years in self._manifest['tickers'].values() for year in years))
+
+    def append(self, panel):
+        """Function to append a 'FundamentalsPanel' (or a dictionary mapping tickers to datasets in the project's
+        metrics x years layout). Only (ticker, fiscal year) combinations not stored yet are written: one new file
+        per fiscal year. Returns the number of written rows."""
+        if not isinstance(panel, FundamentalsPanel):
+            panel = FundamentalsPanel.from_datasets(panel)
+
+        written_rows = 0
+
+        for year_position, year in enumerate(panel.years):
+            # Select tickers for which the fiscal year is new and which have at least one value:
+            ticker_positions = [position for position, ticker in enumerate(panel.tickers)
+                                if year not in self._manifest['tickers'].get(ticker, [])
+                                and not np.isnan(panel.values[position, :, year_position]).all()]
+            if not ticker_positions:
+                continue
+
+            columns = {'ticker': pa.array([panel.tickers[position] for position in ticker_positions], pa.string()),
+                       'fiscal_year': pa.array(np.full(len(ticker_positions), year, dtype='int32'))}
+            for metric_position, metric in enumerate(panel.metrics):
+                columns[metric] = pa.array(panel.values[ticker_positions, metric_position, year_position])
+
+            year_directory = self._year_directory(year)
+            os.makedirs(year_directory, exist_ok=True)
+            pq.write_table(pa.table(columns), os.path.join(year_directory, 'part-{}.parquet'.format(uuid.uuid4().hex)))
+
+            for position in ticker_positions:
+                self._manifest['tickers'].setdefault(panel.tickers[position], []).append(year)
+            written_rows += len(ticker_positions)
+
+        known_metrics = set(self._manifest['metrics'])
+        self._manifest['metrics'].extend(metric for metric in panel.metrics if metric not in known_metrics)
+        self._save_manifest()
+
+        return written_rows
+
+    def load(self, tickers=None, metrics=None, years=None):
+        """Function to load (a subset of) the store as 'FundamentalsPanel'. Only the files of the requested years
+        and only the requested metric columns are read."""
+        metrics = self.metrics() if metrics is None else list(metrics)
+        years = self.years() if years is None else sorted(int(year) for year in years)
+
+        filters = None if tickers is None else [('ticker', 'in', list(tickers))]
+        frames = []
+
+        for year in years:
+            year_directory = self._year_directory(year)
+            if not os.path.isdir(year_directory):
+                continue
+
+            for file_name in sorted(os.listdir(year_directory)):
+                path = os.path.join(year_directory, file_name)
+                # Metrics added later are missing in older files:
+                available_columns = set(pq.read_schema(path).names)
+                columns = ['ticker', 'fiscal_year'] + [metric for metric in metrics if metric in available_columns]
+                frames.append(pq.read_table(path, columns=columns, filters=filters).to_pandas())
+
+        if frames:
+            frame = pd.concat(frames, ignore_index=True)
+        else:
+            frame = pd.DataFrame(columns=['ticker', 'fiscal_year'] + metrics)
+
+        frame = frame.set_index(['ticker', 'fiscal_year']).reindex(columns=metrics)
+        panel = FundamentalsPanel.from_frame(frame)
+
+        if tickers is not None:
+            # Keep the requested ticker order (tickers without data are NaN):
+            values = np.full((len(tickers), len(panel.metrics), len(panel.years)), np.nan)
+            for position, ticker in enumerate(tickers):
+                if ticker in panel.tickers:
+                    values[position] = panel.values[panel.ticker_index(ticker)]
+            panel = FundamentalsPanel(values, tickers, panel.metrics, panel.years)
+
+        return panel
+
+    def load_dataset(self, ticker, metrics=None):
+        """Function to load one ticker's dataset in the project's layout (metrics x years)."""
+        return self.load(tickers=[ticker], metrics=metrics).dataset(ticker)
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from src.database.morningstar_scraper import MorningstarScraper
+from src.utils.rate_limiter import RateLimiter
+
+class IdentifierIndex:
+    """Persistent index mapping (exchange ticker, stock ticker) to the Morningstar stock identifier. The index is
+    stored as a JSON file, so every ticker has to be resolved via the Morningstar webpage only once."""
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self._identifiers = {}
+        self._lock = threading.Lock()
+
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as file:
+                self._identifiers = json.load(file)
+
+    @staticmethod
+    def make_key(stock_ticker, exchange_ticker):
+        return '{}:{}'.format(exchange_ticker.upper(), stock_ticker.upper())
+
+    def __len__(self):
+        return len(self._identifiers)
+
+    def __contains__(self, tickers):
+        stock_ticker, exchange_ticker = tickers
+        return IdentifierIndex.make_key(stock_ticker, exchange_ticker) in self._identifiers
+
+    def get(self, stock_ticker, exchange_ticker):
+        """Function to look up an identifier. Returns None, if the ticker is unknown."""
+        return self._identifiers.get(IdentifierIndex.make_key(stock_ticker, exchange_ticker))
+
+    def add(self, stock_ticker, exchange_ticker, identifier):
+        """Function to add an identifier to the index. Invalid identifiers are rejected."""
+        if not MorningstarScraper.is_valid_morningstar_stock_identifier(identifier):
+            print(f"Invalid Morningstar identifier '{identifier}' for {exchange_ticker}:{stock_ticker}. Not added.")
+            return False
+
+        with self._lock:
+            self._identifiers[IdentifierIndex.make_key(stock_ticker, exchange_ticker)] = identifier
+        return True
+
+    def save(self):
+        """Function to write the index to disk (atomically)."""
+        directory = os.path.dirname(os.path.abspath(self.index_path))
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+                json.dump(self._identifiers, file, indent=0, sort_keys=True)
+            os.replace(temporary_path, self.index_path)
+
+    def resolve(self, tickers, requests_per_second=1.0, max_workers=8, rate_limiter=None):
+        """Function to resolve many (stock ticker, exchange ticker) pairs at once. Only tickers missing in the index
+        are scraped (concurrently, under one shared rate limit); all others are plain dictionary lookups.
+        Returns a dictionary mapping each pair to its identifier (None, if it could not be resolved)."""
+
+        tickers = list(dict.fromkeys((stock_ticker, exchange_ticker) for stock_ticker, exchange_ticker in tickers))
+        unknown_tickers = [pair for pair in tickers if pair not in self]
+
+        if unknown_tickers:
+            if rate_limiter is None:
+                rate_limiter = RateLimiter(requests_per_second)
+
+            def scrape_identifier(stock_ticker, exchange_ticker):
+                rate_limiter.acquire()
+                return MorningstarScraper.scrape_morningstar_stock_identifier(stock_ticker, exchange_ticker)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = {executor.submit(scrape_identifier, *pair): pair for pair in unknown_tickers}
+
+                for future in as_completed(futures):
+                    stock_ticker, exchange_ticker = futures[future]
+                    try:
+                        self.add(stock_ticker, exchange_ticker, future.result())
+                    except requests.RequestException as error:
+                        print(f"Resolving {exchange_ticker}:{stock_ticker} failed: {error}")
+
+            self.save()
+
+        return {pair: self.get(*pair) for pair in tickers}
@@ -1,18 +1,25 @@
 import pandas as pd
 import numpy as np
+import re
 import requests
-import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from src.utils.data_category import DataCategory
 from src.utils.database_utils import DatabaseUtils
+from src.utils.rate_limiter import RateLimiter
 
 class MorningstarScraper:
+    PAYLOAD_VERSION = '3.71.0'
+    # Base URLs can be overridden, e.g. to point the scraper to a local stand-in server:
+    API_BASE_URL = 'https://api-global.morningstar.com/sal-service/v1/stock/'
+    WEB_BASE_URL = 'https://www.morningstar.com/stocks'
+
     def __init__(self, base_url, headers=None):
         raise NotImplementedError("This class should not be instantiated.")
 
     @staticmethod
     def define_url(morningstar_stock_identifier, data_category):
-        base_url = 'https://api-global.morningstar.com/sal-service/v1/stock/'
+        base_url = MorningstarScraper.API_BASE_URL
 
         urls_dict = {
             'growth': '{}/keyStats/growthTable/{}'.format(base_url, morningstar_stock_identifier),
@@ -54,7 +61,7 @@ class MorningstarScraper:
                 'locale': 'en',
                 'clientId': 'MDC',
                 'component': payload_components[data_category.value],
-                'version': '3.71.0'
+                'version': MorningstarScraper.PAYLOAD_VERSION
             }
         else:
             return {
@@ -62,31 +69,56 @@ class MorningstarScraper:
                 'locale': 'en',
                 'clientId': 'MDC',
                 'component': payload_components[data_category.value],
-                'version': '3.71.0'
+                'version': MorningstarScraper.PAYLOAD_VERSION
             }
 
     @staticmethod
     def scrape_morningstar_stock_identifier(stock_ticker, exchange_ticker):
         # Get Morningstar 'identifier' for stock
-        base_url = 'https://www.morningstar.com/stocks'
+        base_url = MorningstarScraper.WEB_BASE_URL
         url = '{}/{}/{}/valuation'.format(base_url, exchange_ticker, stock_ticker)
 
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
         # Open webpage session
         with requests.Session() as sess:
             sess.headers.update(MorningstarScraper.define_request_header())
             response = sess.get(url)
-            index_for_extraction = response.text.find('paragraph')
-            identifier = response.text[index_for_extraction - 13:index_for_extraction - 3]
+            response.raise_for_status()
+            identifier = MorningstarScraper.extract_morningstar_stock_identifier(response.text)
 
         return identifier
 
     @staticmethod
-    def scrape_morningstar_data_subset(morningstar_stock_identifier, data_category):
-        # Scrape subset of data from Morningstar (data on specified data category, e.g. cash flow)
+    def extract_morningstar_stock_identifier(page_content):
+        # The identifier precedes the first occurrence of 'paragraph' on the valuation page
+        index_for_extraction = page_content.find('paragraph')
+        return page_content[index_for_extraction - 13:index_for_extraction - 3]
+
+    @staticmethod
+    def is_valid_morningstar_stock_identifier(identifier):
+        # Morningstar identifiers consist of 10 upper-case alphanumeric characters, e.g. '0P000002X8'
+        return isinstance(identifier, str) and re.fullmatch('[0-9A-Z]{10}', identifier) is not None
+
+    @staticmethod
+    def scrape_morningstar_data_subset(morningstar_stock_identifier, data_category, cache=None, rate_limiter=None):
+        # Scrape subset of data from Morningstar (data on specified data category, e.g. cash flow). The rate limiter
+        # is only acquired for requests that go to the network (not for cached/ offline/ empty identifiers):
         if morningstar_stock_identifier == "":
             print("Provided Morningstar stock identifier is empty. Return None.")
             return None
 
+        # Serve from cache, if possible:
+        if cache is not None:
+            data = cache.get(morningstar_stock_identifier, data_category, MorningstarScraper.PAYLOAD_VERSION)
+            if data is not None:
+                return data
+            if cache.offline:
+                print(f"No cached data for '{morningstar_stock_identifier}' ({data_category.value}) in offline mode. "
+                      "Return None.")
+                return None
+
         ## Get URL
         url = MorningstarScraper.define_url(morningstar_stock_identifier, data_category.value)
 
@@ -94,25 +126,64 @@ class MorningstarScraper:
         payload_component = MorningstarScraper.define_payload_components()
         payload = MorningstarScraper.define_payload(data_category, payload_component)
 
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+
         # Open webpage session
         with requests.Session() as sess:
             sess.headers.update(MorningstarScraper.define_request_header())
             response = sess.get(url, params=payload)
+            response.raise_for_status()
             data = response.json()
 
+        if cache is not None:
+            cache.put(morningstar_stock_identifier, data_category, MorningstarScraper.PAYLOAD_VERSION, data)
+
         return data
 
     @staticmethod
-    def scrape_morningstar_data(morningstar_stock_identifier, time_out_for_requests):
+    def scrape_morningstar_data(morningstar_stock_identifier, time_out_for_requests, cache=None):
         data = []
         all_data_categories = [e for e in DataCategory]
 
         if time_out_for_requests <= 0:
             time_out_for_requests = 20.0
 
+        # Pause 'time_out_for_requests' between requests that actually go to the network:
+        rate_limiter = RateLimiter(1.0 / time_out_for_requests)
         for category in all_data_categories:
-            data.append(MorningstarScraper.scrape_morningstar_data_subset(morningstar_stock_identifier, category))
-            time.sleep(time_out_for_requests)
+            data.append(MorningstarScraper.scrape_morningstar_data_subset(morningstar_stock_identifier, category,
+                                                                          cache, rate_limiter))
+
+        return data
+
+    @staticmethod
+    def scrape_morningstar_data_batch(morningstar_stock_identifiers, requests_per_second=1.0, max_workers=8,
+                                      rate_limiter=None, cache=None):
+        """Function to scrape the data of all data categories for many Morningstar identifiers concurrently.
+        Instead of sleeping after every request, all requests share one global token-bucket rate limit.
+        Returns a dictionary mapping each identifier to the list of JSON payloads (ordered like 'DataCategory'),
+        i.e. the same list 'scrape_morningstar_data' returns for a single identifier. Failed requests yield None."""
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(requests_per_second)
+
+        all_data_categories = [e for e in DataCategory]
+        identifiers = list(dict.fromkeys(morningstar_stock_identifiers))
+        data = {identifier: [None for category in all_data_categories] for identifier in identifiers}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Cached, offline and empty identifiers do not send a request, hence they do not take a token:
+            futures = {executor.submit(MorningstarScraper.scrape_morningstar_data_subset, identifier, category, cache,
+                                       rate_limiter): (identifier, position)
+                       for identifier in identifiers for position, category in enumerate(all_data_categories)}
+
+            for future in as_completed(futures):
+                identifier, position = futures[future]
+                try:
+                    data[identifier][position] = future.result()
+                except (requests.RequestException, ValueError) as error:
+                    print(f"Request for '{identifier}' ({all_data_categories[position].value}) failed: {error}")
 
         return data
 
@@ -219,9 +290,13 @@ class MorningstarScraper:
                             columns=[json_container['incomeStatement']['columnDefs'][-2]], dtype='float64')
 
     @staticmethod
-    def scrape_and_combine_morningstar_data(morningstar_identifier, time_out_for_requests):
-        scraped_data = MorningstarScraper.scrape_morningstar_data(morningstar_identifier, time_out_for_requests)
+    def scrape_and_combine_morningstar_data(morningstar_identifier, time_out_for_requests, cache=None):
+        scraped_data = MorningstarScraper.scrape_morningstar_data(morningstar_identifier, time_out_for_requests, cache)
+        return MorningstarScraper.combine_morningstar_data(scraped_data)
 
+    @staticmethod
+    def combine_morningstar_data(scraped_data):
+        # Combine the scraped JSON payloads (ordered like 'DataCategory') into one dataset
         growth_data = MorningstarScraper.collect_growth_data(scraped_data[0])
         efficiency_data = MorningstarScraper.collect_efficiency_data(scraped_data[1])
         financial_health_data = MorningstarScraper.collect_financial_health_data(scraped_data[2])
@@ -238,7 +313,7 @@ class MorningstarScraper:
         metric_to_base_values = {
             'revenue': financials_data.loc['revenue'].iloc[-1] * 1000,
             'operating_income': financials_data.loc['operating_income'].iloc[-1] * 1000,
-            'net_income': financials_data.loc['operating_income'].iloc[-1] * 1000,
+            'net_income': financials_data.loc['net_income'].iloc[-1] * 1000,
             'eps': financials_data.loc['eps'].iloc[-1],
             'operating_cash_flow': financials_data.loc['operating_cash_flow'].iloc[-1] * 1000,
             'free_cash_flow': financials_data.loc['free_cash_flow'].iloc[-1] * 1000
@@ -0,0 +1,144 @@
+import pandas as pd
+import numpy as np
+
+from src.utils.data_category import DataCategory
+from src.utils.fundamentals_panel import FundamentalsPanel
+
+class PanelNormalizer:
+    """Schema-driven normalizer writing raw Morningstar payloads of many companies directly into one preallocated
+    ticker x metric x year panel (instead of building one small DataFrame per company and data category via the
+    'MorningstarScraper.collect_*' functions and concatenating them)."""
+
+    # Key-stats categories: data category, number of trailing (non fiscal year) items, how to read the fiscal year
+    # from an item and the JSON path of every metric.
+    KEY_STATS_SCHEMA = [
+        {'category': DataCategory.GROWTH, 'trailing_items': 1, 'year_key': 'fiscalPeriodYearMonth',
+         'metrics': {'revenue_growth': ('revenuePer', 'yearOverYear'),
+                     'operating_income_growth': ('operatingIncome', 'yearOverYear'),
+                     'net_income_growth': ('netIncomePer', 'yearOverYear'),
+                     'eps_growth': ('epsPer', 'yearOverYear')}},
+        {'category': DataCategory.OPERATING, 'trailing_items': 3, 'year_key': 'fiscalPeriodYear',
+         'metrics': {'gross_margin_pct': ('grossMargin',), 'operating_margin_pct': ('operatingMargin',),
+                     'net_margin_pct': ('netMargin',), 'tax_rate_pct': ('taxRate',),
+                     'return_on_assets_pct': ('roa',), 'return_on_equity_pct': ('roe',),
+                     'return_on_invested_capital_pct': ('roic',), 'interest_coverage_ratio': ('interestCoverage',),
+                     'asset_turnover': ('assetsTurnover',)}},
+        {'category': DataCategory.FINANCIAL_HEALTH, 'trailing_items': 1, 'year_key': 'fiscalPeriodYearMonth',
+         'metrics': {'current_ratio': ('currentRatio',), 'debt_to_equity_ratio': ('debtEquityRatio',),
+                     'bvps': ('bookValuePerShare',)}},
+        {'category': DataCategory.CASH_FLOW, 'trailing_items': 1, 'year_key': 'fiscalPeriodYearMonth',
+         'metrics': {'operating_cash_flow_growth': ('operatingCFGrowthPer',),
+                     'free_cash_flow_growth': ('freeCashFlowGrowthPer',),
+                     'free_cash_flow_to_revenue': ('freeCFPerSales',),
+                     'free_cash_flow_to_shares': ('freeCashFlowPerShare',),
+                     'capex_as_pct_of_sales': ('capExAsPerOfSales',)}}
+    ]
+
+    # Dividends: metric -> row of the payload
+    DIVIDENDS_SCHEMA = {'dividends': 0, 'payout_ratio': 4}
+
+    # Financials (latest fiscal year): base value -> (statement, row, scaling factor); see
+    # 'MorningstarScraper.combine_morningstar_data'
+    FINANCIALS_SCHEMA = {'revenue': ('incomeStatement', 0, 1000), 'operating_income': ('incomeStatement', 1, 1000),
+                         'net_income': ('incomeStatement', 2, 1000), 'eps': ('incomeStatement', 5, 1),
+                         'operating_cash_flow': ('cashFlow', 0, 1000), 'free_cash_flow': ('cashFlow', 4, 1000)}
+
+    def __init__(self):
+        raise NotImplementedError("This class should not be instantiated.")
+
+    @staticmethod
+    def define_category_positions():
+        # Payload lists are ordered like 'DataCategory'
+        return {category: position for position, category in enumerate(DataCategory)}
+
+    @staticmethod
+    def define_metrics():
+        metrics = [metric for category in PanelNormalizer.KEY_STATS_SCHEMA for metric in category['metrics']]
+        return metrics + list(PanelNormalizer.DIVIDENDS_SCHEMA)
+
+    @staticmethod
+    def _year_of(item, year_key):
+        return int(str(item[year_key])[:4])
+
+    @staticmethod
+    def _value_of(item, path):
+        for key in path:
+            if item is None:
+                return np.nan
+            item = item.get(key)
+        return np.nan if item is None else float(item)
+
+    @staticmethod
+    def collect_years(identifier_to_payloads):
+        """Function to determine all fiscal years contained in the growth payloads (the reference for the years of
+        a company's dataset, see 'MorningstarScraper.combine_morningstar_data')."""
+        growth_schema = PanelNormalizer.KEY_STATS_SCHEMA[0]
+        growth_position = PanelNormalizer.define_category_positions()[growth_schema['category']]
+        years = set()
+        for payloads in identifier_to_payloads.values():
+            if payloads is None or payloads[growth_position] is None:
+                continue
+            items = payloads[growth_position]['dataList'][:-growth_schema['trailing_items']]
+            years.update(PanelNormalizer._year_of(item, growth_schema['year_key']) for item in items)
+        return sorted(years)
+
+    @staticmethod
+    def normalize(identifier_to_payloads, years=None):
+        """Function to normalize the payloads of many companies (dictionary mapping identifiers to the lists returned
+        by 'MorningstarScraper.scrape_morningstar_data'/ '..._batch') in one pass.
+        Returns the 'FundamentalsPanel' of all key-stats and dividends metrics and a DataFrame with the base values
+        (latest fiscal year) of the financials per identifier. Missing payloads/ values are NaN."""
+        if years is None:
+            years = PanelNormalizer.collect_years(identifier_to_payloads)
+
+        identifiers = list(identifier_to_payloads.keys())
+        metrics = PanelNormalizer.define_metrics()
+        metric_positions = {metric: position for position, metric in enumerate(metrics)}
+        year_positions = {int(year): position for position, year in enumerate(years)}
+        category_positions = PanelNormalizer.define_category_positions()
+
+        # Preallocate panel & base values:
+        values = np.full((len(identifiers), len(metrics), len(years)), np.nan)
+        base_values = np.full((len(identifiers), len(PanelNormalizer.FINANCIALS_SCHEMA)), np.nan)
+
+        for ticker_position, identifier in enumerate(identifiers):
+            payloads = identifier_to_payloads[identifier]
+            if payloads is None:
+                continue
+
+            # Key-stats categories: one item per fiscal year
+            for category in PanelNormalizer.KEY_STATS_SCHEMA:
+                payload = payloads[category_positions[category['category']]]
+                if payload is None:
+                    continue
+                for item in payload['dataList'][:-category['trailing_items']]:
+                    year_position = year_positions.get(PanelNormalizer._year_of(item, category['year_key']))
+                    if year_position is None:
+                        continue
+                    for metric, path in category['metrics'].items():
+                        values[ticker_position, metric_positions[metric], year_position] = \
+                            PanelNormalizer._value_of(item, path)
+
+            # Dividends: one column per fiscal year label (first label is the row name, last three are not fiscal
+            # years)
+            payload = payloads[category_positions[DataCategory.DIVIDENDS]]
+            if payload is not None:
+                for label_position, label in enumerate(payload['columnDefs_labels'][1:-3]):
+                    year_position = year_positions.get(int(label))
+                    if year_position is None:
+                        continue
+                    for metric, row in PanelNormalizer.DIVIDENDS_SCHEMA.items():
+                        datum = payload['rows'][row]['datum'][label_position]
+                        values[ticker_position, metric_positions[metric], year_position] = \
+                            np.nan if datum is None else float(datum)
+
+            # Financials: base values of the latest fiscal year
+            payload = payloads[category_positions[DataCategory.FINANCIALS]]
+            if payload is not None:
+                for base_position, (statement, row, scaling) in enumerate(PanelNormalizer.FINANCIALS_SCHEMA.values()):
+                    datum = payload[statement]['rows'][row]['datum'][-2]
+                    base_values[ticker_position, base_position] = np.nan if datum is None else float(datum) * scaling
+
+        panel = FundamentalsPanel(values, identifiers, metrics, years)
+        base_values = pd.DataFrame(base_values, index=identifiers, columns=list(PanelNormalizer.FINANCIALS_SCHEMA))
+        return panel, base_values
@@ -0,0 +1,184 @@
+import os
+import threading
+import pandas as pd
+import numpy as np
+
+from src.database.yahoo_finance_scraper import YahooFinanceScraper
+from src.utils.data_interval import DataInterval
+
+class PriceStore:
+    """Local per-ticker store for adjusted closing prices. Every ticker/ interval is stored as two raw binary files
+    (timestamps as int64 nanoseconds, 'Adj Close' as float64). Reads return memory-mapped arrays, so slicing years
+    of data does not copy anything. Files are rewritten atomically (temporary file + rename), dates before values:
+    an interrupted write leaves the dates of the new and the values of the old series, which share their prefix
+    (see '_open')."""
+
+    DATES_FILE_NAME = 'dates.i8'
+    VALUES_FILE_NAME = 'adj_close.f8'
+
+    # Relative difference of a stored and a downloaded closing price that indicates a re-adjusted history (after a
+    # dividend or split Yahoo Finance re-adjusts all 'Adj Close' values):
+    READJUSTMENT_TOLERANCE = 1e-4
+
+    def __init__(self, store_directory):
+        self.store_directory = store_directory
+        self._memmaps = {}
+        self._lock = threading.Lock()
+        os.makedirs(store_directory, exist_ok=True)
+
+    def _ticker_directory(self, ticker, interval):
+        return os.path.join(self.store_directory, interval.value, ticker.upper())
+
+    def _open(self, ticker, interval):
+        """Function to memory-map the stored arrays."""
+        directory = self._ticker_directory(ticker, interval)
+        dates_path = os.path.join(directory, PriceStore.DATES_FILE_NAME)
+        values_path = os.path.join(directory, PriceStore.VALUES_FILE_NAME)
+
+        if not os.path.exists(dates_path) or not os.path.exists(values_path):
+            return np.empty(0, dtype='datetime64[ns]'), np.empty(0, dtype='float64')
+
+        # Both files are written together; use the shorter one, in case a write was interrupted:
+        dates_stat, values_stat = os.stat(dates_path), os.stat(values_path)
+        length = min(dates_stat.st_size // 8, values_stat.st_size // 8)
+        key = (ticker.upper(), interval.value)
+        # Memory maps are reused until a file is replaced:
+        version = (dates_stat.st_ino, dates_stat.st_mtime_ns, values_stat.st_ino, values_stat.st_mtime_ns, length)
+
+        with self._lock:
+            cached = self._memmaps.get(key)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            if length == 0:
+                arrays = (np.empty(0, dtype='datetime64[ns]'), np.empty(0, dtype='float64'))
+            else:
+                arrays = (np.memmap(dates_path, dtype='datetime64[ns]', mode='r', shape=(length,)),
+                          np.memmap(values_path, dtype='float64', mode='r', shape=(length,)))
+            self._memmaps[key] = (version, arrays)
+
+        return arrays
+
+    def last_date(self, ticker, interval=DataInterval.ONE_DAY):
+        dates, _ = self._open(ticker, interval)
+        return pd.Timestamp(dates[-1]) if len(dates) > 0 else None
+
+    @staticmethod
+    def _to_arrays(price_data):
+        """Function to convert price data (DataFrame with column 'Adj Close' and a datetime index) to sorted arrays of
+        dates (datetime64[ns], UTC) and values."""
+        index = pd.DatetimeIndex(price_data.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        dates = index.values.astype('datetime64[ns]')
+        values = price_data['Adj Close'].to_numpy(dtype='float64')
+        order = np.argsort(dates, kind='stable')
+        return dates[order], values[order]
+
+    def _write(self, ticker, interval, dates, values):
+        """Function to replace the stored series atomically (dates first, see class description)."""
+        directory = self._ticker_directory(ticker, interval)
+        os.makedirs(directory, exist_ok=True)
+
+        with self._lock:
+            for file_name, data in [(PriceStore.DATES_FILE_NAME, dates.view('int64')),
+                                    (PriceStore.VALUES_FILE_NAME, values)]:
+                temporary_path = os.path.join(directory, file_name + '.tmp')
+                with open(temporary_path, 'wb') as file:
+                    file.write(np.ascontiguousarray(data).tobytes())
+                    file.flush()
+                    os.fsync(file.fileno())
+                os.replace(temporary_path, os.path.join(directory, file_name))
+
+    def append(self, ticker, price_data, interval=DataInterval.ONE_DAY):
+        """Function to merge price data (DataFrame with column 'Adj Close' and a datetime index) into the store.
+        Bars after the last stored date are appended; a bar at the last stored date replaces the stored one (e.g. a
+        partial bar fetched while the market was open). Returns the number of appended bars."""
+        if price_data is None or len(price_data) == 0:
+            return 0
+
+        dates, values = PriceStore._to_arrays(price_data)
+        stored_dates, stored_values = self._open(ticker, interval)
+        replaced_last_bar = False
+
+        if len(stored_dates) > 0:
+            is_new = dates >= stored_dates[-1]
+            dates, values = dates[is_new], values[is_new]
+            if len(dates) == 0:
+                return 0
+            if dates[0] == stored_dates[-1]:
+                stored_dates, stored_values = stored_dates[:-1], stored_values[:-1]
+                replaced_last_bar = True
+
+        self._write(ticker, interval, np.concatenate([stored_dates, dates]), np.concatenate([stored_values, values]))
+        return len(dates) - int(replaced_last_bar)
+
+    def replace(self, ticker, price_data, interval=DataInterval.ONE_DAY):
+        """Function to replace the stored series by price data (e.g. a re-adjusted history). Returns the number of
+        stored bars."""
+        dates, values = PriceStore._to_arrays(price_data)
+        self._write(ticker, interval, dates, values)
+        return len(dates)
+
+    def is_readjusted(self, ticker, price_data, interval=DataInterval.ONE_DAY):
+        """Function to check whether downloaded price data contradicts the stored prices on common dates except the
+        last stored one (which may be a partial bar), i.e. whether the history was re-adjusted since it was stored."""
+        stored_dates, stored_values = self._open(ticker, interval)
+        dates, values = PriceStore._to_arrays(price_data)
+
+        common_dates, stored_positions, positions = np.intersect1d(stored_dates[:-1], dates, return_indices=True)
+        if len(common_dates) == 0:
+            return False
+        return not np.allclose(values[positions], stored_values[stored_positions],
+                               rtol=PriceStore.READJUSTMENT_TOLERANCE, atol=0.0)
+
+    def update(self, ticker, interval=DataInterval.ONE_DAY, period='10y', rate_limiter=None):
+        """Function to bring a ticker up to date. An empty store is filled with 'period' of data; otherwise the bars
+        since the second last stored date are downloaded: the second last (complete) bar is compared with the stored
+        one, a re-adjusted history is downloaded completely (since the first stored date) and replaces the stored
+        one. The last stored bar is always replaced. Every download acquires the rate limiter, if given.
+        Returns the number of new bars."""
+        stored_dates, _ = self._open(ticker, interval)
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        if len(stored_dates) == 0:
+            price_data = YahooFinanceScraper.scrape_price_data(ticker, period, interval)
+            return self.append(ticker, price_data, interval)
+
+        overlap_date = pd.Timestamp(stored_dates[max(len(stored_dates) - 2, 0)])
+        price_data = YahooFinanceScraper.scrape_price_data_since(ticker, overlap_date.strftime('%Y-%m-%d'), interval)
+        if price_data is None or len(price_data) == 0:
+            return 0
+
+        if self.is_readjusted(ticker, price_data, interval):
+            last_date = stored_dates[-1]
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            price_data = YahooFinanceScraper.scrape_price_data_since(
+                ticker, pd.Timestamp(stored_dates[0]).strftime('%Y-%m-%d'), interval)
+            if price_data is None or len(price_data) == 0:
+                return 0
+            dates, _ = PriceStore._to_arrays(price_data)
+            self.replace(ticker, price_data, interval)
+            return int((dates > last_date).sum())
+
+        return self.append(ticker, price_data, interval)
+
+    def get_adj_close(self, ticker, start=None, end=None, interval=DataInterval.ONE_DAY):
+        """Function to get the stored dates and adjusted closing prices between 'start' and 'end' (both inclusive).
+        The returned arrays are zero-copy views of the memory-mapped files."""
+        dates, values = self._open(ticker, interval)
+
+        first = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left')
+        last = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end), 'ns'),
+                                                               side='right')
+        return dates[first:last], values[first:last]
+
+    def get_price_data(self, ticker, start=None, end=None, interval=DataInterval.ONE_DAY):
+        """Function to get the stored prices in the layout of 'YahooFinanceScraper.scrape_price_data' (DataFrame
+        with column 'Adj Close'). The DataFrame is backed by the memory-mapped values."""
+        dates, values = self.get_adj_close(ticker, start, end, interval)
+        return pd.DataFrame(values.reshape(-1, 1), index=pd.DatetimeIndex(dates, name='Date'),
+                            columns=['Adj Close'], copy=False)
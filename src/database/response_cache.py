@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+class ResponseCache:
+    """On-disk cache for scraped JSON payloads. Entries are content-addressed by a hash of identifier, data category
+    and payload version. Entries expire after 'ttl_seconds' (None = never) and the least recently used entries are
+    evicted once the cache exceeds 'max_size_bytes' (None = unbounded). In offline mode the cache never expires
+    entries, so previously scraped payloads can be replayed without any network access.
+    The time an entry was stored is its file's modification time (reads only update the access time), so checking
+    expiry never parses a payload. The cache's size is tracked as running total (scanned once, then updated on every
+    write), hence eviction only walks the cache once the bound is exceeded."""
+
+    # Eviction shrinks the cache below this share of 'max_size_bytes', so a full cache is not walked on every write:
+    EVICTION_TARGET_RATIO = 0.9
+
+    def __init__(self, cache_directory, ttl_seconds=None, max_size_bytes=None, offline=False):
+        self.cache_directory = cache_directory
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.offline = offline
+        self._lock = threading.Lock()
+        # Total size of all entries in bytes (None = not scanned yet):
+        self._total_size = None
+        os.makedirs(cache_directory, exist_ok=True)
+
+    @staticmethod
+    def make_key(identifier, data_category, payload_version):
+        """Function to create the content address of a payload."""
+        address = '|'.join([identifier, data_category.value, str(payload_version)])
+        return hashlib.sha256(address.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_directory, key[:2], key + '.json')
+
+    def _is_expired(self, path, stat=None):
+        if self.offline or self.ttl_seconds is None:
+            return False
+        if stat is None:
+            stat = os.stat(path)
+        return time.time() - stat.st_mtime > self.ttl_seconds
+
+    def contains(self, identifier, data_category, payload_version):
+        """Function to check whether a valid (not expired) entry exists."""
+        path = self._path(ResponseCache.make_key(identifier, data_category, payload_version))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return not self._is_expired(path, stat)
+
+    def get(self, identifier, data_category, payload_version):
+        """Function to return a cached payload. Returns None, if there is no valid entry."""
+        path = self._path(ResponseCache.make_key(identifier, data_category, payload_version))
+
+        try:
+            stat = os.stat(path)
+            if self._is_expired(path, stat):
+                return None
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        # Update access time (but keep the modification time, i.e. time stored), so eviction removes the least
+        # recently used entries first:
+        try:
+            os.utime(path, (time.time(), stat.st_mtime))
+        except OSError:
+            pass
+
+        return entry['payload']
+
+    def put(self, identifier, data_category, payload_version, payload):
+        """Function to store a payload. Files are written atomically, so concurrent readers never see partial
+        entries."""
+        if payload is None:
+            return
+
+        key = ResponseCache.make_key(identifier, data_category, payload_version)
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        entry = {'identifier': identifier, 'data_category': data_category.value, 'payload_version': payload_version,
+                 'stored_at': time.time(), 'payload': payload}
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as file:
+            json.dump(entry, file)
+        size = os.path.getsize(temporary_path)
+
+        with self._lock:
+            try:
+                replaced_size = os.path.getsize(path)
+            except OSError:
+                replaced_size = 0
+            os.replace(temporary_path, path)
+            if self._total_size is not None:
+                self._total_size += size - replaced_size
+
+        if self.max_size_bytes is not None and self.size() > self.max_size_bytes:
+            self.evict()
+
+    def size(self):
+        """Function to get the total size of all entries in bytes (the cache is scanned on the first call only)."""
+        with self._lock:
+            if self._total_size is None:
+                self._total_size = sum(size for _, size, _ in self._scan())
+            return self._total_size
+
+    def _scan(self):
+        """Function to list all entries as (access time, size, path)."""
+        entries = []
+        for directory, _, file_names in os.walk(self.cache_directory):
+            for file_name in file_names:
+                if not file_name.endswith('.json'):
+                    continue
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+        return entries
+
+    def evict(self):
+        """Function to remove expired entries and, if the cache is still too large, the least recently used
+        entries. Returns the number of removed entries."""
+        with self._lock:
+            entries = self._scan()
+            removed = 0
+            total_size = sum(size for _, size, _ in entries)
+
+            # Oldest access first:
+            for access_time, size, path in sorted(entries):
+                try:
+                    expired = self._is_expired(path)
+                except OSError:
+                    expired = True
+
+                too_large = self.max_size_bytes is not None and \
+                    total_size > self.max_size_bytes * ResponseCache.EVICTION_TARGET_RATIO
+                if not (expired or too_large):
+                    continue
+
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total_size -= size
+                removed += 1
+
+            self._total_size = total_size
+            return removed
+
+    def clear(self):
+        """Function to remove all entries."""
+        with self._lock:
+            for directory, _, file_names in os.walk(self.cache_directory):
+                for file_name in file_names:
+                    if file_name.endswith('.json'):
+                        os.remove(os.path.join(directory, file_name))
+            self._total_size = 0
@@ -0,0 +1,313 @@
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pandas as pd
+import numpy as np
+
+from src.database.damodaran_scraper import DamodaranScraper
+from src.database.morningstar_scraper import MorningstarScraper
+from src.database.synthetic_data_generator import SyntheticDataGenerator
+from src.database.yahoo_finance_scraper import YahooFinanceScraper
+from src.utils.data_category import DataCategory
+from src.utils.data_interval import DataInterval
+from src.utils.rate_limiter import RateLimiter
+
+class StandInServer:
+    """Local HTTP server replaying recorded payloads for the URLs built by 'MorningstarScraper', 'DamodaranScraper'
+    and 'YahooFinanceScraper'. Latency, error rate and throttling (429 responses) are configurable, so fetch
+    throughput, concurrency and caching can be load-tested without network access.
+
+    Fixture directory layout:
+        morningstar/<identifier>/<data category>.json   (e.g. 'morningstar/0P000002X8/cash_flow.json')
+        morningstar/identifiers.json                    ({"<EXCHANGE>:<TICKER>": "<identifier>"})
+        damodaran/ratings.xls, damodaran/ctryprem.xlsx
+        yahoo/<TICKER>.csv                              (columns 'Date', 'Adj Close')"""
+
+    # Morningstar API URL suffixes (see 'MorningstarScraper.define_url') -> data category
+    MORNINGSTAR_ROUTES = [
+        (re.compile(r'keyStats/growthTable/([^/]+)$'), DataCategory.GROWTH),
+        (re.compile(r'keyStats/OperatingAndEfficiency/([^/]+)$'), DataCategory.OPERATING),
+        (re.compile(r'keyStats/financialHealth/([^/]+)$'), DataCategory.FINANCIAL_HEALTH),
+        (re.compile(r'keyStats/cashFlow/([^/]+)$'), DataCategory.CASH_FLOW),
+        (re.compile(r'dividends/v4/([^/]+)/data$'), DataCategory.DIVIDENDS),
+        (re.compile(r'newfinancials/([^/]+)/annual/summary$'), DataCategory.FINANCIALS)
+    ]
+
+    # Yahoo Finance periods -> calendar days
+    PERIOD_TO_DAYS = {'1d': 1, '5d': 5, '1mo': 31, '3mo': 92, '6mo': 183, '1y': 366, '2y': 731, '5y': 1827,
+                      '10y': 3653}
+
+    def __init__(self, fixture_directory, host='127.0.0.1', port=0, latency_seconds=0.0, latency_jitter_seconds=0.0,
+                 error_rate=0.0, throttle_requests_per_second=None, throttle_burst=1, seed=None):
+        self.fixture_directory = fixture_directory
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.error_rate = error_rate
+        self.rate_limiter = None if throttle_requests_per_second is None \
+            else RateLimiter(throttle_requests_per_second, throttle_burst)
+        self.statistics = {'requests': 0, 'served': 0, 'throttled': 0, 'errors': 0, 'not_found': 0}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), StandInServer._create_handler(self))
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def base_urls(self):
+        """Function to return the base URLs to use instead of the live endpoints."""
+        return {'morningstar_api': self.url + '/morningstar/api/',
+                'morningstar_web': self.url + '/morningstar/web',
+                'damodaran_spread': self.url + '/damodaran/ratings.xls',
+                'damodaran_risk_premiums': self.url + '/damodaran/ctryprem.xlsx',
+                'yahoo': self.url + '/yahoo'}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    @contextlib.contextmanager
+    def patch_base_urls(self):
+        """Context manager pointing all scrapers to this server (and restoring the original URLs afterwards)."""
+        base_urls = self.base_urls()
+        original_urls = (MorningstarScraper.API_BASE_URL, MorningstarScraper.WEB_BASE_URL,
+                         DamodaranScraper.SPREAD_URL, DamodaranScraper.RISK_PREMIUMS_URL, YahooFinanceScraper.BASE_URL)
+
+        MorningstarScraper.API_BASE_URL = base_urls['morningstar_api']
+        MorningstarScraper.WEB_BASE_URL = base_urls['morningstar_web']
+        DamodaranScraper.SPREAD_URL = base_urls['damodaran_spread']
+        DamodaranScraper.RISK_PREMIUMS_URL = base_urls['damodaran_risk_premiums']
+        YahooFinanceScraper.BASE_URL = base_urls['yahoo']
+        try:
+            yield self
+        finally:
+            (MorningstarScraper.API_BASE_URL, MorningstarScraper.WEB_BASE_URL, DamodaranScraper.SPREAD_URL,
+             DamodaranScraper.RISK_PREMIUMS_URL, YahooFinanceScraper.BASE_URL) = original_urls
+
+    def _count(self, key):
+        with self._lock:
+            self.statistics[key] += 1
+
+    def _draw_latency_and_error(self):
+        with self._lock:
+            latency = self.latency_seconds + self._random.uniform(0.0, self.latency_jitter_seconds)
+            error = self._random.random() < self.error_rate
+        return latency, error
+
+    def handle(self, path, query):
+        """Function to determine the response for a request. Returns (status, content type, body)."""
+        self._count('requests')
+
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            self._count('throttled')
+            return 429, 'application/json', b'{"error": "Too Many Requests"}'
+
+        latency, error = self._draw_latency_and_error()
+        if latency > 0:
+            time.sleep(latency)
+        if error:
+            self._count('errors')
+            return 500, 'application/json', b'{"error": "Internal Server Error"}'
+
+        response = self._find_fixture(path, query)
+        if response is None:
+            self._count('not_found')
+            return 404, 'application/json', b'{"error": "Not Found"}'
+
+        self._count('served')
+        return (200,) + response
+
+    def _find_fixture(self, path, query):
+        if path.startswith('/morningstar/api/'):
+            for pattern, category in StandInServer.MORNINGSTAR_ROUTES:
+                match = pattern.search(path)
+                if match:
+                    return self._read_file(os.path.join('morningstar', match.group(1),
+                                                        StandInServer.fixture_name(category) + '.json'),
+                                           'application/json')
+
+        elif path.startswith('/morningstar/web/'):
+            # Path: /morningstar/web/<exchange>/<ticker>/valuation
+            parts = path.strip('/').split('/')
+            if len(parts) == 5 and parts[4] == 'valuation':
+                return self._identifier_page(parts[2], parts[3])
+
+        elif path.startswith('/damodaran/'):
+            return self._read_file(os.path.join('damodaran', os.path.basename(path)), 'application/vnd.ms-excel')
+
+        elif path.startswith('/yahoo/'):
+            return self._price_data(urllib.parse.unquote(path[len('/yahoo/'):]), query)
+
+        return None
+
+    def _read_file(self, relative_path, content_type):
+        path = os.path.join(self.fixture_directory, relative_path)
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'rb') as file:
+            return content_type, file.read()
+
+    def _identifier_page(self, exchange_ticker, stock_ticker):
+        path = os.path.join(self.fixture_directory, 'morningstar', 'identifiers.json')
+        if not os.path.isfile(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            identifier = json.load(file).get('{}:{}'.format(exchange_ticker.upper(), stock_ticker.upper()))
+        if identifier is None:
+            return None
+
+        # Mimic the page content 'MorningstarScraper.extract_morningstar_stock_identifier' searches:
+        page = '<html><script>{{"secId":"{}","paragraph":""}}</script></html>'.format(identifier)
+        return 'text/html', page.encode('utf-8')
+
+    def _price_data(self, ticker, query):
+        path = os.path.join(self.fixture_directory, 'yahoo', ticker.upper() + '.csv')
+        if not os.path.isfile(path):
+            return None
+
+        price_data = pd.read_csv(path, index_col='Date', parse_dates=['Date'])
+        parameters = urllib.parse.parse_qs(query)
+
+        if 'start' in parameters:
+            price_data = price_data[price_data.index >= pd.Timestamp(parameters['start'][0])]
+        elif 'period' in parameters:
+            period = parameters['period'][0]
+            if period == 'ytd':
+                price_data = price_data[price_data.index.year == price_data.index[-1].year]
+            elif period in StandInServer.PERIOD_TO_DAYS:
+                first_date = price_data.index[-1] - pd.Timedelta(days=StandInServer.PERIOD_TO_DAYS[period])
+                price_data = price_data[price_data.index > first_date]
+
+        buffer = io.StringIO()
+        price_data.to_csv(buffer)
+        return 'text/csv', buffer.getvalue().encode('utf-8')
+
+    @staticmethod
+    def fixture_name(data_category):
+        return data_category.value.replace(' ', '_')
+
+    @staticmethod
+    def _create_handler(server):
+        class StandInRequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed_url = urllib.parse.urlsplit(self.path)
+                status, content_type, body = server.handle(parsed_url.path, parsed_url.query)
+
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '1')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Keep load tests quiet
+                pass
+
+        return StandInRequestHandler
+
+    @staticmethod
+    def record_fixtures(fixture_directory, tickers_to_identifiers=None, yahoo_tickers=None, include_damodaran=True,
+                        time_out_for_requests=20.0):
+        """Function to record live payloads as fixtures. 'tickers_to_identifiers' maps (stock ticker, exchange
+        ticker) pairs to Morningstar identifiers."""
+        tickers_to_identifiers = tickers_to_identifiers or {}
+        for identifier in tickers_to_identifiers.values():
+            payloads = MorningstarScraper.scrape_morningstar_data(identifier, time_out_for_requests)
+            StandInServer.write_morningstar_fixtures(fixture_directory, identifier, payloads)
+        StandInServer.register_identifiers(fixture_directory, tickers_to_identifiers)
+
+        for ticker in yahoo_tickers or []:
+            price_data = YahooFinanceScraper.scrape_price_data(ticker, 'max', DataInterval.ONE_DAY)
+            StandInServer.write_price_fixture(fixture_directory, ticker, price_data)
+
+        if include_damodaran:
+            damodaran_directory = os.path.join(fixture_directory, 'damodaran')
+            os.makedirs(damodaran_directory, exist_ok=True)
+            for url, file_name in [(DamodaranScraper.SPREAD_URL, 'ratings.xls'),
+                                   (DamodaranScraper.RISK_PREMIUMS_URL, 'ctryprem.xlsx')]:
+                with open(os.path.join(damodaran_directory, file_name), 'wb') as file:
+                    file.write(DamodaranScraper.download_file(url).getvalue())
+                time.sleep(time_out_for_requests)
+
+    @staticmethod
+    def write_synthetic_fixtures(fixture_directory, number_of_companies, number_of_days=2520, seed=0):
+        """Function to write synthetic Morningstar and Yahoo Finance fixtures (no Damodaran files) for
+        'number_of_companies' companies with tickers 'T0000', 'T0001', ... on exchange 'XSYN'.
+        Returns the mapping (stock ticker, exchange ticker) -> identifier."""
+        rng = np.random.default_rng(seed)
+        tickers_to_identifiers = {}
+
+        for number in range(number_of_companies):
+            stock_ticker = 'T{:04d}'.format(number)
+            identifier = '0PSYN{:05d}'.format(number)
+            payloads = SyntheticDataGenerator.generate_morningstar_payloads(rng)
+            StandInServer.write_morningstar_fixtures(fixture_directory, identifier, payloads)
+            StandInServer.write_price_fixture(fixture_directory, stock_ticker,
+                                              SyntheticDataGenerator.generate_price_data(rng, number_of_days))
+            tickers_to_identifiers[(stock_ticker, 'XSYN')] = identifier
+
+        StandInServer.register_identifiers(fixture_directory, tickers_to_identifiers)
+        return tickers_to_identifiers
+
+    @staticmethod
+    def write_morningstar_fixtures(fixture_directory, identifier, payloads):
+        identifier_directory = os.path.join(fixture_directory, 'morningstar', identifier)
+        os.makedirs(identifier_directory, exist_ok=True)
+
+        for category, payload in zip(DataCategory, payloads):
+            if payload is not None:
+                with open(os.path.join(identifier_directory, StandInServer.fixture_name(category) + '.json'), 'w',
+                          encoding='utf-8') as file:
+                    json.dump(payload, file)
+
+    @staticmethod
+    def register_identifiers(fixture_directory, tickers_to_identifiers):
+        """Function to add (stock ticker, exchange ticker) -> identifier pairs to the identifiers fixture."""
+        identifiers_path = os.path.join(fixture_directory, 'morningstar', 'identifiers.json')
+        os.makedirs(os.path.dirname(identifiers_path), exist_ok=True)
+
+        identifiers = {}
+        if os.path.isfile(identifiers_path):
+            with open(identifiers_path, 'r', encoding='utf-8') as file:
+                identifiers = json.load(file)
+        for (stock_ticker, exchange_ticker), identifier in tickers_to_identifiers.items():
+            identifiers['{}:{}'.format(exchange_ticker.upper(), stock_ticker.upper())] = identifier
+
+        with open(identifiers_path, 'w', encoding='utf-8') as file:
+            json.dump(identifiers, file, indent=0, sort_keys=True)
+
+    @staticmethod
+    def write_price_fixture(fixture_directory, ticker, price_data):
+        if price_data is None:
+            return
+        yahoo_directory = os.path.join(fixture_directory, 'yahoo')
+        os.makedirs(yahoo_directory, exist_ok=True)
+        price_data = pd.DataFrame({'Adj Close': price_data['Adj Close'].to_numpy()},
+                                  index=pd.DatetimeIndex(price_data.index, name='Date'))
+        price_data.to_csv(os.path.join(yahoo_directory, ticker.upper() + '.csv'))
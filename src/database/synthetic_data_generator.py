@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+
+class SyntheticDataGenerator:
+    """Generator for synthetic, but realistically shaped data: Morningstar JSON payloads (as consumed by the
+    'MorningstarScraper.collect_*' functions) and Yahoo Finance price histories."""
+
+    def __init__(self):
+        raise NotImplementedError("This class should not be instantiated.")
+
+    @staticmethod
+    def generate_morningstar_payloads(random_generator, last_year=2023, number_of_years=10):
+        """Function to generate the JSON payloads of all data categories for one company (ordered like
+        'DataCategory', i.e. the list 'MorningstarScraper.scrape_morningstar_data' returns)."""
+        years = list(range(last_year - number_of_years + 1, last_year + 1))
+        rng = random_generator
+
+        def growth_rates():
+            return np.round(rng.normal(6.0, 12.0, number_of_years), 3).tolist()
+
+        def values(mean, std):
+            return np.round(rng.normal(mean, std, number_of_years), 3).tolist()
+
+        # Growth: one item per fiscal year plus one (dropped) item for the latest quarter
+        revenue, operating_income, net_income, eps = growth_rates(), growth_rates(), growth_rates(), growth_rates()
+        growth = {'dataList': [{'fiscalPeriodYearMonth': '{}12'.format(year),
+                                'revenuePer': {'yearOverYear': revenue[i]},
+                                'operatingIncome': {'yearOverYear': operating_income[i]},
+                                'netIncomePer': {'yearOverYear': net_income[i]},
+                                'epsPer': {'yearOverYear': eps[i]}} for i, year in enumerate(years)]}
+        growth['dataList'].append(dict(growth['dataList'][-1], fiscalPeriodYearMonth='Latest Qtr'))
+
+        # Operating and efficiency: one item per fiscal year plus three (dropped) items
+        gross, operating, net = values(40.0, 8.0), values(18.0, 6.0), values(12.0, 6.0)
+        tax, roa, roe, roic = values(20.0, 4.0), values(8.0, 4.0), values(16.0, 8.0), values(12.0, 6.0)
+        interest_coverage, asset_turnover = values(12.0, 6.0), values(0.8, 0.2)
+        efficiency = {'dataList': [{'fiscalPeriodYear': str(year), 'grossMargin': gross[i],
+                                    'operatingMargin': operating[i], 'netMargin': net[i], 'taxRate': tax[i],
+                                    'roa': roa[i], 'roe': roe[i], 'roic': roic[i],
+                                    'interestCoverage': interest_coverage[i], 'assetsTurnover': asset_turnover[i]}
+                                   for i, year in enumerate(years)]}
+        efficiency['dataList'].extend(dict(efficiency['dataList'][-1], fiscalPeriodYear=label)
+                                      for label in ['Current', '5-Yr', 'Index'])
+
+        # Financial health: one item per fiscal year plus one (dropped) item for the latest quarter
+        current_ratio, debt_to_equity, bvps = values(1.6, 0.4), values(0.8, 0.3), values(20.0, 4.0)
+        financial_health = {'dataList': [{'fiscalPeriodYearMonth': '{}12'.format(year),
+                                          'currentRatio': current_ratio[i], 'debtEquityRatio': debt_to_equity[i],
+                                          'bookValuePerShare': bvps[i]} for i, year in enumerate(years)]}
+        financial_health['dataList'].append(dict(financial_health['dataList'][-1], fiscalPeriodYearMonth='Latest Qtr'))
+
+        # Cash flow: one item per fiscal year plus one (dropped) TTM item
+        operating_cf_growth, free_cf_growth = growth_rates(), growth_rates()
+        free_cf_to_sales, free_cf_per_share, capex_to_sales = values(10.0, 4.0), values(3.0, 1.0), values(5.0, 1.5)
+        cash_flow = {'dataList': [{'fiscalPeriodYearMonth': '{}12'.format(year),
+                                   'operatingCFGrowthPer': operating_cf_growth[i],
+                                   'freeCashFlowGrowthPer': free_cf_growth[i], 'freeCFPerSales': free_cf_to_sales[i],
+                                   'freeCashFlowPerShare': free_cf_per_share[i], 'capExAsPerOfSales': capex_to_sales[i]}
+                                  for i, year in enumerate(years)]}
+        cash_flow['dataList'].append(dict(cash_flow['dataList'][-1], fiscalPeriodYearMonth='TTM'))
+
+        # Dividends: labels/ data of all fiscal years plus three (dropped) trailing columns
+        dividends_values = np.round(np.abs(rng.normal(1.5, 0.3, number_of_years + 3)), 3).tolist()
+        payout_ratio_values = np.round(np.abs(rng.normal(40.0, 10.0, number_of_years + 3)), 3).tolist()
+        dividends = {'columnDefs_labels': ['Metric'] + [str(year) for year in years] + ['TTM', 'Current', '5-Yr'],
+                     'rows': [{'datum': dividends_values}] +
+                             [{'datum': [None for _ in range(number_of_years + 3)]} for _ in range(3)] +
+                             [{'datum': payout_ratio_values}]}
+
+        # Financials (in thousands): all fiscal years plus a (dropped) TTM column
+        base_revenue = float(rng.uniform(1e6, 1e8))
+        income_statement_rows = [base_revenue, base_revenue * 0.18, base_revenue * 0.12, None, None,
+                                 float(rng.uniform(1.0, 10.0))]
+        cash_flow_rows = [base_revenue * 0.2, None, None, None, base_revenue * 0.1]
+        financials = {'incomeStatement': {'columnDefs': [str(year) for year in years] + ['TTM'],
+                                          'rows': [{'datum': [None for _ in years[:-1]] + [value, value]}
+                                                   for value in income_statement_rows]},
+                      'cashFlow': {'columnDefs': [str(year) for year in years] + ['TTM'],
+                                   'rows': [{'datum': [None for _ in years[:-1]] + [value, value]}
+                                            for value in cash_flow_rows]}}
+
+        return [growth, efficiency, financial_health, cash_flow, dividends, financials]
+
+    @staticmethod
+    def generate_price_data(random_generator, number_of_days, end_date='2024-12-31', start_price=50.0,
+                            annual_drift=0.06, annual_volatility=0.25):
+        """Function to generate a daily price history (geometric Brownian motion) in the layout of
+        'YahooFinanceScraper.scrape_price_data'."""
+        daily_returns = random_generator.normal(annual_drift / 252, annual_volatility / np.sqrt(252), number_of_days)
+        prices = start_price * np.exp(np.cumsum(daily_returns))
+        dates = pd.bdate_range(end=end_date, periods=number_of_days, name='Date')
+        return pd.DataFrame({'Adj Close': prices}, index=dates)
@@ -1,9 +1,14 @@
+import urllib.parse
 import pandas as pd
 import yfinance as yf
 from src.utils.data_interval import DataInterval
 from src.utils.assessment_period import AssessmentPeriod
 
 class YahooFinanceScraper:
+    # If set, price data is downloaded as CSV (columns 'Date', 'Adj Close') from '<BASE_URL>/<ticker>' instead of via
+    # yfinance, e.g. from a local stand-in server.
+    BASE_URL = None
+
     def __init__(self):
         raise NotImplementedError("This class should not be instantiated.")
 
@@ -19,9 +24,38 @@ class YahooFinanceScraper:
             print('Invalid interval.')
             return
 
-        price_data = yf.download(ticker, period=period, interval=interval.value, multi_level_index=False,
-                                 progress=False)
+        price_data = YahooFinanceScraper.download_price_data(ticker, interval, period=period)
+        price_data.dropna(subset=['Adj Close'], axis=0, how='any', inplace=True)
+
+        # Convert and return data
+        return pd.DataFrame(price_data['Adj Close'], index=price_data.index)
+
+    @staticmethod
+    def scrape_price_data_since(ticker, start, interval):
+        """Function to scrape the price data from 'start' (inclusive) until today."""
+        # Check interval
+        if interval.value not in [i.value for i in DataInterval]:
+            print('Invalid interval.')
+            return
+
+        price_data = YahooFinanceScraper.download_price_data(ticker, interval, start=start)
         price_data.dropna(subset=['Adj Close'], axis=0, how='any', inplace=True)
 
         # Convert and return data
-        return pd.DataFrame(price_data['Adj Close'], index=price_data.index)
\ No newline at end of file
+        return pd.DataFrame(price_data['Adj Close'], index=price_data.index)
+
+    @staticmethod
+    def download_price_data(ticker, interval, period=None, start=None):
+        """Function to download price data, either via yfinance or from the overridden base URL."""
+        if YahooFinanceScraper.BASE_URL is None:
+            return yf.download(ticker, period=period, start=start, interval=interval.value, multi_level_index=False,
+                               progress=False)
+
+        parameters = {'interval': interval.value}
+        if period is not None:
+            parameters['period'] = period
+        if start is not None:
+            parameters['start'] = start
+        url = '{}/{}?{}'.format(YahooFinanceScraper.BASE_URL.rstrip('/'), urllib.parse.quote(ticker),
+                                urllib.parse.urlencode(parameters))
+        return pd.read_csv(url, index_col='Date', parse_dates=['Date'])
@@ -3,11 +3,17 @@ import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.ticker import StrMethodFormatter
 from src.beta.beta_estimator import BetaEstimator
+from src.evaluation.scoring_rules import ScoringRuleSet
 from src.utils.calculation_utils import CalculationUtils
 from src.utils.assessment_period import AssessmentPeriod
 from src.utils.data_frequency import DataFrequency
+from src.utils.result_records import HrlrScore, IntrinsicValueAssessment, PiotroskiScore
 
 class Evaluator:
+    # Criteria of the Piotroski F-Score (bit i of a criteria bitmask = criterion i, see 'get_piotroski_f_scores'):
+    PIOTROSKI_CRITERIA = ['Net Income', 'Operating Cash Flow', 'Op. Cash Flow vs. Net Income', 'Return on Assets',
+                          'Debt/Equity', 'Current Ratio', 'Shares Outstanding', 'Gross Margin', 'Asset Turnover']
+
     def __init__(self):
         raise NotImplementedError('This class should not be instantiated.')
 
@@ -87,61 +93,81 @@ class Evaluator:
         plt.show()
 
     @staticmethod
-    def assess_metrics(dataset):
+    def assess_metrics(dataset, growth_rate_rules=None, median_value_rules=None):
+        """Function to assess growth rates & median values of a dataset via scoring rules (default rules: see
+        'ScoringRuleSet.default_growth_rate_rules'/ 'default_median_value_rules'; metrics without rule get 0 points).
+        Growth rate metrics: 1 point per period, if positive (>0). Maximum points: 3.
+        Median value metrics: 1 point per period, if the metric's threshold is met. Maximum points: 3.
+        Raises a KeyError, if a rule's metric is not available."""
         median_growth_rates = CalculationUtils.calculate_median_growth_rates(dataset)
         median_values = CalculationUtils.calculate_median_values(dataset)
 
-        # Growth rate metrics: 1 point, if positive (>0). Maximum points: 3.
-        median_growth_rates['points'] = median_growth_rates.apply(lambda row: np.sum(row > 0), axis=1)
-
-        # Median value metrics
-        points_median_value = list()
-
-        # Payout ratio: 1, if value < 80%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['payout_ratio', :] < 80))
-
-        # Interest Coverage Ratio: 1, if value > 1.5. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['interest_coverage_ratio', :] > 1.5))
-
-        # Operating margin, net margin, gross margin: 1, if value > 10%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['operating_margin_pct', :] > 10))
-        points_median_value.append(np.sum(median_values.loc['net_margin_pct', :] > 10))
-        points_median_value.append(np.sum(median_values.loc['gross_margin_pct', :] > 10))
-
-        # Return on Equity: 1, if value > 8%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['return_on_equity_pct', :] > 8))
-
-        # Return on Assets: 1, if value > 6%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['return_on_assets_pct', :] > 8))
+        if growth_rate_rules is None:
+            growth_rate_rules = ScoringRuleSet.default_growth_rate_rules(CalculationUtils.GROWTH_RATE_METRICS)
+        if median_value_rules is None:
+            median_value_rules = ScoringRuleSet.default_median_value_rules()
 
-        # Return on Invested Capital: 1, if value > 8%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['return_on_invested_capital_pct', :] > 8))
-
-        # Free Cashflow to Revenue: 1, if value > 5%. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['free_cash_flow_to_revenue', :] > 5))
-
-        # Current Ratio: 1, if value > 1. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['current_ratio', :] > 1))
-
-        # Debt/Equity Ratio: 1, if value < 1. Maximum points: 3.
-        points_median_value.append(np.sum(median_values.loc['debt_to_equity_ratio', :] < 1))
-
-        # Assign the points to the dataframe:
-        median_values['points'] = points_median_value
+        # Assign the points (summed per metric) to the dataframes:
+        for results, rules in [(median_growth_rates, growth_rate_rules), (median_values, median_value_rules)]:
+            missing_metrics = rules.missing_metrics(list(results.index))
+            if missing_metrics:
+                raise KeyError(f"No values for the metrics {missing_metrics} of the scoring rules.")
+            points = rules.evaluate(results.values, list(results.index))
+            results['points'] = pd.Series(points, index=[rule.metric for rule in rules.rules]).groupby(
+                level=0).sum().reindex(results.index, fill_value=0)
 
         return median_growth_rates, median_values
 
     @staticmethod
-    def assess_intrinsic_value(stock_prices, intrinsic_value, margin_of_safety_pct):
-        """Function to check whether the stock is under- or overvalued."""
+    def assess_metrics_panel(panel, growth_rate_rules=None, median_value_rules=None):
+        """Panel variant of 'assess_metrics' for all tickers of a 'FundamentalsPanel' at once. Returns two dataframes
+        (growth rate points, median value points) indexed by ticker with one column per rule and the column
+        'total'."""
+        if growth_rate_rules is None:
+            growth_rate_rules = ScoringRuleSet.default_growth_rate_rules(CalculationUtils.GROWTH_RATE_METRICS)
+        if median_value_rules is None:
+            median_value_rules = ScoringRuleSet.default_median_value_rules()
+
+        results = []
+        for values, metrics, rules in [
+                (CalculationUtils.calculate_median_growth_rates_panel(panel), CalculationUtils.GROWTH_RATE_METRICS,
+                 growth_rate_rules),
+                (CalculationUtils.calculate_median_values_panel(panel), CalculationUtils.MEDIAN_VALUE_METRICS,
+                 median_value_rules)]:
+            missing_metrics = rules.missing_metrics(metrics)
+            if missing_metrics:
+                raise KeyError(f"No values for the metrics {missing_metrics} of the scoring rules.")
+            points = rules.evaluate(values, metrics)
+            points_df = pd.DataFrame(points, index=panel.tickers, columns=rules.names)
+            points_df['total'] = points.sum(axis=1)
+            results.append(points_df)
+
+        return tuple(results)
 
-        # Get latest stock adjusted closing price:
-        latest_adj_close = round(stock_prices['Adj Close'].iloc[-1], 2)
+    @staticmethod
+    def assess_intrinsic_value(stock_prices, intrinsic_value, margin_of_safety_pct, quiet=False):
+        """Function to check whether the stock is under- or overvalued. Returns an 'IntrinsicValueAssessment'; with
+        'quiet' nothing is printed or plotted (batch runs)."""
+
+        # Get latest stock adjusted closing price & subtract the margin of safety (MoS) from intrinsic value:
+        latest_adj_close = float(stock_prices['Adj Close'].iloc[-1])
+        intrinsic_value_minus_margin = intrinsic_value * (1 - margin_of_safety_pct)
+        assessment = IntrinsicValueAssessment(latest_adj_close, intrinsic_value, margin_of_safety_pct,
+                                              intrinsic_value_minus_margin,
+                                              intrinsic_value_minus_margin - latest_adj_close,
+                                              bool(latest_adj_close < intrinsic_value_minus_margin))
+        # Undecided (None), if the latest price or intrinsic value is NaN:
+        if np.isnan(intrinsic_value_minus_margin) or np.isnan(latest_adj_close):
+            assessment.undervalued = None
+            assessment.nan_reason = 'intrinsic value NaN' if np.isnan(intrinsic_value_minus_margin) \
+                else 'latest price NaN'
+        if quiet:
+            return assessment
+
+        latest_adj_close = round(latest_adj_close, 2)
+        intrinsic_value_minus_margin = round(intrinsic_value_minus_margin, 2)
         print(f'Latest adjusted close price: {latest_adj_close}')
         print('')
-
-        # Subtract the margin of safety (MoS) from intrinsic value:
-        intrinsic_value_minus_margin = round(intrinsic_value * (1 - margin_of_safety_pct), 2)
         print(f'Intrinsic value (after Margin of Safety): {intrinsic_value_minus_margin}')
         print('')
 
@@ -167,17 +193,20 @@ class Evaluator:
         ax.tick_params('x', labelrotation=45)
         ax.legend(loc='upper left')
         plt.show()
+        return assessment
 
     @staticmethod
-    def get_hrlr_score(stock_prices, benchmark_prices, latest_dividends):
+    def get_hrlr_score(stock_prices, benchmark_prices, latest_dividends, quiet=False, as_record=False):
         """Stock valuation according to 'High Returns from Low Risk' by Pim van Vliet & Jan de Koning.
         Function to compute/get the three key decision parameters: 1-Year Beta, Momentum, 1-Year Dividend Yield.
         The author's recommended values are as follows: 1-Year Beta: less than 1; Momentum: any positive value;
-        1-Year Dividend Yield: higher or equal to 3."""
+        1-Year Dividend Yield: higher or equal to 3%.
+        Returns the score or, with 'as_record', an 'HrlrScore' (incl. the parameters, a criteria bitmask and the NaN
+        parameters as 'nan_reason'); with 'quiet' nothing is printed."""
 
         # 1. 1-Year Beta:
         beta_one_year = BetaEstimator.estimate_beta(stock_prices, benchmark_prices, AssessmentPeriod.ONE_YEAR,
-                                                    DataFrequency.DAILY)
+                                                    DataFrequency.DAILY, quiet)
 
         # 2. Momentum (current price relative to price 252 days, i.e. 1 trading year, ago)
         momentum = (stock_prices['Adj Close'].iloc[-1] / stock_prices['Adj Close'].iloc[-252]) - 1
@@ -185,25 +214,61 @@ class Evaluator:
         # 3. 1-Year Dividend Yield:
         dividend_yield = latest_dividends / stock_prices['Adj Close'].iloc[-1]
 
-        # Calculate stock's score:
-        score = 0
-
-        if beta_one_year < 1.0:
-            score += 1
-        if momentum > 0.0:
-            score += 1
-        if dividend_yield >= 3.0:
-            score += 1
+        # Calculate stock's score (bit i of the criteria bitmask = criterion i met):
+        criteria = int(beta_one_year < 1.0) | (int(momentum > 0.0) << 1) | (int(dividend_yield >= 0.03) << 2)
+        score = bin(criteria).count('1')
 
         # Print the results
-        print(f'1-Year Beta: {round(beta_one_year, 2)}')
-        print(f'Momentum: {round(momentum * 100, 2)}%')
-        print(f'1-Year Dividend Yield: {round(dividend_yield * 100, 2)}%')
-        print(f'Overall score: {score}/3')
+        if not quiet:
+            print(f'1-Year Beta: {round(beta_one_year, 2)}')
+            print(f'Momentum: {round(momentum * 100, 2)}%')
+            print(f'1-Year Dividend Yield: {round(dividend_yield * 100, 2)}%')
+            print(f'Overall score: {score}/3')
+
+        if as_record:
+            # Criteria compared against NaN are not met, i.e. the score is incomplete:
+            nan_parameters = [name for name, value in [('beta', beta_one_year), ('momentum', momentum),
+                                                       ('dividend yield', dividend_yield)] if pd.isna(value)]
+            nan_reason = ', '.join(f'{name} NaN' for name in nan_parameters) or None
+            return HrlrScore(beta_one_year, momentum, dividend_yield, score, criteria, nan_reason)
         return score
 
     @staticmethod
-    def get_piotroski_f_score(morningstar_dataset):
+    def get_hrlr_scores(stock_prices, benchmark_prices, latest_dividends):
+        """Batch variant of 'get_hrlr_score' for many stocks at once. 'stock_prices' is a matrix of aligned prices
+        (observations x stocks; DataFrame or array), 'latest_dividends' one value per stock (aligned by ticker for
+        Series input). Benchmark statistics are computed only once (see 'BetaEstimator.estimate_betas').
+        Returns a dataframe with 1-Year Beta, Momentum, 1-Year Dividend Yield and the score of every stock."""
+        stock_matrix = BetaEstimator.convert_to_price_matrix(stock_prices)
+        tickers = list(stock_prices.columns) if isinstance(stock_prices, pd.DataFrame) else \
+            list(range(stock_matrix.shape[1]))
+
+        if isinstance(latest_dividends, pd.Series):
+            latest_dividends = latest_dividends.reindex(tickers)
+        latest_dividends = np.asarray(latest_dividends, dtype='float64')
+
+        # 1. 1-Year Betas (NaN, if there are not enough data points):
+        betas_one_year = np.asarray(BetaEstimator.estimate_betas(stock_matrix, benchmark_prices,
+                                                                 AssessmentPeriod.ONE_YEAR, DataFrequency.DAILY))
+        betas_one_year = np.broadcast_to(betas_one_year, (len(tickers),))
+
+        # 2. Momentum (current price relative to price 252 days, i.e. 1 trading year, ago)
+        if len(stock_matrix) >= 252:
+            momentums = (stock_matrix[-1] / stock_matrix[-252]) - 1
+        else:
+            momentums = np.full(len(tickers), np.nan)
+
+        # 3. 1-Year Dividend Yields:
+        dividend_yields = latest_dividends / stock_matrix[-1]
+
+        # Calculate the stocks' scores:
+        scores = (betas_one_year < 1.0).astype('int64') + (momentums > 0.0) + (dividend_yields >= 0.03)
+
+        return pd.DataFrame({'beta_one_year': betas_one_year, 'momentum': momentums,
+                             'dividend_yield': dividend_yields, 'score': scores}, index=tickers)
+
+    @staticmethod
+    def get_piotroski_f_score(morningstar_dataset, quiet=False, as_record=False):
         """
         Function to determine the Piotroski F-Score (https://en.wikipedia.org/wiki/Piotroski_F-score).
         To determine the Piotroski F-Score the assessment of 9 criteria is conducted. For each criterion 1 or 0 points
@@ -217,6 +282,8 @@ class Evaluator:
         7. Shares Outstanding: 1 point, if value is constant or decreased (comparison of current and previous period)
         8. Gross Margin: 1 point, if value increased (comparison of current and previous period)
         9. Asset Turnover: 1 point, if value increased (comparison of current and previous period)
+        Returns a dataframe of the points per criterion or, with 'as_record', a 'PiotroskiScore' (score, criteria
+        bitmask and the NaN inputs as 'nan_reason'; no dataframe is built); with 'quiet' nothing is printed.
         """
 
         # List to collect points
@@ -261,12 +328,70 @@ class Evaluator:
 
         points[9] = sum(points)
 
+        # Print overall score:
+        if not quiet:
+            print(f'Piotroski F-Score: {points[9]}/9')
+
+        if as_record:
+            # Criteria compared against NaN are not met, i.e. the score is incomplete:
+            nan_metrics = [metric for metric, periods in [('net_income_mil', 1), ('operating_cash_flow_mil', 1),
+                                                          ('return_on_assets_pct', 2), ('debt_to_equity_ratio', 2),
+                                                          ('current_ratio', 2), ('shares_mil', 2),
+                                                          ('gross_margin_pct', 2), ('asset_turnover', 2)]
+                           if morningstar_dataset[metric].iloc[-periods:].isna().any()]
+            nan_reason = ', '.join(f'{metric} NaN' for metric in nan_metrics) or None
+            return PiotroskiScore(points[9], sum(point << bit for bit, point in enumerate(points[:9])), nan_reason)
+
         # Create Pandas DataFrame to inspect the results:
         criteria = ['Net Income', 'Operating Cash Flow', 'Op. Cash Flow vs. Net Income', 'Return on Assets',
                     'Debt/Equity', 'Current Ratio', 'Shares Outstanding', 'Gross Margin', 'Asset Turnover', 'F-Score']
         points_df = pd.DataFrame(points, index=criteria, columns=['Points'])
 
-        # Print overall score:
-        print(f'Piotroski F-Score: {sum(points) - points[9]}/9')
+        return points_df
 
-        return points_df
\ No newline at end of file
+    @staticmethod
+    def get_piotroski_f_scores(panel, all_years=False):
+        """Batch variant of 'get_piotroski_f_score' for all tickers of a 'FundamentalsPanel' (same criteria and
+        rounding, vectorized year-over-year comparisons).
+        Returns the F-Scores (int) and the criteria bitmasks (uint16, bit i = 'PIOTROSKI_CRITERIA'[i]) of the latest
+        year (shape: tickers) or, with 'all_years', of every year with a previous year (shape: tickers x years,
+        columns = panel.years[1:])."""
+        if len(panel.years) < 2:
+            print("At least two years are needed. Return None.")
+            return None
+
+        # Current & previous values of every year (latest year only, if not 'all_years'):
+        start = 1 if all_years else len(panel.years) - 1
+
+        def current(metric, decimals=None):
+            values = panel.metric(metric)[:, start:]
+            return values if decimals is None else np.round(values, decimals)
+
+        def previous(metric, decimals):
+            return np.round(panel.metric(metric)[:, start - 1:-1], decimals)
+
+        net_income = current('net_income_mil')
+        operating_cash_flow = current('operating_cash_flow_mil')
+
+        criteria = np.stack([net_income > 0,
+                             operating_cash_flow > 0,
+                             operating_cash_flow > net_income,
+                             current('return_on_assets_pct', 1) > previous('return_on_assets_pct', 1),
+                             current('debt_to_equity_ratio', 1) < previous('debt_to_equity_ratio', 1),
+                             current('current_ratio', 1) > previous('current_ratio', 1),
+                             current('shares_mil', 0) <= previous('shares_mil', 0),
+                             current('gross_margin_pct', 1) > previous('gross_margin_pct', 1),
+                             current('asset_turnover', 1) > previous('asset_turnover', 1)], axis=-1)
+
+        scores = criteria.sum(axis=-1)
+        bitmasks = (criteria * (1 << np.arange(len(Evaluator.PIOTROSKI_CRITERIA)))).sum(axis=-1).astype('uint16')
+
+        if not all_years:
+            return scores[:, 0], bitmasks[:, 0]
+        return scores, bitmasks
+
+    @staticmethod
+    def decode_piotroski_bitmasks(bitmasks):
+        """Function to decode criteria bitmasks (see 'get_piotroski_f_scores') to boolean arrays (..., criteria)."""
+        bitmasks = np.asarray(bitmasks, dtype='uint16')
+        return (bitmasks[..., None] >> np.arange(len(Evaluator.PIOTROSKI_CRITERIA), dtype='uint16')) & 1 == 1
@@ -0,0 +1,110 @@
+import json
+import numpy as np
+
+class ScoringRule:
+    """Threshold rule: 'weight' points for every assessment period in which the value of 'metric' satisfies
+    'value <operator> threshold' (NaN values never satisfy a rule)."""
+
+    OPERATORS = {'>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal, '==': np.equal,
+                 '!=': np.not_equal}
+
+    def __init__(self, metric, operator, threshold, weight=1, name=None):
+        if operator not in ScoringRule.OPERATORS:
+            raise ValueError("Unknown operator '{}'. Use one of {}.".format(operator, list(ScoringRule.OPERATORS)))
+
+        self.metric = metric
+        self.operator = operator
+        self.threshold = threshold
+        self.weight = weight
+        self.name = metric if name is None else name
+
+    def __repr__(self):
+        return "ScoringRule({} {} {}, weight={})".format(self.metric, self.operator, self.threshold, self.weight)
+
+    def to_dict(self):
+        return {'metric': self.metric, 'operator': self.operator, 'threshold': self.threshold, 'weight': self.weight,
+                'name': self.name}
+
+    @staticmethod
+    def from_dict(rule):
+        return ScoringRule(rule['metric'], rule['operator'], rule['threshold'], rule.get('weight', 1),
+                           rule.get('name'))
+
+
+class ScoringRuleSet:
+    """Set of 'ScoringRule's evaluated at once over an array of values with shape (..., metrics, periods), e.g.
+    tickers x metrics x periods (see 'CalculationUtils.calculate_median_values_panel'). Rule sets can be stored as
+    JSON (list of rule dictionaries), so custom rule sets need no code changes."""
+
+    def __init__(self, rules):
+        self.rules = [rule if isinstance(rule, ScoringRule) else ScoringRule.from_dict(rule) for rule in rules]
+
+    def __len__(self):
+        return len(self.rules)
+
+    @property
+    def names(self):
+        return [rule.name for rule in self.rules]
+
+    @staticmethod
+    def default_growth_rate_rules(metrics):
+        """Rules of 'Evaluator.assess_metrics' for growth rates: 1 point per period, if the growth rate is positive."""
+        return ScoringRuleSet([ScoringRule(metric, '>', 0) for metric in metrics])
+
+    @staticmethod
+    def default_median_value_rules():
+        """Rules of 'Evaluator.assess_metrics' for median values: 1 point per period, if the threshold is met."""
+        return ScoringRuleSet([ScoringRule('payout_ratio', '<', 80),
+                               ScoringRule('interest_coverage_ratio', '>', 1.5),
+                               ScoringRule('operating_margin_pct', '>', 10),
+                               ScoringRule('net_margin_pct', '>', 10),
+                               ScoringRule('gross_margin_pct', '>', 10),
+                               ScoringRule('return_on_equity_pct', '>', 8),
+                               ScoringRule('return_on_assets_pct', '>', 8),
+                               ScoringRule('return_on_invested_capital_pct', '>', 8),
+                               ScoringRule('free_cash_flow_to_revenue', '>', 5),
+                               ScoringRule('current_ratio', '>', 1),
+                               ScoringRule('debt_to_equity_ratio', '<', 1)])
+
+    @staticmethod
+    def from_json(file_path):
+        with open(file_path, 'r', encoding='utf-8') as file:
+            return ScoringRuleSet(json.load(file))
+
+    def to_json(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump([rule.to_dict() for rule in self.rules], file, indent=2)
+
+    def missing_metrics(self, metrics):
+        """Function to list the metrics of rules which are not part of 'metrics'."""
+        return [rule.metric for rule in self.rules if rule.metric not in metrics]
+
+    def evaluate(self, values, metrics):
+        """Function to evaluate all rules at once. 'values' has the shape (..., metrics, periods) with the metrics
+        ordered like 'metrics'. Returns the points per rule with shape (..., rules), or None, if a rule's metric is
+        not available."""
+        missing_metrics = self.missing_metrics(metrics)
+        if missing_metrics:
+            print(f"No values for metrics {missing_metrics}. Return None.")
+            return None
+
+        values = np.asarray(values, dtype='float64')
+        metric_positions = {metric: position for position, metric in enumerate(metrics)}
+        if not self.rules:
+            return np.zeros(values.shape[:-2] + (0,), dtype='int64')
+
+        # Gather the values of every rule's metric: (..., rules, periods)
+        rule_values = values[..., [metric_positions[rule.metric] for rule in self.rules], :]
+        thresholds = np.array([rule.threshold for rule in self.rules], dtype='float64')[:, None]
+
+        # One boolean mask per operator (rules sharing an operator are compared at once):
+        masks = np.zeros(rule_values.shape, dtype='bool')
+        operators = np.array([rule.operator for rule in self.rules])
+        for operator in np.unique(operators):
+            selected = operators == operator
+            masks[..., selected, :] = ScoringRule.OPERATORS[operator](rule_values[..., selected, :],
+                                                                      thresholds[selected])
+        masks &= ~np.isnan(rule_values)
+
+        weights = np.array([rule.weight for rule in self.rules])
+        return masks.sum(axis=-1) * weights
@@ -0,0 +1,51 @@
+import numpy as np
+
+class CreditSpreadIndex:
+    """Precompiled interval index over a Damodaran spread table (columns 'greater_than', 'lower_equal_than',
+    'rating', 'spread'; see 'DamodaranScraper.modify_damodaran_data'). An interest coverage ratio x belongs to the
+    bracket with greater_than < x <= lower_equal_than. Brackets are sorted once, hence spreads of arrays of ratios
+    are resolved at once via 'searchsorted'."""
+
+    def __init__(self, spreads):
+        lower_bounds = np.asarray(spreads.iloc[:, 0], dtype='float64')
+        order = np.argsort(lower_bounds, kind='stable')
+
+        self.lower_bounds = lower_bounds[order]
+        self.upper_bounds = np.asarray(spreads.iloc[:, 1], dtype='float64')[order]
+        self.ratings = np.asarray(spreads.iloc[:, 2], dtype='object')[order]
+        self.spreads = np.asarray(spreads.iloc[:, 3], dtype='float64')[order]
+
+    @staticmethod
+    def compile(spreads):
+        """Function to return the index of a spread table (indexes are returned unchanged)."""
+        if isinstance(spreads, CreditSpreadIndex):
+            return spreads
+        return CreditSpreadIndex(spreads)
+
+    def locate(self, interest_coverage_ratios):
+        """Function to determine the bracket (row of the sorted table) of every ratio; -1, if no bracket matches
+        (NaN, below the lowest bracket or within a gap between brackets)."""
+        ratios = np.asarray(interest_coverage_ratios, dtype='float64')
+        if len(self.lower_bounds) == 0:
+            return np.full(ratios.shape, -1)
+
+        # Last bracket with lower bound < ratio:
+        positions = np.searchsorted(self.lower_bounds, ratios, side='left') - 1
+        candidates = np.clip(positions, 0, None)
+        matches = (positions >= 0) & (ratios <= self.upper_bounds[candidates])
+
+        return np.where(matches, positions, -1)
+
+    def lookup(self, interest_coverage_ratios):
+        """Function to resolve the spreads of (arrays of) interest coverage ratios. NaN, if no bracket matches."""
+        positions = self.locate(interest_coverage_ratios)
+        if len(self.spreads) == 0:
+            return np.full(positions.shape, np.nan)
+        return np.where(positions >= 0, self.spreads[np.clip(positions, 0, None)], np.nan)
+
+    def lookup_ratings(self, interest_coverage_ratios):
+        """Function to resolve the ratings of (arrays of) interest coverage ratios. None, if no bracket matches."""
+        positions = self.locate(interest_coverage_ratios)
+        if len(self.ratings) == 0:
+            return np.full(positions.shape, None, dtype='object')
+        return np.where(positions >= 0, self.ratings[np.clip(positions, 0, None)], None)
@@ -2,16 +2,29 @@ import pandas as pd
 import numpy as np
 from src.utils.calculation_utils import CalculationUtils
 from src.utils.company_region import CompanyRegion
+from src.utils.company_type import CompanyType
+from src.intrinsic_value.credit_spread_index import CreditSpreadIndex
+from src.utils.result_records import DiscountRate
 
 
 class DiscountRateEstimator:
+    # Metrics of a 'FundamentalsPanel' needed by 'estimate_discount_rates':
+    PANEL_METRICS = ['tax_rate_pct', 'interest_coverage_ratio', 'equity_ratio_pct']
+
     def __init__(self):
         raise NotImplementedError()
 
     @staticmethod
     def estimate_discount_rate(morningstar_dataset, spreads_nonfinancials, spreads_financials, risk_premiums,
-                      risk_free_rate, beta, company_type, company_region, period):
-        """ Function to estimate weighted average capital cost (WACC), which serve as proxy for the discount rate."""
+                      risk_free_rate, beta, company_type, company_region, period, quiet=False, as_record=False):
+        """ Function to estimate weighted average capital cost (WACC), which serve as proxy for the discount rate.
+        Returns the discount rate or, with 'as_record', a 'DiscountRate' (incl. its components and the reason why it
+        is NaN, like 'estimate_discount_rates'); with 'quiet' nothing is printed."""
+
+        def nan_result(message, nan_reason, **components):
+            if not quiet:
+                print(message)
+            return DiscountRate(nan_reason=nan_reason, **components) if as_record else np.nan
 
         # Compute median tax rate & interest coverage ratio.
         median_tax_rate = CalculationUtils.compute_median(morningstar_dataset["tax_rate_pct"][(-period.value):])
@@ -20,18 +33,19 @@ class DiscountRateEstimator:
 
         # Check medians:
         if pd.isna(median_tax_rate) or pd.isna(median_interest_coverage_ratio):
-            print("At least one input factors is NaN. Discount rate = NaN.")
-            return np.nan
+            return nan_result("At least one input factors is NaN. Discount rate = NaN.",
+                              'median tax rate or interest coverage ratio NaN')
 
         # 1. Calculate Debt Cost:
         debt_cost_after_tax = DiscountRateEstimator.estimate_debt_cost_after_tax(company_type, spreads_nonfinancials,
                                                                                  spreads_financials,
                                                                                  median_tax_rate,
                                                                                  median_interest_coverage_ratio,
-                                                                                 risk_free_rate)
+                                                                                 risk_free_rate, quiet)
 
         # 2. Calculate Equity Cost:
-        equity_cost = DiscountRateEstimator.estimate_equity_cost(company_region, risk_premiums, risk_free_rate, beta)
+        equity_cost = DiscountRateEstimator.estimate_equity_cost(company_region, risk_premiums, risk_free_rate, beta,
+                                                                 quiet)
 
         # 3. Determine capital structure:
         median_equity_ratio = CalculationUtils.compute_median(morningstar_dataset["equity_ratio_pct"]
@@ -40,17 +54,23 @@ class DiscountRateEstimator:
         if not np.isnan(median_equity_ratio):
             median_debt_ratio = 1 - median_equity_ratio
         else:
-            median_equity_rate = np.nan
-            median_debt_ratio = np.nan
-            print("Equity ratio NaN. Return NaN.")
-            return np.nan
+            return nan_result("Equity ratio NaN. Return NaN.", 'equity ratio NaN',
+                              debt_cost_after_tax=debt_cost_after_tax, equity_cost=equity_cost)
 
         # Return WACC/ Discount Rate
-        return (median_equity_ratio * equity_cost) + (median_debt_ratio * debt_cost_after_tax)
+        discount_rate = (median_equity_ratio * equity_cost) + (median_debt_ratio * debt_cost_after_tax)
+        if not as_record:
+            return discount_rate
+
+        nan_reason = None
+        if np.isnan(discount_rate):
+            nan_reason = 'no spread for interest coverage ratio' if np.isnan(debt_cost_after_tax) else \
+                'beta NaN' if pd.isna(beta) else 'discount rate NaN'
+        return DiscountRate(discount_rate, debt_cost_after_tax, equity_cost, median_equity_ratio, nan_reason)
 
     @staticmethod
     def estimate_debt_cost_after_tax(company_type, spreads_nonfinancials, spreads_financials, median_tax_rate,
-                                     median_interest_coverage_ratio, risk_free_rate):
+                                     median_interest_coverage_ratio, risk_free_rate, quiet=False):
         """Function to estimate debt cost after tax."""
 
         # Determine what spread data is used (depending on company type):
@@ -59,15 +79,16 @@ class DiscountRateEstimator:
         elif company_type.value == "financial":
             spreads = spreads_financials
         else:
-            print("Invalid company type.")
+            if not quiet:
+                print("Invalid company type.")
             return np.nan
 
-        # Determine spread according to table:
-        for row in range(len(spreads)):
-            upper_bound = spreads.iloc[row, 1]
-            lower_bound = spreads.iloc[row, 0]
-            if (median_interest_coverage_ratio > lower_bound) and (median_interest_coverage_ratio <= upper_bound):
-                spread = spreads.iloc[row, 3]
+        # Determine spread according to table (interval index, see 'CreditSpreadIndex'):
+        spread = CreditSpreadIndex.compile(spreads).lookup(median_interest_coverage_ratio).item()
+        if np.isnan(spread):
+            if not quiet:
+                print("No spread found for interest coverage ratio. Return NaN.")
+            return np.nan
 
         # Calculate debt cost before tax:
         debt_cost_before_tax = risk_free_rate + spread
@@ -76,16 +97,98 @@ class DiscountRateEstimator:
         return debt_cost_before_tax * (1 - (median_tax_rate / 100))
 
     @staticmethod
-    def estimate_equity_cost(company_region, risk_premiums, risk_free_rate, beta):
+    def estimate_debt_costs_after_tax(company_types, spreads_nonfinancials, spreads_financials, median_tax_rates,
+                                      median_interest_coverage_ratios, risk_free_rate):
+        """Vectorized variant of 'estimate_debt_cost_after_tax' for arrays of companies (company types as
+        'CompanyType' or its values). Spread tables may be passed as dataframes or compiled 'CreditSpreadIndex'.
+        Debt costs are NaN for invalid company types, NaN inputs and ratios without matching spread bracket."""
+        company_types = np.asarray([getattr(t, 'value', t) for t in company_types], dtype='object')
+        median_tax_rates = np.asarray(median_tax_rates, dtype='float64')
+        median_interest_coverage_ratios = np.asarray(median_interest_coverage_ratios, dtype='float64')
+
+        # Resolve spreads of both tables at once and pick them by company type:
+        spreads = np.select([company_types == CompanyType.NON_FINANCIAL.value,
+                             company_types == CompanyType.FINANCIAL.value],
+                            [CreditSpreadIndex.compile(spreads_nonfinancials).lookup(median_interest_coverage_ratios),
+                             CreditSpreadIndex.compile(spreads_financials).lookup(median_interest_coverage_ratios)],
+                            default=np.nan)
+
+        return (risk_free_rate + spreads) * (1 - (median_tax_rates / 100))
+
+    @staticmethod
+    def estimate_equity_cost(company_region, risk_premiums, risk_free_rate, beta, quiet=False):
         """Function to estimate equity cost."""
 
         # Check company region input:
         if company_region.value not in [r.value for r in CompanyRegion]:
-            print("Invalid company region.")
+            if not quiet:
+                print("Invalid company region.")
             return np.nan
 
         # Determine Risk Premium:
         risk_premium = risk_premiums[risk_premiums["region"] == company_region.value]["ERP"].item()
 
         # Return Equity Cost:
-        return risk_free_rate + (risk_premium * beta)
\ No newline at end of file
+        return risk_free_rate + (risk_premium * beta)
+
+    @staticmethod
+    def define_risk_premium_lookup(risk_premiums):
+        """Function to map every 'CompanyRegion' value to its equity risk premium (NaN, if the region is not part of
+        the risk premiums table)."""
+        region_to_risk_premium = dict(zip(risk_premiums["region"], risk_premiums["ERP"].astype('float64')))
+        return {region.value: region_to_risk_premium.get(region.value, np.nan) for region in CompanyRegion}
+
+    @staticmethod
+    def estimate_discount_rates(panel, spreads_nonfinancials, spreads_financials, risk_premiums, risk_free_rate,
+                                betas, company_types, company_regions, period):
+        """Batch variant of 'estimate_discount_rate' for all tickers of a 'FundamentalsPanel' (needs the metrics
+        'PANEL_METRICS', see 'DatabaseUtils.derive_panel_values'). Betas, company types and company regions are
+        arrays aligned with the panel's tickers.
+        Returns a dataframe indexed by ticker with the discount rate (WACC), its components and the reason why the
+        discount rate is NaN (None, if it is not NaN)."""
+        missing_metrics = [m for m in DiscountRateEstimator.PANEL_METRICS if not panel.has_metric(m)]
+        if missing_metrics:
+            print(f"Panel misses metrics {missing_metrics}. Return None.")
+            return None
+
+        betas = np.asarray(betas, dtype='float64')
+        company_regions = [getattr(r, 'value', r) for r in company_regions]
+        if not (len(betas) == len(company_types) == len(company_regions) == len(panel.tickers)):
+            print("Betas, company types and company regions have to be aligned with the panel's tickers. Return None.")
+            return None
+
+        # Compute median tax rates, interest coverage ratios & equity ratios of all tickers at once:
+        medians = {metric: CalculationUtils.compute_median_array(panel.metric(metric)[:, -period.value:])
+                   for metric in DiscountRateEstimator.PANEL_METRICS}
+
+        # 1. Calculate Debt Costs:
+        debt_costs_after_tax = DiscountRateEstimator.estimate_debt_costs_after_tax(
+            company_types, spreads_nonfinancials, spreads_financials, medians['tax_rate_pct'],
+            medians['interest_coverage_ratio'], risk_free_rate)
+
+        # 2. Calculate Equity Costs (risk premiums via precomputed region lookup):
+        region_to_risk_premium = DiscountRateEstimator.define_risk_premium_lookup(risk_premiums)
+        risk_premium_values = np.array([region_to_risk_premium.get(r, np.nan) for r in company_regions])
+        equity_costs = risk_free_rate + (risk_premium_values * betas)
+
+        # 3. Determine capital structures:
+        equity_ratios = medians['equity_ratio_pct'] / 100
+        discount_rates = (equity_ratios * equity_costs) + ((1 - equity_ratios) * debt_costs_after_tax)
+
+        # Determine NaN reasons (first matching reason, ordered like the checks of 'estimate_discount_rate'):
+        company_type_values = np.array([getattr(t, 'value', t) for t in company_types], dtype='object')
+        valid_company_types = np.isin(company_type_values, [t.value for t in CompanyType])
+        conditions = [np.isnan(medians['tax_rate_pct']) | np.isnan(medians['interest_coverage_ratio']),
+                      ~valid_company_types,
+                      np.isnan(debt_costs_after_tax),
+                      np.isnan(risk_premium_values),
+                      np.isnan(betas),
+                      np.isnan(equity_ratios)]
+        reasons = ['median tax rate or interest coverage ratio NaN', 'invalid company type',
+                   'no spread for interest coverage ratio', 'invalid company region', 'beta NaN', 'equity ratio NaN']
+        nan_reasons = np.select(conditions, reasons, default='')
+        nan_reasons = np.where(np.isnan(discount_rates) & (nan_reasons == ''), 'discount rate NaN', nan_reasons)
+
+        return pd.DataFrame({'discount_rate': discount_rates, 'debt_cost_after_tax': debt_costs_after_tax,
+                             'equity_cost': equity_costs, 'equity_ratio': equity_ratios,
+                             'nan_reason': [reason or None for reason in nan_reasons]}, index=panel.tickers)
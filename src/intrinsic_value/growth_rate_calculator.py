@@ -1,4 +1,5 @@
 import numpy as np
+from src.utils.result_records import GrowthRateChoice
 
 class GrowthRateCalculator:
     def __init__(self):
@@ -7,47 +8,75 @@ class GrowthRateCalculator:
     @staticmethod
     def calculate_median_cagr(metric_series, period):
         """Function to calculate the median compound annual growth rate (CAGR)"""
-        from src.utils.calculation_utils import CalculationUtils
+        values = np.asarray(metric_series, dtype='float64')
+        return GrowthRateCalculator.calculate_median_cagrs(values, [period])[0].item()
+
+    @staticmethod
+    def calculate_cagr_matrix(values):
+        """Function to calculate the compound annual growth rates (CAGR) between all pairs of years at once.
+        'values' has the years on its last axis (e.g. tickers x metrics x years). The result has one more axis:
+        cagr[..., start, end] for all end > start; all other entries and pairs with non-positive values are NaN."""
+        values = np.asarray(values, dtype='float64')
+        number_of_years = values.shape[-1]
+
+        # Number of years between start (rows) and end (columns); NaN on and below the diagonal:
+        steps = np.arange(number_of_years)[np.newaxis, :] - np.arange(number_of_years)[:, np.newaxis]
+        exponents = np.where(steps > 0, 1.0 / np.where(steps > 0, steps, 1), np.nan)
 
-        # Create list containing years included in the period:
-        years = [int(year) for year in list(metric_series.index)[-(period.value + 1):]]
+        # Mask non-positive values (CAGR is undefined):
+        positive_values = np.where(values > 0, values, np.nan)
 
-        # Create empty list to collect growth rates:
-        cagrs = []
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratios = positive_values[..., np.newaxis, :] / positive_values[..., :, np.newaxis]
+            return ratios ** exponents - 1
 
-        for year in years[:-1]:
-            start_value = metric_series[str(year)]
+    @staticmethod
+    def calculate_median_cagrs(values, periods, cagr_matrix=None):
+        """Function to calculate the median CAGR for several assessment periods at once (see
+        'calculate_median_cagr'). For each period the median is taken over all start/end pairs within the last
+        'period + 1' years, i.e. over the lower right sub-triangle of the CAGR matrix (which is computed only once).
+        Returns an array with one entry per period on the last axis (e.g. tickers x metrics x periods)."""
+        from src.utils.calculation_utils import CalculationUtils
 
-            for forward_step in range(1, len(years), 1):
-                end_value = metric_series[str(year + forward_step)]
+        values = np.asarray(values, dtype='float64')
+        if cagr_matrix is None:
+            cagr_matrix = GrowthRateCalculator.calculate_cagr_matrix(values)
 
-                # If start or end values = 0, append NaN; otherwise compute compound annual growth rate (CAGR):
-                if np.min([start_value, end_value]) <= 0:
-                    cagrs.append(np.nan)
-                    continue
-                else:
-                    cagr = (end_value / start_value) ** (1 / forward_step)
-                    cagrs.append(cagr - 1)
+        number_of_years = values.shape[-1]
+        median_cagrs = np.full(values.shape[:-1] + (len(periods),), np.nan)
 
-            years.pop(-1)
+        for position, period in enumerate(periods):
+            window = min(period.value + 1, number_of_years)
+            if window < 2:
+                continue
 
-        return CalculationUtils.compute_median(cagrs)
+            # All start/end pairs within the window:
+            starts, ends = np.triu_indices(window, k=1)
+            offset = number_of_years - window
+            cagrs = cagr_matrix[..., starts + offset, ends + offset]
+            median_cagrs[..., position] = CalculationUtils.compute_median_array(cagrs)
+
+        return median_cagrs
 
     @staticmethod
-    def determine_optimal_growth_rate(metric_growth_rate, return_on_equity, benchmark_growth_rate=None):
-        """Function to compare different growth rates and determine optimal one."""
+    def determine_optimal_growth_rate(metric_growth_rate, return_on_equity, benchmark_growth_rate=None, quiet=False,
+                                      as_record=False):
+        """Function to compare different growth rates and determine optimal one. Returns the growth rate or, with
+        'as_record', a 'GrowthRateChoice' (incl. the chosen source); with 'quiet' nothing is printed."""
 
         # Check input:
         if np.isnan(metric_growth_rate):
-            print("Metric growth rate is NaN. Return NaN.")
-            return np.nan
+            if not quiet:
+                print("Metric growth rate is NaN. Return NaN.")
+            return GrowthRateChoice(nan_reason='metric growth rate NaN') if as_record else np.nan
 
         # Print options:
-        print(f"Metric growth rate: {round(metric_growth_rate * 100, 2)}%")
-        if benchmark_growth_rate is not None:
-            print(f"Benchmark growth rate: {round(benchmark_growth_rate * 100, 2)}%")
-        print(f"Return on Equity: {round(return_on_equity * 100, 2)}%")
-        print("")
+        if not quiet:
+            print(f"Metric growth rate: {round(metric_growth_rate * 100, 2)}%")
+            if benchmark_growth_rate is not None:
+                print(f"Benchmark growth rate: {round(benchmark_growth_rate * 100, 2)}%")
+            print(f"Return on Equity: {round(return_on_equity * 100, 2)}%")
+            print("")
 
         # String for printing decision:
         chosen_growth_rate = ""
@@ -72,5 +101,8 @@ class GrowthRateCalculator:
             optimal_growth_rate = 0
             chosen_growth_rate = "Zero growth"
 
-        print(f'Optimal growth rate: {chosen_growth_rate}, {round(optimal_growth_rate * 100, 2)}%')
-        return optimal_growth_rate
\ No newline at end of file
+        if not quiet:
+            print(f'Optimal growth rate: {chosen_growth_rate}, {round(optimal_growth_rate * 100, 2)}%')
+        if as_record:
+            return GrowthRateChoice(optimal_growth_rate, chosen_growth_rate)
+        return optimal_growth_rate
@@ -1,5 +1,7 @@
+import warnings
 import pandas as pd
 import numpy as np
+from src.intrinsic_value.sensitivity_surface import SensitivitySurface
 from src.utils.calculation_utils import CalculationUtils
 
 class IntrinsicValueEstimator:
@@ -16,44 +18,119 @@ class IntrinsicValueEstimator:
             print("Invalid input for 'prediction_years'.")
             return np.nan
 
-        # Define number of years for prediction period:
-        last_year_in_dataset = int(metric_series.index[-1])
+        median_metric = np.nanmedian(np.asarray(metric_series, dtype='float64'))
+        if np.isnan(median_metric):
+            print("Median of used metric is NaN: return NaN.")
+            return np.nan
 
-        # Create dictionary to collect intrinsic values for each discount rate
-        discount_rate_to_intrinsic_value = {str(round(disc_rate * 100, 1)) + " %": 0 for disc_rate in discount_rates}
+        # Evaluate all discount rates at once (without the overhead of the grid's 'SensitivitySurface'):
+        discount = np.asarray(discount_rates, dtype='float64')
+        intrinsic_values = (median_metric / current_shares) * IntrinsicValueEstimator.calculate_unit_intrinsic_values(
+            np.full_like(discount, growth_rate), discount, terminal_growth_rate, prediction_years)
 
-        # Loop for DCF calculations:
-        for disc_rate in discount_rates:
-            # Create list for predicted future values. First values is median value of used metric.
-            median_metric = [np.nanmedian(metric_series)]
+        # Create dictionary to collect intrinsic values for each discount rate
+        discount_rate_to_intrinsic_value = {str(round(disc_rate * 100, 1)) + " %": intrinsic_value
+                                            for disc_rate, intrinsic_value in zip(discount_rates, intrinsic_values)}
 
-            if np.isnan(median_metric[0]):
-                print("Median of used metric is NaN: return NaN.")
-                return np.nan
+        # Convert dictionary to pandas dataframe:
+        return pd.DataFrame(discount_rate_to_intrinsic_value.values(),
+                            index=discount_rate_to_intrinsic_value.keys(), columns=["IV_DCF"])
 
-            # Create list for discounted values:
-            discounted_values = []
+    @staticmethod
+    def apply_discounted_cash_flow_model_grid(metric_values, current_shares, growth_rates, discount_rates,
+                                              terminal_growth_rates, prediction_years, tickers=None):
+        """Function to evaluate the Discounted Cash Flow Model (see 'apply_discounted_cash_flow_model') for the full
+        grid of discount rates x growth rates x terminal growth rates x prediction years and for many tickers at once.
+        'metric_values' holds the metric's history per ticker (tickers x years; DataFrame, 2D array, or Series/ 1D
+        array for a single ticker), 'current_shares' one value per ticker (or a scalar).
+        Returns a 'SensitivitySurface' with dims (ticker, discount_rate, growth_rate, terminal_growth_rate,
+        prediction_years). Tickers with NaN median metric yield NaN."""
+
+        prediction_years = np.atleast_1d(np.asarray(prediction_years, dtype='int64'))
+        if (prediction_years < 1).any() or (prediction_years > 10).any():
+            print("Invalid input for 'prediction_years'.")
+            return np.nan
 
-            for year in range(1, prediction_years + 1):
-                median_metric.append(median_metric[-1] * (1 + growth_rate))
-                discounted_values.append((median_metric[-1] / (1 + disc_rate) ** year))
+        if tickers is None:
+            if isinstance(metric_values, pd.DataFrame):
+                tickers = list(metric_values.index)
+            elif isinstance(metric_values, pd.Series):
+                tickers = [metric_values.name]
+        metric_values = np.asarray(metric_values, dtype='float64')
+        if metric_values.ndim == 1:
+            metric_values = metric_values[np.newaxis, :]
+        if tickers is None:
+            tickers = list(range(len(metric_values)))
+
+        # Median metric per ticker (first projected value), scaled to one share:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            median_metric = np.nanmedian(metric_values, axis=1)
+        value_per_share = median_metric / np.broadcast_to(np.asarray(current_shares, dtype='float64'),
+                                                          median_metric.shape)
+
+        # Grid axes: discount rate (d) x growth rate (g) x terminal growth rate (t) x year (k)
+        discount = np.asarray(discount_rates, dtype='float64')[:, np.newaxis, np.newaxis, np.newaxis]
+        growth = np.asarray(growth_rates, dtype='float64')[np.newaxis, :, np.newaxis, np.newaxis]
+        terminal_growth = np.asarray(terminal_growth_rates, dtype='float64')[np.newaxis, np.newaxis, :, np.newaxis]
+
+        # Discounted growth factors ((1 + g) / (1 + d)) ** k for k = 1, ..., max(prediction_years) + 1:
+        years = np.arange(1, prediction_years.max() + 2)
+        discounted_growth = ((1 + growth) / (1 + discount)) ** years
+
+        # Sum of discounted values of the years 2, ..., prediction_years (as in 'apply_discounted_cash_flow_model'):
+        cumulative_discounted_growth = np.cumsum(discounted_growth, axis=-1) - discounted_growth[..., :1]
+        sum_of_discounted_values = cumulative_discounted_growth[..., prediction_years - 1]
+
+        # Terminal value (see 'calculate_terminal_value'):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terminal_value = discounted_growth[..., prediction_years] * (1 + terminal_growth) / \
+                             (discount - terminal_growth)
+
+        # Intrinsic value per share for a metric value of 1 per share, scaled to every ticker:
+        unit_intrinsic_values = sum_of_discounted_values + terminal_value
+        intrinsic_values = value_per_share[:, np.newaxis, np.newaxis, np.newaxis, np.newaxis] * unit_intrinsic_values
+
+        coords = {'ticker': tickers, 'discount_rate': list(np.ravel(discount_rates)),
+                  'growth_rate': list(np.ravel(growth_rates)),
+                  'terminal_growth_rate': list(np.ravel(terminal_growth_rates)),
+                  'prediction_years': [int(year) for year in prediction_years]}
+        return SensitivitySurface(intrinsic_values, list(coords.keys()), coords, name='IV_DCF')
 
-            # Calculate Terminal Value (TV):
-            terminal_value = IntrinsicValueEstimator.calculate_terminal_value(median_metric[0], disc_rate, growth_rate,
-                                                                              terminal_growth_rate, prediction_years)
+    @staticmethod
+    def apply_discounted_cash_flow_model_per_ticker(metric_values, current_shares, growth_rates, discount_rates,
+                                                    terminal_growth_rate, prediction_years):
+        """Function to evaluate the Discounted Cash Flow Model (see 'apply_discounted_cash_flow_model') for many
+        tickers at once, each with its own growth and discount rate (instead of the full grid, see
+        'apply_discounted_cash_flow_model_grid'). 'metric_values' holds the metric's history per ticker
+        (tickers x years). Returns one intrinsic value per share and ticker (NaN for NaN inputs)."""
 
-            # Company's Intrinsic Value = Sum of DCFs + Terminal Value
-            intrinsic_value_company = np.sum(discounted_values[1:]) + terminal_value
+        if (prediction_years < 1) or (prediction_years > 10):
+            print("Invalid input for 'prediction_years'.")
+            return np.nan
 
-            # Intrinsic value per Share
-            intrinsic_value_per_share = intrinsic_value_company / current_shares
+        # Median metric per ticker (first projected value), scaled to one share:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            median_metric = np.nanmedian(np.asarray(metric_values, dtype='float64'), axis=1)
+        value_per_share = median_metric / np.asarray(current_shares, dtype='float64')
 
-            # Add intrinsic value per share to dictionary:
-            discount_rate_to_intrinsic_value[str(round(disc_rate * 100, 1)) + " %"] = intrinsic_value_per_share
+        return value_per_share * IntrinsicValueEstimator.calculate_unit_intrinsic_values(
+            growth_rates, discount_rates, terminal_growth_rate, prediction_years)
 
-        # Convert dictionary to pandas dataframe:
-        return pd.DataFrame(discount_rate_to_intrinsic_value.values(),
-                            index=discount_rate_to_intrinsic_value.keys(), columns=["IV_DCF"])
+    @staticmethod
+    def calculate_unit_intrinsic_values(growth_rates, discount_rates, terminal_growth_rate, prediction_years):
+        """Function to calculate the DCF intrinsic values for a (median) metric value of 1 per share, one per pair of
+        growth and discount rate (1D arrays of equal length)."""
+        growth = np.asarray(growth_rates, dtype='float64')[:, np.newaxis]
+        discount = np.asarray(discount_rates, dtype='float64')[:, np.newaxis]
+        discounted_growth = ((1 + growth) / (1 + discount)) ** np.arange(1, prediction_years + 2)
+
+        # Discounted values of the years 2, ..., prediction_years plus terminal value:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terminal_value = discounted_growth[:, prediction_years] * (1 + terminal_growth_rate) / \
+                             (discount[:, 0] - terminal_growth_rate)
+        return discounted_growth[:, 1:prediction_years].sum(axis=1) + terminal_value
 
     @staticmethod
     def calculate_terminal_value(metric_value, discount_rate, growth_rate, terminal_growth_rate, prediction_years):
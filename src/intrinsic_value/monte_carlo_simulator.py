@@ -0,0 +1,223 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+class StreamingHistogram:
+    """Fixed-size histogram to estimate quantiles of a stream of values with bounded memory. Values outside of the
+    bin range are counted in under-/ overflow bins; exact minimum, maximum, sum and count are tracked. Histograms
+    with equal bin edges can be merged (e.g. results of several processes)."""
+
+    def __init__(self, bin_edges):
+        self.bin_edges = np.asarray(bin_edges, dtype='float64')
+        # Counts: [underflow, bin 1, ..., bin n, overflow]
+        self.counts = np.zeros(len(self.bin_edges) + 1, dtype='int64')
+        self.count = 0
+        self.sum = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+
+    def add(self, values):
+        values = np.asarray(values, dtype='float64')
+        if len(values) == 0:
+            return
+        self.counts += np.bincount(np.searchsorted(self.bin_edges, values, side='right'),
+                                   minlength=len(self.counts))
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def merge(self, other):
+        self.counts += other.counts
+        self.count += other.count
+        self.sum += other.sum
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def mean(self):
+        return self.sum / self.count if self.count > 0 else np.nan
+
+    def quantile(self, q):
+        """Function to estimate a quantile via linear interpolation within the histogram bins."""
+        if self.count == 0:
+            return np.nan
+
+        # Lower/ upper bound of every bin (under-/ overflow bins are bounded by the exact minimum/ maximum):
+        lower_bounds = np.concatenate([[min(self.minimum, self.bin_edges[0])], self.bin_edges])
+        upper_bounds = np.concatenate([self.bin_edges, [max(self.maximum, self.bin_edges[-1])]])
+
+        target = q * self.count
+        cumulative_counts = np.cumsum(self.counts)
+        position = min(int(np.searchsorted(cumulative_counts, target, side='left')), len(self.counts) - 1)
+        previous_count = cumulative_counts[position - 1] if position > 0 else 0
+        fraction = (target - previous_count) / self.counts[position] if self.counts[position] > 0 else 0.0
+
+        value = lower_bounds[position] + fraction * (upper_bounds[position] - lower_bounds[position])
+        return float(np.clip(value, self.minimum, self.maximum))
+
+
+class MonteCarloSimulator:
+    """Monte Carlo simulation of intrinsic values: growth rate, discount rate, terminal growth rate and base metric
+    are sampled from configurable distributions and the models of 'IntrinsicValueEstimator' are evaluated for every
+    scenario (vectorized, in chunks). Every chunk has its own seed, hence results are reproducible and independent
+    of the number of processes.
+
+    Distributions are given per input as a scalar (fixed value) or a dictionary, e.g.
+    {'distribution': 'normal', 'mean': 0.05, 'std': 0.02}, {'distribution': 'uniform', 'low': .., 'high': ..},
+    {'distribution': 'triangular', 'left': .., 'mode': .., 'right': ..},
+    {'distribution': 'lognormal', 'mean': .., 'sigma': ..} (parameters of the underlying normal distribution) or
+    {'distribution': 'empirical', 'values': [..]} (resampling, e.g. of a metric's history)."""
+
+    INPUTS = ['growth_rate', 'discount_rate', 'terminal_growth_rate', 'base_metric']
+
+    def __init__(self):
+        raise NotImplementedError("This class should not be instantiated.")
+
+    @staticmethod
+    def sample(distribution, size, random_generator):
+        """Function to draw samples from a distribution definition."""
+        if not isinstance(distribution, dict):
+            return np.full(size, float(distribution))
+
+        name = distribution['distribution']
+        if name == 'fixed':
+            return np.full(size, float(distribution['value']))
+        elif name == 'normal':
+            return random_generator.normal(distribution['mean'], distribution['std'], size)
+        elif name == 'uniform':
+            return random_generator.uniform(distribution['low'], distribution['high'], size)
+        elif name == 'triangular':
+            return random_generator.triangular(distribution['left'], distribution['mode'], distribution['right'],
+                                               size)
+        elif name == 'lognormal':
+            return random_generator.lognormal(distribution['mean'], distribution['sigma'], size)
+        elif name == 'empirical':
+            values = np.asarray(distribution['values'], dtype='float64')
+            return random_generator.choice(values[~np.isnan(values)], size)
+        else:
+            raise ValueError("Unknown distribution '{}'.".format(name))
+
+    @staticmethod
+    def evaluate_scenarios(model, growth_rates, discount_rates, terminal_growth_rates, base_metrics, current_shares,
+                           prediction_years):
+        """Function to evaluate a model for arrays of scenarios. Scenarios with discount rate <= terminal growth
+        rate are invalid (NaN)."""
+        valid = discount_rates > terminal_growth_rates
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if model == 'dcf':
+                # See 'IntrinsicValueEstimator.apply_discounted_cash_flow_model': discounted values of the years
+                # 2, ..., prediction_years plus terminal value
+                discounted_growth = (1 + growth_rates) / (1 + discount_rates)
+                power = discounted_growth.copy()
+                sum_of_discounted_values = np.zeros(len(growth_rates))
+                for year in range(2, prediction_years + 1):
+                    power *= discounted_growth
+                    sum_of_discounted_values += power
+                terminal_value = power * discounted_growth * (1 + terminal_growth_rates) / \
+                                 (discount_rates - terminal_growth_rates)
+                intrinsic_values = base_metrics * (sum_of_discounted_values + terminal_value) / current_shares
+            elif model == 'ddm':
+                # See 'IntrinsicValueEstimator.apply_discounted_dividends_model'
+                intrinsic_values = base_metrics * (1 + growth_rates) / (discount_rates - terminal_growth_rates)
+            else:
+                raise ValueError("Unknown model '{}'. Use 'dcf' or 'ddm'.".format(model))
+
+        return np.where(valid, intrinsic_values, np.nan)
+
+    @staticmethod
+    def simulate_chunk(model, distributions, current_shares, prediction_years, chunk_size, seed, chunk_number):
+        """Function to simulate one chunk of scenarios with its own, deterministic seed (chunk number None = pilot
+        run)."""
+        spawn_key = (1,) if chunk_number is None else (0, chunk_number)
+        random_generator = np.random.default_rng(np.random.SeedSequence(entropy=seed, spawn_key=spawn_key))
+        samples = [MonteCarloSimulator.sample(distributions[name], chunk_size, random_generator)
+                   for name in MonteCarloSimulator.INPUTS]
+        return MonteCarloSimulator.evaluate_scenarios(model, *samples, current_shares, prediction_years)
+
+    @staticmethod
+    def simulate_chunks(model, distributions, current_shares, prediction_years, chunk_sizes, seed, chunk_numbers,
+                        bin_edges, threshold_price):
+        """Function to simulate several chunks and aggregate them into a histogram (used per process)."""
+        histogram = StreamingHistogram(bin_edges)
+        invalid_scenarios = 0
+        undervalued_scenarios = 0
+
+        for chunk_size, chunk_number in zip(chunk_sizes, chunk_numbers):
+            intrinsic_values = MonteCarloSimulator.simulate_chunk(model, distributions, current_shares,
+                                                                  prediction_years, chunk_size, seed, chunk_number)
+            valid = ~np.isnan(intrinsic_values)
+            invalid_scenarios += int((~valid).sum())
+            intrinsic_values = intrinsic_values[valid]
+            histogram.add(intrinsic_values)
+            if threshold_price is not None:
+                undervalued_scenarios += int((intrinsic_values > threshold_price).sum())
+
+        return histogram, invalid_scenarios, undervalued_scenarios
+
+    @staticmethod
+    def simulate_intrinsic_value(model, distributions, current_price=None, current_shares=1.0, prediction_years=5,
+                                 margin_of_safety_pct=0.0, number_of_scenarios=1000000, chunk_size=100000,
+                                 number_of_processes=1, seed=None, quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+                                 number_of_bins=4096):
+        """Function to simulate the intrinsic value (per share) of a stock via the DCF ('dcf') or dividend discount
+        ('ddm') model. Memory is bounded by the chunk size and the number of histogram bins, regardless of the
+        number of scenarios. Returns a dictionary with estimated quantiles, mean, minimum/ maximum, number of
+        (in)valid scenarios and, if 'current_price' is given, the probability that the stock is undervalued (i.e.
+        intrinsic value after margin of safety > current price)."""
+
+        # Check inputs:
+        missing_inputs = [name for name in MonteCarloSimulator.INPUTS if name not in distributions]
+        if missing_inputs:
+            print(f"Missing distributions: {missing_inputs}. Return NaN.")
+            return np.nan
+        if model == 'dcf' and ((prediction_years < 1) or (prediction_years > 10)):
+            print("Invalid input for 'prediction_years'.")
+            return np.nan
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+
+        # Pilot run (own seed) to determine the histogram's bin range:
+        pilot_values = MonteCarloSimulator.simulate_chunk(model, distributions, current_shares, prediction_years,
+                                                          min(chunk_size, 10000), seed, None)
+        pilot_values = pilot_values[~np.isnan(pilot_values)]
+        if len(pilot_values) == 0:
+            print("No valid scenarios (discount rate has to exceed terminal growth rate). Return NaN.")
+            return np.nan
+        lower_bound, upper_bound = np.quantile(pilot_values, [0.001, 0.999])
+        margin = max(upper_bound - lower_bound, 1e-9) * 0.5
+        bin_edges = np.linspace(lower_bound - margin, upper_bound + margin, number_of_bins + 1)
+
+        # Intrinsic value (after margin of safety) > current price  <=>  intrinsic value > threshold price
+        threshold_price = None if current_price is None else current_price / (1 - margin_of_safety_pct)
+
+        # Split scenarios into chunks and distribute chunks across processes:
+        number_of_chunks = int(np.ceil(number_of_scenarios / chunk_size))
+        chunk_sizes = [min(chunk_size, number_of_scenarios - number * chunk_size) for number in range(number_of_chunks)]
+        shards = [list(range(number_of_chunks))[shard::number_of_processes] for shard in range(number_of_processes)]
+        arguments = [(model, distributions, current_shares, prediction_years, [chunk_sizes[n] for n in shard], seed,
+                      shard, bin_edges, threshold_price) for shard in shards if shard]
+
+        if number_of_processes > 1:
+            with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+                results = list(executor.map(MonteCarloSimulator.simulate_chunks, *zip(*arguments)))
+        else:
+            results = [MonteCarloSimulator.simulate_chunks(*argument) for argument in arguments]
+
+        # Merge results of all shards:
+        histogram = StreamingHistogram(bin_edges)
+        invalid_scenarios = 0
+        undervalued_scenarios = 0
+        for shard_histogram, shard_invalid_scenarios, shard_undervalued_scenarios in results:
+            histogram.merge(shard_histogram)
+            invalid_scenarios += shard_invalid_scenarios
+            undervalued_scenarios += shard_undervalued_scenarios
+
+        return {'quantiles': {q: histogram.quantile(q) for q in quantiles},
+                'mean': histogram.mean(),
+                'min': histogram.minimum if histogram.count > 0 else np.nan,
+                'max': histogram.maximum if histogram.count > 0 else np.nan,
+                'valid_scenarios': histogram.count,
+                'invalid_scenarios': invalid_scenarios,
+                'probability_undervalued': np.nan if threshold_price is None or histogram.count == 0
+                else undervalued_scenarios / histogram.count}
@@ -0,0 +1,57 @@
+import pandas as pd
+import numpy as np
+
+class SensitivitySurface:
+    """Labeled N-dimensional array, e.g. intrinsic values per ticker x discount rate x growth rate x terminal growth
+    rate x prediction years (see 'IntrinsicValueEstimator.apply_discounted_cash_flow_model_grid')."""
+
+    def __init__(self, values, dims, coords, name=None):
+        values = np.asarray(values, dtype='float64')
+        if values.ndim != len(dims) or any(len(coords[dim]) != size for dim, size in zip(dims, values.shape)):
+            raise ValueError("Shape of 'values' does not match dims/ coords.")
+
+        self.values = values
+        self.dims = list(dims)
+        self.coords = {dim: list(coords[dim]) for dim in dims}
+        self.name = name
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def sel(self, **labels):
+        """Function to select by labels, e.g. 'surface.sel(ticker="INTC", prediction_years=5)'. Selected dimensions
+        are dropped; returns a scalar, if all dimensions are selected."""
+        index = []
+        dims = []
+        for dim in self.dims:
+            if dim in labels:
+                index.append(self.coords[dim].index(labels[dim]))
+            else:
+                index.append(slice(None))
+                dims.append(dim)
+
+        unknown_dims = set(labels) - set(self.dims)
+        if unknown_dims:
+            raise KeyError("Unknown dimensions: {}".format(sorted(unknown_dims)))
+
+        values = self.values[tuple(index)]
+        if not dims:
+            return float(values)
+        return SensitivitySurface(values, dims, {dim: self.coords[dim] for dim in dims}, self.name)
+
+    def to_frame(self):
+        """Function to convert the surface to a dataframe with one row per combination of labels."""
+        index = pd.MultiIndex.from_product([self.coords[dim] for dim in self.dims], names=self.dims)
+        return pd.DataFrame(self.values.reshape(-1), index=index, columns=[self.name or 'value'])
+
+    def to_table(self, row_dim, column_dim, **labels):
+        """Function to create a two-dimensional sensitivity table (all other dimensions have to be selected via
+        'labels')."""
+        surface = self.sel(**labels) if labels else self
+        if sorted(surface.dims) != sorted([row_dim, column_dim]):
+            raise ValueError("All dimensions except 'row_dim' and 'column_dim' have to be selected.")
+
+        values = surface.values if surface.dims == [row_dim, column_dim] else surface.values.T
+        return pd.DataFrame(values, index=pd.Index(surface.coords[row_dim], name=row_dim),
+                            columns=pd.Index(surface.coords[column_dim], name=column_dim))
@@ -1,5 +1,107 @@
-def main():
-    print('')
+import argparse
+
+from src.database.damodaran_store import DamodaranStore
+from src.database.identifier_index import IdentifierIndex
+from src.database.price_store import PriceStore
+from src.database.response_cache import ResponseCache
+from src.pipeline.job_runner import JobRunner
+from src.pipeline.pipeline_stages import PipelineStages
+from src.pipeline.screening_pipeline import ScreeningPipeline
+from src.utils.assessment_period import AssessmentPeriod
+from src.utils.company_region import CompanyRegion
+from src.utils.company_type import CompanyType
+
+def parse_arguments(arguments=None):
+    parser = argparse.ArgumentParser(description='Screen a universe of stocks (resolve identifier -> scrape -> '
+                                                 'derive -> score -> WACC -> DCF/ DDM -> assess).')
+    parser.add_argument('tickers', nargs='*',
+                        help="Ticker definitions '<EXCHANGE>:<TICKER>[,<COMPANY TYPE>[,<COMPANY REGION>]]', "
+                             "e.g. 'XNAS:INTC' or 'XNAS:INTC,NON_FINANCIAL,NORTH_AMERICA'.")
+    parser.add_argument('--ticker-file', help='File with one ticker definition per line.')
+    parser.add_argument('--output', default='screening_results.csv',
+                        help="Result file (CSV; JSON lines for '.jsonl').")
+    parser.add_argument('--company-type', default=CompanyType.NON_FINANCIAL.name, choices=[t.name for t in CompanyType],
+                        help='Default company type.')
+    parser.add_argument('--company-region', default=CompanyRegion.NORTH_AMERICA.name,
+                        choices=[r.name for r in CompanyRegion], help='Default company region.')
+    parser.add_argument('--benchmark', default='^GSPC', help='Benchmark ticker (Yahoo Finance) for betas.')
+    parser.add_argument('--period', default=AssessmentPeriod.TEN_YEARS.name,
+                        choices=[p.name for p in AssessmentPeriod], help='Assessment period of medians & CAGRs.')
+    parser.add_argument('--beta-period', default=PipelineStages.DEFAULT_SETTINGS['beta_period'].name,
+                        choices=[p.name for p in AssessmentPeriod],
+                        help='Period of the daily betas (has to fit into the price period).')
+    parser.add_argument('--price-period', default=PipelineStages.DEFAULT_SETTINGS['price_period'],
+                        choices=['1y', '2y', '5y', '10y', 'max'], help='Period of the downloaded price data.')
+    parser.add_argument('--risk-free-rate', type=float, default=0.0)
+    parser.add_argument('--terminal-growth-rate', type=float, default=0.02)
+    parser.add_argument('--prediction-years', type=int, default=10)
+    parser.add_argument('--margin-of-safety', type=float, default=0.2)
+    parser.add_argument('--cache-directory', help='Directory of the Morningstar response cache.')
+    parser.add_argument('--offline', action='store_true', help='Serve Morningstar data from the cache only.')
+    parser.add_argument('--identifier-index', help='JSON file of the Morningstar identifier index.')
+    parser.add_argument('--price-directory', help='Directory of the price store.')
+    parser.add_argument('--damodaran-directory', default='damodaran', help='Directory of the Damodaran store.')
+    parser.add_argument('--damodaran-max-age-days', type=int, default=30)
+    parser.add_argument('--requests-per-second', type=float, default=1.0)
+    parser.add_argument('--fetch-workers', type=int, default=8)
+    parser.add_argument('--valuation-workers', type=int, default=1)
+    parser.add_argument('--queue-size', type=int, default=16)
+    parser.add_argument('--job-directory',
+                        help='Run as checkpointed, resumable job (sharded across processes) in this directory.')
+    parser.add_argument('--processes', type=int, default=1, help='Number of worker processes of a job.')
+    parser.add_argument('--retry-failed', action='store_true', help='Retry failed stages when resuming a job.')
+    return parser.parse_args(arguments)
+
+def read_tasks(arguments):
+    lines = list(arguments.tickers)
+    if arguments.ticker_file is not None:
+        with open(arguments.ticker_file, 'r', encoding='utf-8') as file:
+            lines += [line.strip() for line in file if line.strip() and not line.startswith('#')]
+
+    tasks = [PipelineStages.parse_ticker(line, CompanyType[arguments.company_type],
+                                         CompanyRegion[arguments.company_region]) for line in lines]
+    return [task for task in tasks if task is not None]
+
+def main(arguments=None):
+    arguments = parse_arguments(arguments)
+
+    tasks = read_tasks(arguments)
+    if not tasks:
+        print('No tickers to screen.')
+        return
+
+    # Shared inputs (loaded once per run):
+    damodaran_tables = DamodaranStore(arguments.damodaran_directory).get_tables(
+        max_age_days=arguments.damodaran_max_age_days)
+    price_store = None if arguments.price_directory is None else PriceStore(arguments.price_directory)
+    benchmark_prices = PipelineStages.fetch_prices(arguments.benchmark, price_store, arguments.price_period)
+    cache = None if arguments.cache_directory is None else ResponseCache(arguments.cache_directory,
+                                                                         offline=arguments.offline)
+    identifier_index = None if arguments.identifier_index is None else IdentifierIndex(arguments.identifier_index)
+
+    settings = {'period': AssessmentPeriod[arguments.period], 'beta_period': AssessmentPeriod[arguments.beta_period],
+                'price_period': arguments.price_period, 'risk_free_rate': arguments.risk_free_rate,
+                'terminal_growth_rate': arguments.terminal_growth_rate,
+                'prediction_years': arguments.prediction_years, 'margin_of_safety_pct': arguments.margin_of_safety}
+
+    if arguments.job_directory is not None:
+        runner = JobRunner(arguments.job_directory, damodaran_tables, benchmark_prices, settings,
+                           arguments.identifier_index, arguments.cache_directory, arguments.offline,
+                           arguments.price_directory, arguments.requests_per_second, arguments.processes,
+                           arguments.retry_failed)
+        statistics = runner.run(tasks, arguments.output)
+        print(f"Job of {statistics['tickers']} tickers finished in {statistics['seconds']:.1f}s: "
+              f"{statistics['completed']} completed, {statistics['failed']} failed "
+              f"({statistics['skipped_stages']} stages resumed from checkpoints). Results: {arguments.output}")
+        return
+
+    pipeline = ScreeningPipeline(damodaran_tables, benchmark_prices, settings, identifier_index, cache, price_store,
+                                 arguments.requests_per_second, arguments.fetch_workers, arguments.valuation_workers,
+                                 arguments.queue_size)
+    statistics = pipeline.run(tasks, arguments.output)
+
+    print(f"Screened {statistics['tickers']} tickers in {statistics['seconds']:.1f}s: {statistics['valued']} valued, "
+          f"{statistics['failed']} failed. Results: {arguments.output}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,242 @@
+import json
+import os
+import time
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from src.database.identifier_index import IdentifierIndex
+from src.database.morningstar_scraper import MorningstarScraper
+from src.database.price_store import PriceStore
+from src.database.response_cache import ResponseCache
+from src.pipeline.pipeline_stages import PipelineStages
+from src.pipeline.screening_pipeline import ResultWriter
+from src.utils.rate_limiter import RateLimiter
+
+class JobRunner:
+    """Checkpointed, resumable universe run. The tickers are sharded across worker processes; every process records
+    the completion (or failure) of every ticker and stage in its own append-only checkpoint file and persists the
+    stage's output, so a restarted run continues with the first stage that is not completed yet. A failing ticker
+    is isolated (its remaining stages are skipped) instead of aborting the run.
+
+    Job directory layout:
+        checkpoints/shard-<number>.jsonl    ({"ticker": .., "stage": .., "status": "done"/ "failed", ..} per line)
+        outputs/<EXCHANGE>_<TICKER>/        (identifier.json, payloads.json, prices.pkl, result.json)"""
+
+    STAGES = ['resolve', 'fetch_fundamentals', 'fetch_prices', 'value']
+
+    def __init__(self, job_directory, damodaran_tables, benchmark_prices, settings=None, identifier_index_path=None,
+                 cache_directory=None, offline=False, price_directory=None, requests_per_second=1.0,
+                 number_of_processes=1, retry_failed=False):
+        self.job_directory = os.path.abspath(job_directory)
+        self.damodaran_tables = damodaran_tables
+        self.benchmark_prices = benchmark_prices
+        self.settings = dict(PipelineStages.DEFAULT_SETTINGS, **(settings or {}))
+        self.identifier_index_path = identifier_index_path
+        self.cache_directory = cache_directory
+        self.offline = offline
+        self.price_directory = price_directory
+        self.requests_per_second = requests_per_second
+        self.number_of_processes = number_of_processes
+        self.retry_failed = retry_failed
+
+        os.makedirs(os.path.join(self.job_directory, 'checkpoints'), exist_ok=True)
+        os.makedirs(os.path.join(self.job_directory, 'outputs'), exist_ok=True)
+
+    @staticmethod
+    def make_key(task):
+        return IdentifierIndex.make_key(task['ticker'], task['exchange'])
+
+    def _output_directory(self, task):
+        return os.path.join(self.job_directory, 'outputs', '{}_{}'.format(task['exchange'], task['ticker']))
+
+    def read_checkpoints(self):
+        """Function to read the latest status of every ticker and stage from all checkpoint files. Returns a
+        dictionary 'EXCHANGE:TICKER' -> {stage: checkpoint record}. Incomplete lines (interrupted writes) are
+        ignored."""
+        records = []
+        checkpoint_directory = os.path.join(self.job_directory, 'checkpoints')
+        for file_name in sorted(os.listdir(checkpoint_directory)):
+            with open(os.path.join(checkpoint_directory, file_name), 'r', encoding='utf-8') as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+
+        statuses = {}
+        for record in sorted(records, key=lambda r: r['time']):
+            statuses.setdefault(record['ticker'], {})[record['stage']] = record
+        return statuses
+
+    def run_stage(self, stage, task, rate_limiter, cache, identifier_index, price_store):
+        """Function to run one stage of a task. Inputs of earlier stages are read from the task's output directory,
+        the stage's output is written to it. Raises an exception, if the stage fails."""
+        directory = self._output_directory(task)
+        os.makedirs(directory, exist_ok=True)
+
+        def read_json(file_name):
+            with open(os.path.join(directory, file_name), 'r', encoding='utf-8') as file:
+                return json.load(file)
+
+        def write_json(file_name, data):
+            # Write atomically, so an interrupted stage never leaves a partial output:
+            temporary_path = os.path.join(directory, file_name + '.tmp')
+            with open(temporary_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temporary_path, os.path.join(directory, file_name))
+
+        if stage == 'resolve':
+            identifier = None if identifier_index is None else identifier_index.get(task['ticker'], task['exchange'])
+            if identifier is None:
+                identifier = PipelineStages.resolve_identifier(task, None, rate_limiter)
+            if not MorningstarScraper.is_valid_morningstar_stock_identifier(identifier):
+                raise ValueError("invalid identifier '{}'".format(identifier))
+            write_json('identifier.json', identifier)
+
+        elif stage == 'fetch_fundamentals':
+            payloads = PipelineStages.fetch_fundamentals(read_json('identifier.json'), rate_limiter, cache)
+            if any(payload is None for payload in payloads):
+                raise ValueError('{} of {} payloads missing'.format(sum(p is None for p in payloads), len(payloads)))
+            write_json('payloads.json', payloads)
+
+        elif stage == 'fetch_prices':
+            prices = PipelineStages.fetch_prices(task['ticker'], price_store, self.settings['price_period'],
+                                                 rate_limiter)
+            if prices is None or len(prices) == 0:
+                raise ValueError('no price data')
+            temporary_path = os.path.join(directory, 'prices.pkl.tmp')
+            pd.DataFrame(prices).to_pickle(temporary_path)
+            os.replace(temporary_path, os.path.join(directory, 'prices.pkl'))
+
+        elif stage == 'value':
+            result = PipelineStages.value_company(task, read_json('identifier.json'), read_json('payloads.json'),
+                                                  pd.read_pickle(os.path.join(directory, 'prices.pkl')),
+                                                  self.benchmark_prices, self.damodaran_tables, self.settings)
+            write_json('result.json', result)
+
+        else:
+            raise ValueError("Unknown stage '{}'.".format(stage))
+
+    def run_shard(self, shard_number, tasks, statuses):
+        """Function to run all remaining stages of a shard's tasks (in a worker process). Returns the shard's
+        statistics."""
+        # Every process gets its share of the request rate and its own cache/ store handles:
+        rate_limiter = RateLimiter(self.requests_per_second / self.number_of_processes)
+        cache = None if self.cache_directory is None else ResponseCache(self.cache_directory, offline=self.offline)
+        identifier_index = None if self.identifier_index_path is None else IdentifierIndex(self.identifier_index_path)
+        price_store = None if self.price_directory is None else PriceStore(self.price_directory)
+
+        statistics = {'completed': 0, 'failed': 0, 'skipped_stages': 0}
+        checkpoint_path = os.path.join(self.job_directory, 'checkpoints', 'shard-{}.jsonl'.format(shard_number))
+
+        # Terminate a line torn by an interrupted write, so it does not corrupt the next record:
+        if os.path.exists(checkpoint_path) and os.path.getsize(checkpoint_path) > 0:
+            with open(checkpoint_path, 'rb') as checkpoint:
+                checkpoint.seek(-1, os.SEEK_END)
+                torn_line = checkpoint.read(1) != b'\n'
+            if torn_line:
+                with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+                    checkpoint.write('\n')
+
+        with open(checkpoint_path, 'a', encoding='utf-8') as checkpoint:
+            for task in tasks:
+                key = JobRunner.make_key(task)
+                task_statuses = statuses.get(key, {})
+                failed = False
+
+                for stage in JobRunner.STAGES:
+                    status = task_statuses.get(stage, {}).get('status')
+                    if status == 'done':
+                        statistics['skipped_stages'] += 1
+                        continue
+                    if status == 'failed' and not self.retry_failed:
+                        failed = True
+                        break
+
+                    record = {'ticker': key, 'stage': stage, 'status': 'done', 'error': None}
+                    try:
+                        self.run_stage(stage, task, rate_limiter, cache, identifier_index, price_store)
+                    except Exception as error:
+                        record.update({'status': 'failed', 'error': '{}: {}'.format(type(error).__name__, error)})
+                        print(f"{key}: stage '{stage}' failed ({record['error']}). Ticker skipped.")
+
+                    record['time'] = time.time()
+                    checkpoint.write(json.dumps(record) + '\n')
+                    checkpoint.flush()
+
+                    if record['status'] == 'failed':
+                        failed = True
+                        break
+
+                statistics['failed' if failed else 'completed'] += 1
+
+        return statistics
+
+    def run(self, tasks, output_path=None):
+        """Function to run (or resume) the job for all tasks (see 'PipelineStages.parse_ticker'). Completed stages of
+        earlier runs are skipped; failed stages are only retried with 'retry_failed'. If 'output_path' is given, the
+        result rows of all tasks (in task order) are written to it. Returns the run's statistics."""
+        tasks = list({JobRunner.make_key(task): task for task in tasks}.values())
+        statuses = self.read_checkpoints()
+        start_time = time.perf_counter()
+
+        shards = [tasks[shard::self.number_of_processes] for shard in range(self.number_of_processes)]
+        shard_numbers = [shard_number for shard_number, shard in enumerate(shards) if shard]
+        shards = [shard for shard in shards if shard]
+
+        if self.number_of_processes > 1:
+            with ProcessPoolExecutor(max_workers=self.number_of_processes) as executor:
+                shard_statistics = list(executor.map(self.run_shard, shard_numbers, shards,
+                                                     [statuses] * len(shards)))
+        else:
+            shard_statistics = [self.run_shard(shard_number, shard, statuses)
+                                for shard_number, shard in zip(shard_numbers, shards)]
+
+        statistics = {'tickers': len(tasks), 'completed': 0, 'failed': 0, 'skipped_stages': 0}
+        for shard_statistic in shard_statistics:
+            for key, value in shard_statistic.items():
+                statistics[key] += value
+
+        self.update_identifier_index(tasks)
+        if output_path is not None:
+            self.write_results(tasks, output_path)
+
+        statistics['seconds'] = time.perf_counter() - start_time
+        return statistics
+
+    def update_identifier_index(self, tasks):
+        """Function to add all resolved identifiers to the identifier index (done once by the parent process, so
+        worker processes never write the index concurrently)."""
+        if self.identifier_index_path is None:
+            return
+
+        identifier_index = IdentifierIndex(self.identifier_index_path)
+        number_of_identifiers = len(identifier_index)
+        for task in tasks:
+            identifier_path = os.path.join(self._output_directory(task), 'identifier.json')
+            if (task['ticker'], task['exchange']) not in identifier_index and os.path.exists(identifier_path):
+                with open(identifier_path, 'r', encoding='utf-8') as file:
+                    identifier_index.add(task['ticker'], task['exchange'], json.load(file))
+
+        if len(identifier_index) > number_of_identifiers:
+            identifier_index.save()
+
+    def write_results(self, tasks, output_path):
+        """Function to write the result rows of all tasks; tasks without result get a row with the failed stage's
+        error."""
+        statuses = self.read_checkpoints()
+
+        with ResultWriter(output_path) as writer:
+            for task in tasks:
+                result_path = os.path.join(self._output_directory(task), 'result.json')
+                if statuses.get(JobRunner.make_key(task), {}).get('value', {}).get('status') == 'done' and \
+                        os.path.exists(result_path):
+                    with open(result_path, 'r', encoding='utf-8') as file:
+                        writer.write(json.load(file))
+                    continue
+
+                failures = [record for record in statuses.get(JobRunner.make_key(task), {}).values()
+                            if record['status'] == 'failed']
+                error = "{} failed: {}".format(failures[0]['stage'], failures[0]['error']) if failures \
+                    else 'not completed'
+                writer.write(PipelineStages.create_result(task, error=error))
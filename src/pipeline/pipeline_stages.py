@@ -0,0 +1,210 @@
+import requests
+import pandas as pd
+import numpy as np
+
+from src.beta.beta_estimator import BetaEstimator
+from src.database.morningstar_scraper import MorningstarScraper
+from src.database.panel_normalizer import PanelNormalizer
+from src.database.yahoo_finance_scraper import YahooFinanceScraper
+from src.evaluation.evaluator import Evaluator
+from src.intrinsic_value.discount_rate_estimator import DiscountRateEstimator
+from src.intrinsic_value.growth_rate_calculator import GrowthRateCalculator
+from src.intrinsic_value.intrinsic_value_estimator import IntrinsicValueEstimator
+from src.intrinsic_value.sensitivity_surface import SensitivitySurface
+from src.utils.assessment_period import AssessmentPeriod
+from src.utils.company_region import CompanyRegion
+from src.utils.company_type import CompanyType
+from src.utils.data_category import DataCategory
+from src.utils.data_frequency import DataFrequency
+from src.utils.data_interval import DataInterval
+from src.utils.database_utils import DatabaseUtils
+
+class PipelineStages:
+    """Stages of the screening workflow (resolve identifier -> scrape -> collect -> derive -> score -> WACC ->
+    DCF/ DDM -> assess) for one ticker. The I/O-bound stages ('resolve_identifier', 'fetch_fundamentals',
+    'fetch_prices') and the CPU-bound stage ('value_company') are separate, so a pipeline can overlap them."""
+
+    # Valuation settings (see 'value_company'). The beta period has to fit into the downloaded price period: a
+    # '10y' history has ~2515 trading days, fewer than the 2521 datapoints a TEN_YEARS daily beta requires:
+    DEFAULT_SETTINGS = {'period': AssessmentPeriod.TEN_YEARS, 'beta_period': AssessmentPeriod.THREE_YEARS,
+                        'risk_free_rate': 0.0, 'terminal_growth_rate': 0.02, 'prediction_years': 10,
+                        'margin_of_safety_pct': 0.2, 'price_period': '10y'}
+
+    # Columns of a result row (see 'value_company'):
+    RESULT_COLUMNS = ['ticker', 'exchange', 'identifier', 'company_type', 'company_region', 'growth_points',
+                      'median_value_points', 'f_score', 'f_score_criteria', 'beta', 'discount_rate',
+                      'discount_rate_nan_reason', 'growth_rate', 'intrinsic_value_dcf', 'dividends_growth_rate',
+                      'intrinsic_value_ddm', 'latest_price', 'intrinsic_value_after_mos', 'undervalued', 'momentum',
+                      'dividend_yield', 'hrlr_score', 'error']
+
+    def __init__(self):
+        raise NotImplementedError("This class should not be instantiated.")
+
+    @staticmethod
+    def parse_ticker(line, company_type=CompanyType.NON_FINANCIAL, company_region=CompanyRegion.NORTH_AMERICA):
+        """Function to parse a ticker definition '<EXCHANGE>:<TICKER>[,<COMPANY TYPE>[,<COMPANY REGION>]]', e.g.
+        'XNAS:INTC' or 'XNAS:INTC,NON_FINANCIAL,NORTH_AMERICA' (enum names). Returns a task dictionary or None, if
+        the definition is invalid."""
+        fields = [field.strip() for field in line.split(',')]
+        if ':' not in fields[0]:
+            print(f"Invalid ticker definition '{line}' (expected '<EXCHANGE>:<TICKER>'). Skipped.")
+            return None
+
+        exchange_ticker, stock_ticker = fields[0].split(':', 1)
+        try:
+            if len(fields) > 1 and fields[1]:
+                company_type = CompanyType[fields[1].upper()]
+            if len(fields) > 2 and fields[2]:
+                company_region = CompanyRegion[fields[2].upper()]
+        except KeyError as error:
+            print(f"Invalid company type/ region {error} in '{line}'. Skipped.")
+            return None
+
+        return {'ticker': stock_ticker.upper(), 'exchange': exchange_ticker.upper(), 'company_type': company_type,
+                'company_region': company_region}
+
+    @staticmethod
+    def resolve_identifier(task, identifier_index=None, rate_limiter=None):
+        """Function to resolve the Morningstar identifier of a task (via the identifier index, if possible). Newly
+        resolved identifiers are added to the index, which is not saved (the caller saves it once per run)."""
+        if identifier_index is not None:
+            identifier = identifier_index.get(task['ticker'], task['exchange'])
+            if identifier is not None:
+                return identifier
+
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        identifier = MorningstarScraper.scrape_morningstar_stock_identifier(task['ticker'], task['exchange'])
+
+        if identifier_index is not None:
+            identifier_index.add(task['ticker'], task['exchange'], identifier)
+        return identifier
+
+    @staticmethod
+    def fetch_fundamentals(identifier, rate_limiter=None, cache=None):
+        """Function to scrape the payloads of all data categories (ordered like 'DataCategory'). Failed requests
+        yield None; all requests share the rate limiter."""
+        payloads = []
+        for category in DataCategory:
+            try:
+                payloads.append(MorningstarScraper.scrape_morningstar_data_subset(identifier, category, cache,
+                                                                                  rate_limiter))
+            except (requests.RequestException, ValueError) as error:
+                print(f"Request for '{identifier}' ({category.value}) failed: {error}")
+                payloads.append(None)
+        return payloads
+
+    @staticmethod
+    def fetch_prices(ticker, price_store=None, period='10y', rate_limiter=None):
+        """Function to get daily price data (DataFrame with column 'Adj Close'), via the price store, if given.
+        Every download acquires the rate limiter."""
+        if price_store is None:
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            return YahooFinanceScraper.scrape_price_data(ticker, period, DataInterval.ONE_DAY)
+
+        price_store.update(ticker, DataInterval.ONE_DAY, period, rate_limiter)
+        return price_store.get_price_data(ticker)
+
+    @staticmethod
+    def align_prices(stock_prices, benchmark_prices):
+        """Function to align stock and benchmark prices on their common dates. Returns two float64 arrays."""
+        aligned_prices = pd.concat([stock_prices['Adj Close'].rename('stock'),
+                                    benchmark_prices['Adj Close'].rename('benchmark')], axis=1, join='inner').dropna()
+        return aligned_prices['stock'].to_numpy(dtype='float64'), aligned_prices['benchmark'].to_numpy(dtype='float64')
+
+    @staticmethod
+    def create_result(task, identifier=None, error=None):
+        """Function to create a result row of a task with all values NaN."""
+        result = dict.fromkeys(PipelineStages.RESULT_COLUMNS, np.nan)
+        result.update({'ticker': task['ticker'], 'exchange': task['exchange'], 'identifier': identifier,
+                       'company_type': task['company_type'].name, 'company_region': task['company_region'].name,
+                       'discount_rate_nan_reason': None, 'error': error})
+        return result
+
+    @staticmethod
+    def value_company(task, identifier, payloads, stock_prices, benchmark_prices, damodaran_tables, settings=None):
+        """Function to run all CPU-bound stages for one company: normalize & derive the fundamentals, score metrics,
+        Piotroski F-Score, beta, WACC, DCF/ DDM intrinsic values, assessment against the latest price and HRLR score.
+        Returns a result row (dictionary with the keys 'RESULT_COLUMNS'); values that cannot be computed are NaN."""
+        settings = dict(PipelineStages.DEFAULT_SETTINGS, **(settings or {}))
+        period = settings['period']
+        result = PipelineStages.create_result(task, identifier)
+
+        # Collect & derive fundamentals:
+        if payloads is None or all(payload is None for payload in payloads):
+            result['error'] = 'no fundamentals'
+            return result
+        panel, base_values = PanelNormalizer.normalize({task['ticker']: payloads})
+        if len(panel.years) == 0:
+            result['error'] = 'no fiscal years'
+            return result
+        panel = DatabaseUtils.derive_panel_values(panel, base_values)
+
+        # Score metrics:
+        growth_points, median_value_points = Evaluator.assess_metrics_panel(panel)
+        result['growth_points'] = int(growth_points['total'].iloc[0])
+        result['median_value_points'] = int(median_value_points['total'].iloc[0])
+
+        f_scores = Evaluator.get_piotroski_f_scores(panel)
+        if f_scores is not None:
+            result['f_score'] = int(f_scores[0][0])
+            result['f_score_criteria'] = int(f_scores[1][0])
+
+        # Beta & WACC:
+        beta = np.nan
+        if stock_prices is not None and benchmark_prices is not None and len(stock_prices) > 0:
+            aligned_stock_prices, aligned_benchmark_prices = PipelineStages.align_prices(stock_prices,
+                                                                                        benchmark_prices)
+            beta = np.asarray(BetaEstimator.estimate_betas(aligned_stock_prices, aligned_benchmark_prices,
+                                                           settings['beta_period'], DataFrequency.DAILY)).item()
+        result['beta'] = beta
+
+        spreads_nonfinancials, spreads_financials, risk_premiums = damodaran_tables
+        discount_rates = DiscountRateEstimator.estimate_discount_rates(
+            panel, spreads_nonfinancials, spreads_financials, risk_premiums, settings['risk_free_rate'], [beta],
+            [task['company_type']], [task['company_region']], period)
+        discount_rate = discount_rates['discount_rate'].iloc[0]
+        result['discount_rate'] = discount_rate
+        result['discount_rate_nan_reason'] = discount_rates['nan_reason'].iloc[0]
+
+        # Intrinsic values (DCF via free cash flow, DDM via dividends):
+        free_cash_flows = panel.metric('free_cash_flow_mil')[0]
+        growth_rate = GrowthRateCalculator.calculate_median_cagr(free_cash_flows, period)
+        current_shares = panel.metric('shares_mil')[0, -1]
+        result['growth_rate'] = growth_rate
+        if not np.isnan(discount_rate):
+            intrinsic_values = IntrinsicValueEstimator.apply_discounted_cash_flow_model_grid(
+                free_cash_flows, current_shares, [growth_rate], [discount_rate], [settings['terminal_growth_rate']],
+                [settings['prediction_years']])
+            if isinstance(intrinsic_values, SensitivitySurface):
+                result['intrinsic_value_dcf'] = intrinsic_values.values.item()
+
+        dividends = panel.metric('dividends')[0]
+        dividends_growth_rate = GrowthRateCalculator.calculate_median_cagr(dividends, period)
+        result['dividends_growth_rate'] = dividends_growth_rate
+        if not np.isnan(discount_rate) and not np.isnan(dividends_growth_rate):
+            intrinsic_values = IntrinsicValueEstimator.apply_discounted_dividends_model(
+                pd.Series(dividends), 'median', dividends_growth_rate, [discount_rate],
+                settings['terminal_growth_rate'], settings['prediction_years'])
+            if isinstance(intrinsic_values, pd.DataFrame):
+                result['intrinsic_value_ddm'] = intrinsic_values.iloc[0, 0]
+
+        # Assess intrinsic value & HRLR score:
+        if stock_prices is not None and len(stock_prices) > 0:
+            result['latest_price'] = float(stock_prices['Adj Close'].iloc[-1])
+            result['intrinsic_value_after_mos'] = result['intrinsic_value_dcf'] * (1 - settings['margin_of_safety_pct'])
+            # Undecided (None), if the company could not be valued:
+            if not np.isnan(result['latest_price']) and not np.isnan(result['intrinsic_value_after_mos']):
+                result['undervalued'] = bool(result['latest_price'] < result['intrinsic_value_after_mos'])
+            else:
+                result['undervalued'] = None
+
+            if benchmark_prices is not None:
+                hrlr_scores = Evaluator.get_hrlr_scores(aligned_stock_prices, aligned_benchmark_prices,
+                                                        [np.nan if len(dividends) == 0 else dividends[-1]])
+                result['momentum'] = hrlr_scores['momentum'].iloc[0]
+                result['dividend_yield'] = hrlr_scores['dividend_yield'].iloc[0]
+                result['hrlr_score'] = int(hrlr_scores['score'].iloc[0])
+
+        return result
@@ -0,0 +1,179 @@
+import csv
+import json
+import math
+import os
+import queue
+import threading
+import time
+
+from src.pipeline.pipeline_stages import PipelineStages
+from src.utils.rate_limiter import RateLimiter
+
+class ResultWriter:
+    """Incremental writer of result rows (see 'PipelineStages.RESULT_COLUMNS'). Every row is flushed right away, so
+    results of a long run are available (and survive an abort) while the run is still in progress. The format is
+    JSON lines for '.jsonl' files, CSV otherwise."""
+
+    def __init__(self, output_path, columns=None):
+        self.output_path = output_path
+        self.columns = PipelineStages.RESULT_COLUMNS if columns is None else columns
+        self.json_lines = output_path.endswith('.jsonl')
+        self.number_of_rows = 0
+
+        directory = os.path.dirname(os.path.abspath(output_path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(output_path, 'w', encoding='utf-8', newline='')
+        if not self.json_lines:
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction='ignore')
+            self._writer.writeheader()
+
+    def write(self, row):
+        if self.json_lines:
+            # NaN is not valid JSON, write null instead:
+            row = {column: None if isinstance(row.get(column), float) and math.isnan(row[column]) else row.get(column)
+                   for column in self.columns}
+            self._file.write(json.dumps(row) + '\n')
+        else:
+            self._writer.writerow(row)
+        self._file.flush()
+        self.number_of_rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ScreeningPipeline:
+    """Streaming screening pipeline: fetch workers (I/O-bound: resolve identifier, scrape fundamentals, download
+    prices) feed valuation workers (CPU-bound: 'PipelineStages.value_company') via a bounded queue, which feed one
+    writer via another bounded queue. Fetching ticker N+1 overlaps with the valuation of ticker N; the bounded queues
+    keep memory constant (fetch workers wait, if valuation falls behind)."""
+
+    # Marks the end of a queue's stream:
+    END_OF_STREAM = None
+
+    def __init__(self, damodaran_tables, benchmark_prices, settings=None, identifier_index=None, cache=None,
+                 price_store=None, requests_per_second=1.0, number_of_fetch_workers=8, number_of_valuation_workers=1,
+                 queue_size=16):
+        self.damodaran_tables = damodaran_tables
+        self.benchmark_prices = benchmark_prices
+        self.settings = dict(PipelineStages.DEFAULT_SETTINGS, **(settings or {}))
+        self.identifier_index = identifier_index
+        self.cache = cache
+        self.price_store = price_store
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.number_of_fetch_workers = number_of_fetch_workers
+        self.number_of_valuation_workers = number_of_valuation_workers
+        self.queue_size = queue_size
+        self.statistics = {'tickers': 0, 'valued': 0, 'failed': 0}
+        self._statistics_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._statistics_lock:
+            self.statistics[key] += 1
+
+    def fetch(self, task):
+        """Function to run the I/O-bound stages for one task. Returns (task, identifier, payloads, prices, error)."""
+        try:
+            identifier = PipelineStages.resolve_identifier(task, self.identifier_index, self.rate_limiter)
+            payloads = PipelineStages.fetch_fundamentals(identifier, self.rate_limiter, self.cache)
+            prices = PipelineStages.fetch_prices(task['ticker'], self.price_store, self.settings['price_period'],
+                                                 self.rate_limiter)
+            return task, identifier, payloads, prices, None
+        except Exception as error:
+            return task, None, None, None, 'fetch failed: {}'.format(error)
+
+    def value(self, fetched):
+        """Function to run the CPU-bound stages for one fetched task. Returns a result row."""
+        task, identifier, payloads, prices, error = fetched
+        if error is None:
+            try:
+                return PipelineStages.value_company(task, identifier, payloads, prices, self.benchmark_prices,
+                                                    self.damodaran_tables, self.settings)
+            except Exception as valuation_error:
+                error = 'valuation failed: {}'.format(valuation_error)
+
+        return PipelineStages.create_result(task, identifier, error)
+
+    def run(self, tasks, output_path):
+        """Function to screen all tasks (see 'PipelineStages.parse_ticker') and write one result row per task to
+        'output_path' (in order of completion). Returns the run's statistics. An exception of the result writer is
+        raised once all workers finished (the remaining results are drained, so no worker blocks)."""
+        self.statistics = {'tickers': 0, 'valued': 0, 'failed': 0}
+        task_queue = queue.Queue()
+        fetched_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+
+        for task in tasks:
+            task_queue.put(task)
+            self.statistics['tickers'] += 1
+        for worker in range(self.number_of_fetch_workers):
+            task_queue.put(ScreeningPipeline.END_OF_STREAM)
+
+        def fetch_worker():
+            while True:
+                task = task_queue.get()
+                if task is ScreeningPipeline.END_OF_STREAM:
+                    return
+                fetched_queue.put(self.fetch(task))
+
+        def valuation_worker():
+            while True:
+                fetched = fetched_queue.get()
+                if fetched is ScreeningPipeline.END_OF_STREAM:
+                    return
+                result_queue.put(self.value(fetched))
+
+        writer_errors = []
+
+        def write_results(writer):
+            while True:
+                result = result_queue.get()
+                if result is ScreeningPipeline.END_OF_STREAM:
+                    return
+                # After a failed write, keep draining the queue (otherwise the upstream workers block forever):
+                if writer_errors:
+                    continue
+                try:
+                    writer.write(result)
+                except Exception as error:
+                    writer_errors.append(error)
+                    continue
+                self._count('valued' if result['error'] is None else 'failed')
+
+        start_time = time.perf_counter()
+        number_of_identifiers = 0 if self.identifier_index is None else len(self.identifier_index)
+
+        with ResultWriter(output_path) as writer:
+            writer_thread = threading.Thread(target=write_results, args=(writer,), daemon=True)
+            fetch_threads = [threading.Thread(target=fetch_worker, daemon=True)
+                             for worker in range(self.number_of_fetch_workers)]
+            valuation_threads = [threading.Thread(target=valuation_worker, daemon=True)
+                                 for worker in range(self.number_of_valuation_workers)]
+            for thread in [writer_thread] + fetch_threads + valuation_threads:
+                thread.start()
+
+            # Close the stages one after another (every stage ends, once its input stream ended):
+            for thread in fetch_threads:
+                thread.join()
+            for worker in range(self.number_of_valuation_workers):
+                fetched_queue.put(ScreeningPipeline.END_OF_STREAM)
+            for thread in valuation_threads:
+                thread.join()
+            result_queue.put(ScreeningPipeline.END_OF_STREAM)
+            writer_thread.join()
+
+        # Save newly resolved identifiers once per run (also if writing failed):
+        if self.identifier_index is not None and len(self.identifier_index) > number_of_identifiers:
+            self.identifier_index.save()
+
+        if writer_errors:
+            raise writer_errors[0]
+
+        self.statistics['seconds'] = time.perf_counter() - start_time
+        return self.statistics
@@ -0,0 +1,184 @@
+import pandas as pd
+import numpy as np
+
+from src.beta.beta_estimator import BetaEstimator
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.scoring_rules import ScoringRuleSet
+from src.intrinsic_value.discount_rate_estimator import DiscountRateEstimator
+from src.intrinsic_value.growth_rate_calculator import GrowthRateCalculator
+from src.intrinsic_value.intrinsic_value_estimator import IntrinsicValueEstimator
+from src.pipeline.pipeline_stages import PipelineStages
+from src.utils.calculation_utils import CalculationUtils
+from src.utils.computation_graph import ComputationGraph
+from src.utils.data_frequency import DataFrequency
+
+class ValuationGraph:
+    """Universe valuation as memoized computation graph (see 'ComputationGraph'):
+
+        fundamentals panel -> medians/ CAGRs -> metric scores, Piotroski F-Scores
+        fundamentals panel + Damodaran tables + WACC betas -> discount rates (WACC) -> intrinsic values (DCF)
+        prices -> betas, HRLR scores, latest prices -> assessment (latest price vs. intrinsic value after MoS)
+
+    The WACC uses the separate input 'wacc_betas' (refreshed explicitly via 'update_wacc_betas'), hence a daily
+    price refresh ('update_prices') recomputes only the price-dependent nodes of the whole universe, while
+    medians, CAGRs, WACCs and intrinsic values are reused until the fundamentals (or settings) change."""
+
+    def __init__(self, panel, damodaran_tables, stock_prices, benchmark_prices, company_types, company_regions,
+                 settings=None, wacc_betas=None):
+        self.graph = ComputationGraph()
+        settings = dict(PipelineStages.DEFAULT_SETTINGS, **(settings or {}))
+        for name in ['period', 'beta_period', 'risk_free_rate', 'terminal_growth_rate', 'prediction_years',
+                     'margin_of_safety_pct']:
+            self.graph.set_input(name, settings[name])
+
+        self.update_fundamentals(panel, company_types, company_regions, damodaran_tables)
+        self.update_prices(stock_prices, benchmark_prices)
+        self.update_wacc_betas(wacc_betas)
+        ValuationGraph.add_nodes(self.graph)
+
+    @staticmethod
+    def add_nodes(graph):
+        # Fundamentals:
+        graph.add_node('median_growth_rates', CalculationUtils.calculate_median_growth_rates_panel, ['panel'])
+        graph.add_node('median_values', CalculationUtils.calculate_median_values_panel, ['panel'])
+        graph.add_node('metric_scores', ValuationGraph.score_metrics,
+                       ['tickers', 'median_growth_rates', 'median_values'])
+        graph.add_node('f_scores', Evaluator.get_piotroski_f_scores, ['panel'])
+        graph.add_node('growth_rates', ValuationGraph.calculate_growth_rates, ['panel', 'period'])
+        graph.add_node('latest_dividends', ValuationGraph.get_latest_dividends, ['panel'])
+
+        # Discount rates & intrinsic values (fundamentals, WACC betas & settings):
+        graph.add_node('discount_rates', DiscountRateEstimator.estimate_discount_rates,
+                       ['panel', 'spreads_nonfinancials', 'spreads_financials', 'risk_premiums', 'risk_free_rate',
+                        'wacc_betas', 'company_types', 'company_regions', 'period'])
+        graph.add_node('intrinsic_values', ValuationGraph.estimate_intrinsic_values,
+                       ['panel', 'discount_rates', 'growth_rates', 'terminal_growth_rate', 'prediction_years'])
+
+        # Prices:
+        graph.add_node('aligned_prices', ValuationGraph.align_prices, ['tickers', 'stock_prices', 'benchmark_prices'])
+        graph.add_node('betas', ValuationGraph.estimate_betas, ['aligned_prices', 'beta_period'])
+        graph.add_node('hrlr_scores', ValuationGraph.get_hrlr_scores, ['aligned_prices', 'latest_dividends'])
+        graph.add_node('assessment', ValuationGraph.assess_intrinsic_values,
+                       ['aligned_prices', 'intrinsic_values', 'margin_of_safety_pct'])
+
+        graph.add_node('results', ValuationGraph.combine_results,
+                       ['metric_scores', 'f_scores', 'discount_rates', 'growth_rates', 'intrinsic_values', 'betas',
+                        'hrlr_scores', 'assessment'])
+
+    def update_fundamentals(self, panel, company_types=None, company_regions=None, damodaran_tables=None):
+        """Function to set new fundamentals (and optionally company types/ regions and Damodaran tables)."""
+        self.graph.set_input('panel', panel)
+        self.graph.set_input('tickers', list(panel.tickers))
+        if company_types is not None:
+            self.graph.set_input('company_types', list(company_types))
+        if company_regions is not None:
+            self.graph.set_input('company_regions', list(company_regions))
+        if damodaran_tables is not None:
+            for name, table in zip(['spreads_nonfinancials', 'spreads_financials', 'risk_premiums'],
+                                   damodaran_tables):
+                self.graph.set_input(name, table)
+
+    def update_prices(self, stock_prices, benchmark_prices=None):
+        """Function to set new prices ('stock_prices': observations x tickers; 'benchmark_prices': DataFrame with
+        column 'Adj Close'). Only price-dependent nodes are recomputed."""
+        self.graph.set_input('stock_prices', stock_prices)
+        if benchmark_prices is not None:
+            self.graph.set_input('benchmark_prices', benchmark_prices)
+
+    def update_wacc_betas(self, wacc_betas=None):
+        """Function to set the betas used for the WACC (default: betas of the current prices). Recomputes discount
+        rates and intrinsic values on the next evaluation, if the betas changed."""
+        if wacc_betas is None:
+            wacc_betas = ValuationGraph.estimate_betas(
+                ValuationGraph.align_prices(self.graph.get('tickers'), self.graph.get('stock_prices'),
+                                            self.graph.get('benchmark_prices')),
+                self.graph.get('beta_period'))
+        self.graph.set_input('wacc_betas', np.asarray(wacc_betas, dtype='float64'))
+
+    def get(self, name):
+        return self.graph.get(name)
+
+    def results(self):
+        """Function to get the results table (one row per ticker)."""
+        return self.graph.get('results')
+
+    @staticmethod
+    def score_metrics(tickers, median_growth_rates, median_values):
+        growth_points = ScoringRuleSet.default_growth_rate_rules(CalculationUtils.GROWTH_RATE_METRICS).evaluate(
+            median_growth_rates, CalculationUtils.GROWTH_RATE_METRICS)
+        median_value_points = ScoringRuleSet.default_median_value_rules().evaluate(
+            median_values, CalculationUtils.MEDIAN_VALUE_METRICS)
+        return pd.DataFrame({'growth_points': growth_points.sum(axis=1),
+                             'median_value_points': median_value_points.sum(axis=1)}, index=tickers)
+
+    @staticmethod
+    def calculate_growth_rates(panel, period):
+        # Median CAGR of the free cash flow (DCF growth rate):
+        return GrowthRateCalculator.calculate_median_cagrs(panel.metric('free_cash_flow_mil'), [period])[:, 0]
+
+    @staticmethod
+    def get_latest_dividends(panel):
+        return panel.metric('dividends')[:, -1].copy()
+
+    @staticmethod
+    def estimate_intrinsic_values(panel, discount_rates, growth_rates, terminal_growth_rate, prediction_years):
+        """Function to estimate the DCF intrinsic value per share of every ticker at its own discount and growth
+        rate (see 'IntrinsicValueEstimator.apply_discounted_cash_flow_model': median free cash flow as base)."""
+        return IntrinsicValueEstimator.apply_discounted_cash_flow_model_per_ticker(
+            panel.metric('free_cash_flow_mil'), panel.metric('shares_mil')[:, -1], growth_rates,
+            discount_rates['discount_rate'].to_numpy(dtype='float64'), terminal_growth_rate, prediction_years)
+
+    @staticmethod
+    def align_prices(tickers, stock_prices, benchmark_prices):
+        """Function to align the stock prices (columns ordered like 'tickers') and benchmark prices on their common
+        dates."""
+        stock_prices = stock_prices.reindex(columns=tickers)
+        benchmark = benchmark_prices['Adj Close'] if isinstance(benchmark_prices, pd.DataFrame) else benchmark_prices
+        common_dates = stock_prices.index.intersection(benchmark.index)
+        return stock_prices.loc[common_dates], benchmark.loc[common_dates].to_numpy(dtype='float64')
+
+    @staticmethod
+    def estimate_betas(aligned_prices, beta_period):
+        stock_prices, benchmark_prices = aligned_prices
+        betas = BetaEstimator.estimate_betas(stock_prices, benchmark_prices, beta_period, DataFrequency.DAILY)
+        return np.broadcast_to(np.asarray(betas, dtype='float64'), (stock_prices.shape[1],)).copy()
+
+    @staticmethod
+    def get_hrlr_scores(aligned_prices, latest_dividends):
+        stock_prices, benchmark_prices = aligned_prices
+        return Evaluator.get_hrlr_scores(stock_prices, benchmark_prices, latest_dividends)
+
+    @staticmethod
+    def assess_intrinsic_values(aligned_prices, intrinsic_values, margin_of_safety_pct):
+        """Vectorized variant of 'Evaluator.assess_intrinsic_value': latest price vs. intrinsic value after margin
+        of safety of every ticker."""
+        stock_prices, _ = aligned_prices
+        latest_prices = stock_prices.iloc[-1].to_numpy(dtype='float64') if len(stock_prices) > 0 \
+            else np.full(stock_prices.shape[1], np.nan)
+        intrinsic_values_after_mos = intrinsic_values * (1 - margin_of_safety_pct)
+
+        # Undecided (None), if the latest price or intrinsic value is NaN:
+        undervalued = np.where(np.isnan(latest_prices) | np.isnan(intrinsic_values_after_mos), None,
+                               latest_prices < intrinsic_values_after_mos)
+
+        return pd.DataFrame({'latest_price': latest_prices, 'intrinsic_value_after_mos': intrinsic_values_after_mos,
+                             'difference': intrinsic_values_after_mos - latest_prices,
+                             'undervalued': undervalued}, index=stock_prices.columns)
+
+    @staticmethod
+    def combine_results(metric_scores, f_scores, discount_rates, growth_rates, intrinsic_values, betas, hrlr_scores,
+                        assessment):
+        results = metric_scores.copy()
+        if f_scores is not None:
+            results['f_score'], results['f_score_criteria'] = f_scores
+        results['beta'] = betas
+        results['discount_rate'] = discount_rates['discount_rate'].to_numpy()
+        results['discount_rate_nan_reason'] = discount_rates['nan_reason'].to_numpy()
+        results['growth_rate'] = growth_rates
+        results['intrinsic_value_dcf'] = intrinsic_values
+        for column in ['latest_price', 'intrinsic_value_after_mos', 'difference', 'undervalued']:
+            results[column] = assessment[column].to_numpy()
+        for column in ['momentum', 'dividend_yield']:
+            results[column] = hrlr_scores[column].to_numpy()
+        results['hrlr_score'] = hrlr_scores['score'].to_numpy()
+        return results
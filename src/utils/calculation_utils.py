@@ -1,9 +1,19 @@
+import warnings
 import pandas as pd
 import numpy as np
 from src.intrinsic_value.growth_rate_calculator import GrowthRateCalculator
 from src.utils.assessment_period import AssessmentPeriod
 
 class CalculationUtils:
+    # Metrics assessed via median growth rates/ median values (see 'Evaluator.assess_metrics'):
+    GROWTH_RATE_METRICS = ['revenue_mil', 'operating_income_mil', 'net_income_mil', 'eps', 'dividends', 'bvps',
+                           'operating_cash_flow_mil', 'free_cash_flow_mil', 'capex_mil']
+    MEDIAN_VALUE_METRICS = ['payout_ratio', 'interest_coverage_ratio', 'operating_margin_pct', 'net_margin_pct',
+                            'gross_margin_pct', 'return_on_equity_pct', 'return_on_assets_pct',
+                            'return_on_invested_capital_pct', 'free_cash_flow_to_revenue', 'current_ratio',
+                            'debt_to_equity_ratio']
+    PERIOD_LABELS = ['10Y', '3Y', '1Y']
+
     def __init__(self):
         raise NotImplementedError("This class should not be instantiated.")
 
@@ -19,39 +29,42 @@ class CalculationUtils:
         else:
             return np.nan
 
+    @staticmethod
+    def compute_median_array(values, axis=-1):
+        """Vectorized variant of 'compute_median' along one axis: NaN, if more than 50% of datapoints are NaN."""
+        values = np.asarray(values, dtype='float64')
+        number_of_values = values.shape[axis]
+        nan_counts = np.isnan(values).sum(axis=axis)
+
+        with warnings.catch_warnings():
+            # All-NaN slices are masked anyway:
+            warnings.simplefilter('ignore', category=RuntimeWarning)
+            medians = np.nanmedian(values, axis=axis) if number_of_values > 0 else np.full(nan_counts.shape, np.nan)
+
+        return np.where(nan_counts < number_of_values * 0.5, medians, np.nan)
+
     @staticmethod
     def calculate_median_growth_rates(dataset):
         # Define growth rate metrics:
-        relevant_metrics = ['revenue_mil', 'operating_income_mil', 'net_income_mil', 'eps', 'dividends', 'bvps',
-                            'operating_cash_flow_mil', 'free_cash_flow_mil', 'capex_mil']
+        relevant_metrics = CalculationUtils.GROWTH_RATE_METRICS
 
         # Define assessment periods (last period = 9, because only 9 growth rates for a 10 year period are available):
         assessment_periods = [p for p in AssessmentPeriod]
 
-        # Create dictionary to collect metric name and corresponding values:
-        results = {key: [] for key in relevant_metrics}
+        # Create matrix containing the metrics' values (capex is negative, hence the sign is flipped):
+        metric_values = np.array([np.asarray(dataset[metric], dtype='float64') for metric in relevant_metrics])
+        metric_values[relevant_metrics.index('capex_mil')] *= -1
 
-        for metric in relevant_metrics:
-            # Create series containing the metric's values:
-            if metric == "capex_mil":
-                metric_series = dataset[metric] * (-1)
-            else:
-                metric_series = dataset[metric]
-
-            for period in assessment_periods[::-1]:
-                # Compute compound annual growth rate (CAGR) & append median CAGR to dictionary:
-                results[metric].append(GrowthRateCalculator.calculate_median_cagr(metric_series, period))
+        # Compute median compound annual growth rates (CAGR) of all metrics and periods at once:
+        results = GrowthRateCalculator.calculate_median_cagrs(metric_values, assessment_periods[::-1])
 
         # Return results as dataframe:
-        return pd.DataFrame(results.values(), index=results.keys(), columns=['10Y', '3Y', '1Y'])
+        return pd.DataFrame(results, index=relevant_metrics, columns=CalculationUtils.PERIOD_LABELS)
 
     @staticmethod
     def calculate_median_values(dataset):
         # Define growth rate metrics:
-        relevant_metrics = ['payout_ratio', 'interest_coverage_ratio', 'operating_margin_pct', 'net_margin_pct',
-                            'gross_margin_pct', 'return_on_equity_pct', 'return_on_assets_pct',
-                            'return_on_invested_capital_pct', 'free_cash_flow_to_revenue', 'current_ratio',
-                            'debt_to_equity_ratio']
+        relevant_metrics = CalculationUtils.MEDIAN_VALUE_METRICS
 
         # Define assessment periods:
         assessment_periods = [p for p in AssessmentPeriod]
@@ -68,4 +81,32 @@ class CalculationUtils:
                 results[metric].append(CalculationUtils.compute_median(metric_series[-period.value:]))
 
         # Return results as dataframe:
-        return pd.DataFrame(results.values(), index=results.keys(), columns=['10Y', '3Y', '1Y'])
\ No newline at end of file
+        return pd.DataFrame(results.values(), index=results.keys(), columns=CalculationUtils.PERIOD_LABELS)
+
+    @staticmethod
+    def calculate_median_growth_rates_panel(panel):
+        """Panel variant of 'calculate_median_growth_rates' for all tickers of a 'FundamentalsPanel' at once.
+        Returns an array tickers x metrics ('GROWTH_RATE_METRICS') x periods ('PERIOD_LABELS')."""
+        metric_values = panel.values[:, panel.metric_indices(CalculationUtils.GROWTH_RATE_METRICS), :].copy()
+        metric_values[:, CalculationUtils.GROWTH_RATE_METRICS.index('capex_mil'), :] *= -1
+
+        return GrowthRateCalculator.calculate_median_cagrs(metric_values, [p for p in AssessmentPeriod][::-1])
+
+    @staticmethod
+    def calculate_median_values_panel(panel):
+        """Panel variant of 'calculate_median_values' for all tickers of a 'FundamentalsPanel' at once (median
+        along the year axis, NaN if more than 50% of datapoints are NaN).
+        Returns an array tickers x metrics ('MEDIAN_VALUE_METRICS') x periods ('PERIOD_LABELS')."""
+        metric_values = panel.values[:, panel.metric_indices(CalculationUtils.MEDIAN_VALUE_METRICS), :]
+        assessment_periods = [p for p in AssessmentPeriod][::-1]
+
+        return np.stack([CalculationUtils.compute_median_array(metric_values[..., -period.value:])
+                         for period in assessment_periods], axis=-1)
+
+    @staticmethod
+    def convert_panel_results_to_dataframe(results, tickers, metrics):
+        """Convert a tickers x metrics x periods array (see '..._panel' functions) to a dataframe indexed by
+        (ticker, metric) with one column per period."""
+        index = pd.MultiIndex.from_product([tickers, metrics], names=['ticker', 'metric'])
+        return pd.DataFrame(np.asarray(results).reshape(len(tickers) * len(metrics), -1), index=index,
+                            columns=CalculationUtils.PERIOD_LABELS)
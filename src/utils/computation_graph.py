@@ -0,0 +1,120 @@
+import enum
+import hashlib
+import threading
+import pandas as pd
+import numpy as np
+
+class ComputationGraph:
+    """Memoized computation graph. Inputs are set via 'set_input'; nodes are functions of inputs and other nodes.
+    Every input carries a fingerprint of its content, every node the fingerprint of its function and the
+    fingerprints of its inputs. A node is only recomputed, if its fingerprint changed, i.e. if at least one of its
+    (direct or indirect) inputs changed; everything else is served from the memo."""
+
+    def __init__(self):
+        self._inputs = {}
+        self._nodes = {}
+        self._memo = {}
+        self._lock = threading.RLock()
+        self.statistics = {'computed': 0, 'reused': 0}
+        # Number of computations per node:
+        self.computation_counts = {}
+
+    @staticmethod
+    def fingerprint(value):
+        """Function to compute a content fingerprint of a value (arrays, DataFrames/ Series, objects with 'values'
+        and labels like 'FundamentalsPanel', containers and scalars)."""
+        digest = hashlib.sha1()
+
+        def update(value):
+            if isinstance(value, np.ndarray):
+                array = np.ascontiguousarray(value)
+                digest.update('ndarray{}{}'.format(array.dtype.str, array.shape).encode('utf-8'))
+                if array.dtype.hasobject:
+                    update(array.tolist())
+                else:
+                    digest.update(array.tobytes())
+            elif isinstance(value, (pd.DataFrame, pd.Series)):
+                digest.update(type(value).__name__.encode('utf-8'))
+                update(list(value.columns) if isinstance(value, pd.DataFrame) else [value.name])
+                digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            elif isinstance(value, (list, tuple)):
+                digest.update('{}{}'.format(type(value).__name__, len(value)).encode('utf-8'))
+                for item in value:
+                    update(item)
+            elif isinstance(value, dict):
+                digest.update('dict{}'.format(len(value)).encode('utf-8'))
+                for key in sorted(value, key=repr):
+                    update(key)
+                    update(value[key])
+            elif isinstance(value, enum.Enum):
+                digest.update(repr(value).encode('utf-8'))
+            elif hasattr(value, 'values') and hasattr(value, 'tickers'):
+                # Panels (see 'FundamentalsPanel'): values & labels
+                update(np.asarray(value.values))
+                update([list(getattr(value, labels, [])) for labels in ['tickers', 'metrics', 'years']])
+            else:
+                digest.update('{}:{!r}'.format(type(value).__name__, value).encode('utf-8'))
+
+        update(value)
+        return digest.hexdigest()
+
+    def set_input(self, name, value):
+        """Function to set (or replace) an input. Returns True, if the input's content changed."""
+        fingerprint = ComputationGraph.fingerprint(value)
+        with self._lock:
+            changed = name not in self._inputs or self._inputs[name][0] != fingerprint
+            self._inputs[name] = (fingerprint, value)
+        return changed
+
+    def add_node(self, name, function, inputs):
+        """Function to add a node computing 'function(*values of inputs)' (names of inputs or other nodes)."""
+        if name in self._inputs:
+            raise ValueError("'{}' is already an input.".format(name))
+        self._nodes[name] = (function, list(inputs))
+
+    def _node_fingerprint(self, name, input_fingerprints):
+        function, _ = self._nodes[name]
+        return hashlib.sha1('|'.join([name, function.__qualname__] + input_fingerprints).encode('utf-8')).hexdigest()
+
+    def _evaluate(self, name, in_progress=()):
+        """Function to evaluate an input/ node. Returns (fingerprint, value). 'in_progress' are the nodes currently
+        being evaluated (path from the requested node), used to detect cycles."""
+        if name in self._inputs:
+            return self._inputs[name]
+        if name not in self._nodes:
+            raise KeyError("Unknown input/ node '{}'.".format(name))
+        if name in in_progress:
+            cycle = list(in_progress[in_progress.index(name):]) + [name]
+            raise ValueError("Cycle in the computation graph: {}".format(' -> '.join(cycle)))
+
+        function, inputs = self._nodes[name]
+        evaluated_inputs = [self._evaluate(input_name, in_progress + (name,)) for input_name in inputs]
+        fingerprint = self._node_fingerprint(name, [input_fingerprint for input_fingerprint, _ in evaluated_inputs])
+
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == fingerprint:
+            self.statistics['reused'] += 1
+            return memo
+
+        self._memo[name] = (fingerprint, function(*[value for _, value in evaluated_inputs]))
+        self.statistics['computed'] += 1
+        self.computation_counts[name] = self.computation_counts.get(name, 0) + 1
+        return self._memo[name]
+
+    def get(self, name):
+        """Function to get the value of an input/ node (recomputing only nodes whose inputs changed)."""
+        with self._lock:
+            return self._evaluate(name)[1]
+
+    def is_current(self, name):
+        """Function to check whether a node's memoized value is up to date (i.e. 'get' would not recompute it)."""
+        with self._lock:
+            if name in self._inputs:
+                return True
+            _, inputs = self._nodes[name]
+            memo = self._memo.get(name)
+            if memo is None or not all(self.is_current(input_name) for input_name in inputs):
+                return False
+            fingerprint = self._node_fingerprint(name, [self._memo[input_name][0] if input_name in self._nodes
+                                                        else self._inputs[input_name][0] for input_name in inputs])
+            return memo[0] == fingerprint
@@ -1,51 +1,70 @@
 import pandas as pd
+import numpy as np
 from src.utils.excel_importer import ExcelImporter
+from src.utils.fundamentals_panel import FundamentalsPanel
 
 class DatabaseUtils:
+    # Base values (latest fiscal year) from which historical values are calculated via growth rates; see
+    # 'add_calculated_historical_values_to_dataset'
+    BASE_VALUE_METRICS = ['revenue', 'operating_income', 'net_income', 'eps', 'operating_cash_flow', 'free_cash_flow']
+
     def __init__(self):
         raise NotImplementedError("This class should not be instantiated.")
 
     @staticmethod
     def calculate_historical_values_via_growth_rates(base_value, growth_rates_series):
-        historical_values = [base_value]
+        return DatabaseUtils.calculate_historical_values_via_growth_rates_array(
+            base_value, np.asarray(growth_rates_series, dtype='float64')).tolist()
+
+    @staticmethod
+    def calculate_historical_values_via_growth_rates_array(base_values, growth_rates):
+        """Back-propagate base values (value of the last year) via growth rates in percent (last axis = years):
+        value[year] = base value / product of the growth factors of all later years.
+        Works for single series as well as for whole panels (e.g. tickers x years with one base value per ticker)."""
+        growth_rates = np.asarray(growth_rates, dtype='float64')
+        base_values = np.asarray(base_values, dtype='float64')
 
-        for gr in growth_rates_series[::-1]:
-            historical_value = historical_values[-1] / (1 + (gr / 100.0))
-            historical_values.append(historical_value)
-        historical_values = list(reversed(historical_values[:-1]))
+        if growth_rates.shape[-1] == 0:
+            return np.empty(growth_rates.shape)
 
-        return historical_values
+        # Product of the growth factors of all later years (reverse cumulative product, shifted by one year):
+        growth_factors = 1 + (growth_rates / 100.0)
+        later_growth_factors = np.ones(growth_rates.shape)
+        later_growth_factors[..., :-1] = np.cumprod(growth_factors[..., :0:-1], axis=-1)[..., ::-1]
+
+        return base_values[..., np.newaxis] / later_growth_factors
 
     @staticmethod
     def add_calculated_historical_values_to_dataset(metric_to_base_value, dataset):
-        for key, val in metric_to_base_value.items():
-            historical_values = DatabaseUtils.calculate_historical_values_via_growth_rates(val,
-                                                                                           dataset.loc[key + '_growth'])
-            historical_values_df = pd.DataFrame(historical_values, columns=[key + '_mil' if key != 'eps' else key],
-                                                index=dataset.columns)
-            dataset = pd.concat([dataset, historical_values_df.T], axis=0)
+        historical_values = {key + '_mil' if key != 'eps' else key:
+                             DatabaseUtils.calculate_historical_values_via_growth_rates(val,
+                                                                                        dataset.loc[key + '_growth'])
+                             for key, val in metric_to_base_value.items()}
 
-        return dataset
+        # Add all rows at once (instead of copying the dataset for every row):
+        historical_values_df = pd.DataFrame(historical_values.values(), index=historical_values.keys(),
+                                            columns=dataset.columns)
+        return pd.concat([dataset, historical_values_df], axis=0)
 
     @staticmethod
     def estimate_historical_capex_values(revenue_series, capex_as_pct_of_sales_series):
-        zipped_list = list(zip(list(revenue_series), list(capex_as_pct_of_sales_series)))
-        return [-(rev * capex_sales / 100.0) for (rev, capex_sales) in zipped_list]
+        return (-(np.asarray(revenue_series, dtype='float64') *
+                  np.asarray(capex_as_pct_of_sales_series, dtype='float64') / 100.0)).tolist()
 
     @staticmethod
     def estimate_historical_shares_values(free_cf_series, free_cf_to_shares_series):
-        zipped_list = list(zip(list(free_cf_series), list(free_cf_to_shares_series)))
-        return [free_cf / fcf_to_shares for (free_cf, fcf_to_shares) in zipped_list]
+        return (np.asarray(free_cf_series, dtype='float64') /
+                np.asarray(free_cf_to_shares_series, dtype='float64')).tolist()
 
     @staticmethod
     def estimate_historical_total_equity_values(book_values_per_share_series, shares_series):
-        zipped_list = list(zip(list(book_values_per_share_series), list(shares_series)))
-        return [bvps * shares for (bvps, shares) in zipped_list]
+        return (np.asarray(book_values_per_share_series, dtype='float64') *
+                np.asarray(shares_series, dtype='float64')).tolist()
 
     @staticmethod
     def estimate_historical_total_assets_values(return_on_assets_series, net_income_series):
-        zipped_list = list(zip(list(return_on_assets_series), list(net_income_series)))
-        return [net_income / (roa / 100.0) for (roa, net_income) in zipped_list]
+        return (np.asarray(net_income_series, dtype='float64') /
+                (np.asarray(return_on_assets_series, dtype='float64') / 100.0)).tolist()
 
     @staticmethod
     def estimate_historical_equity_ratio_values(book_values_per_share_series, shares_series, return_on_assets_series,
@@ -58,29 +77,55 @@ class DatabaseUtils:
         total_assets = DatabaseUtils.estimate_historical_total_assets_values(return_on_assets_series, net_income_series)
 
         # Third: divide total equity by total assets to determine equity ratio
-        return [(equity / assets) * 100.0 for (equity, assets) in list(zip(total_equity, total_assets))]
+        return ((np.asarray(total_equity) / np.asarray(total_assets)) * 100.0).tolist()
 
     @staticmethod
     def add_estimated_historical_values_to_dataset(dataset):
         estimated_capex_list = DatabaseUtils.estimate_historical_capex_values(dataset.loc['revenue_mil'],
                                                                               dataset.loc['capex_as_pct_of_sales'])
-        estimated_capex_df = pd.DataFrame(estimated_capex_list, columns=['capex_mil'], index=dataset.columns)
-        dataset = pd.concat([dataset, estimated_capex_df.T])
-
         estimated_shares_list = DatabaseUtils.estimate_historical_shares_values(dataset.loc['free_cash_flow_mil'],
                                                                                 dataset.loc['free_cash_flow_to_shares'])
-        estimated_shares_df = pd.DataFrame(estimated_shares_list, columns=['shares_mil'], index=dataset.columns)
-        dataset = pd.concat([dataset, estimated_shares_df.T])
-
         estimated_equity_ratios_list = DatabaseUtils.estimate_historical_equity_ratio_values(dataset.loc['bvps'],
-                                                                                             dataset.loc['shares_mil'],
+                                                                                             estimated_shares_list,
                                                                                              dataset.loc['return_on_assets_pct'],
                                                                                              dataset.loc['net_income_mil'])
-        estimated_equity_ratios_df = pd.DataFrame(estimated_equity_ratios_list, columns=['equity_ratio_pct'],
-                                                  index=dataset.columns)
-        dataset = pd.concat([dataset, estimated_equity_ratios_df.T])
 
-        return dataset
+        # Add all rows at once (instead of copying the dataset for every row):
+        estimated_values_df = pd.DataFrame([estimated_capex_list, estimated_shares_list, estimated_equity_ratios_list],
+                                           index=['capex_mil', 'shares_mil', 'equity_ratio_pct'],
+                                           columns=dataset.columns)
+        return pd.concat([dataset, estimated_values_df])
+
+    @staticmethod
+    def derive_panel_values(panel, base_values):
+        """Vectorized variant of 'add_calculated_historical_values_to_dataset' and
+        'add_estimated_historical_values_to_dataset' for a whole 'FundamentalsPanel'. 'base_values' has one row
+        per ticker and one column per entry of 'BASE_VALUE_METRICS' (DataFrame indexed by ticker, e.g. from
+        'PanelNormalizer.normalize', or array in ticker order). Returns a new panel including all derived metrics."""
+        if isinstance(base_values, pd.DataFrame):
+            base_values = base_values.reindex(index=panel.tickers, columns=DatabaseUtils.BASE_VALUE_METRICS)
+        base_values = np.asarray(base_values, dtype='float64')
+
+        # Historical values via growth rates (all base value metrics & tickers at once):
+        growth_rates = panel.values[:, panel.metric_indices([key + '_growth'
+                                                             for key in DatabaseUtils.BASE_VALUE_METRICS]), :]
+        historical_values = DatabaseUtils.calculate_historical_values_via_growth_rates_array(base_values, growth_rates)
+        historical_metrics = [key + '_mil' if key != 'eps' else key for key in DatabaseUtils.BASE_VALUE_METRICS]
+
+        def historical(metric):
+            return historical_values[:, historical_metrics.index(metric), :]
+
+        # Estimated values:
+        capex = -(historical('revenue_mil') * panel.metric('capex_as_pct_of_sales') / 100.0)
+        shares = historical('free_cash_flow_mil') / panel.metric('free_cash_flow_to_shares')
+        total_equity = panel.metric('bvps') * shares
+        total_assets = historical('net_income_mil') / (panel.metric('return_on_assets_pct') / 100.0)
+        equity_ratio = (total_equity / total_assets) * 100.0
+
+        values = np.concatenate([panel.values, historical_values, np.stack([capex, shares, equity_ratio], axis=1)],
+                                axis=1)
+        metrics = panel.metrics + historical_metrics + ['capex_mil', 'shares_mil', 'equity_ratio_pct']
+        return FundamentalsPanel(values, panel.tickers, metrics, panel.years)
 
     @staticmethod
     def create_complete_dataset(paths, metric_to_base_values):
@@ -1,4 +1,7 @@
+import functools
+import hashlib
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 from src.utils.data_category import DataCategory
@@ -8,9 +11,9 @@ class ExcelImporter:
         raise NotImplementedError("This class should not be instantiated.")
 
     @staticmethod
-    def import_xls_file(file_name, category, columns_to_remove):
+    def import_xls_file(file_name, category, columns_to_remove, data_directory="../data/"):
         """Read .xls file and return data as a pandas dataframe."""
-        file_path = os.path.join("../data/", file_name)
+        file_path = os.path.join(data_directory, file_name)
 
         if category.value == 'growth':
             df = pd.read_excel(file_path, header=0)
@@ -29,27 +32,115 @@ class ExcelImporter:
         return df.astype('float64')
 
     @staticmethod
-    def import_all_xls_files(file_names):
+    def determine_data_category(file_name):
+        """Determine data category and columns to remove of a Morningstar export by its file name.
+        Return None, if the file name does not match any data category."""
+        if 'growth' in file_name:
+            return DataCategory.GROWTH, []
+        elif 'operating' in file_name:
+            return DataCategory.OPERATING, ['Current', '5-Yr']
+        elif 'financial' in file_name:
+            return DataCategory.FINANCIAL_HEALTH, ['Latest Qtr']
+        elif 'cash' in file_name:
+            return DataCategory.CASH_FLOW, ['TTM']
+        elif 'dividends' in file_name:
+            return DataCategory.DIVIDENDS, []
+        return None
+
+    @staticmethod
+    def import_all_xls_files(file_names, data_directory="../data/"):
         """Read all .xls file and return data as a pandas dataframe."""
         dataframes = []
 
         for file_name in file_names:
-            if 'growth' in file_name:
-                dataframes.append(ExcelImporter.import_xls_file(file_name, DataCategory.GROWTH, []))
-            elif 'operating' in file_name:
-                dataframes.append(ExcelImporter.import_xls_file(file_name, DataCategory.OPERATING,
-                                                                   ['Current', '5-Yr']))
-            elif 'financial' in file_name:
-                dataframes.append(ExcelImporter.import_xls_file(file_name, DataCategory.FINANCIAL_HEALTH,
-                                                       ['Latest Qtr']))
-            elif 'cash' in file_name:
-                dataframes.append(ExcelImporter.import_xls_file(file_name, DataCategory.CASH_FLOW, ['TTM']))
-            elif 'dividends' in file_name:
-                dataframes.append(ExcelImporter.import_xls_file(file_name, DataCategory.DIVIDENDS, []))
+            category_and_columns = ExcelImporter.determine_data_category(file_name)
+            if category_and_columns is not None:
+                category, columns_to_remove = category_and_columns
+                dataframes.append(ExcelImporter.import_xls_file(file_name, category, columns_to_remove,
+                                                                data_directory))
 
         combined_df = pd.concat(dataframes)
         return combined_df
 
+    @staticmethod
+    def define_cache_path(file_path, cache_directory):
+        """Create cache file path of a parsed .xls file. The key includes the file's modification time and size,
+        so changed files are parsed again."""
+        file_stat = os.stat(file_path)
+        key = '|'.join([os.path.abspath(file_path), str(file_stat.st_mtime_ns), str(file_stat.st_size)])
+        return os.path.join(cache_directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.pkl')
+
+    @staticmethod
+    def import_xls_file_cached(file_name, category, columns_to_remove, data_directory, cache_directory):
+        """Read .xls file via the cache of parsed dataframes. Parse and cache it, if it is not cached yet."""
+        cache_path = ExcelImporter.define_cache_path(os.path.join(data_directory, file_name), cache_directory)
+
+        if os.path.exists(cache_path):
+            return pd.read_pickle(cache_path)
+
+        df = ExcelImporter.import_xls_file(file_name, category, columns_to_remove, data_directory)
+
+        # Write to temporary file first, so parallel imports never read incomplete cache files:
+        temporary_path = '{}.{}.tmp'.format(cache_path, os.getpid())
+        df.to_pickle(temporary_path)
+        os.replace(temporary_path, cache_path)
+        return df
+
+    @staticmethod
+    def import_all_xls_files_bulk(company_to_file_names, data_directory="../data/", cache_directory=None,
+                                  max_workers=None):
+        """Read the .xls files of many companies. Files are parsed in parallel across a process pool; with a cache
+        directory, parsed dataframes are cached, so unchanged files are loaded without parsing.
+        Return a dictionary mapping each company to its combined dataframe (see 'import_all_xls_files')."""
+        if cache_directory is not None:
+            os.makedirs(cache_directory, exist_ok=True)
+
+        # Collect all files to import (company, position, file name, category, columns to remove):
+        jobs = []
+        for company, file_names in company_to_file_names.items():
+            for file_name in file_names:
+                category_and_columns = ExcelImporter.determine_data_category(file_name)
+                if category_and_columns is not None:
+                    jobs.append((company, len(jobs), file_name) + category_and_columns)
+
+        dataframes = [None for job in jobs]
+        jobs_to_parse = []
+
+        # Load cached files directly (no need for a worker process):
+        for job in jobs:
+            company, position, file_name, category, columns_to_remove = job
+            if cache_directory is not None:
+                cache_path = ExcelImporter.define_cache_path(os.path.join(data_directory, file_name),
+                                                             cache_directory)
+                if os.path.exists(cache_path):
+                    dataframes[position] = pd.read_pickle(cache_path)
+                    continue
+            jobs_to_parse.append(job)
+
+        # Parse all remaining files in parallel:
+        if jobs_to_parse:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                futures = {}
+                for company, position, file_name, category, columns_to_remove in jobs_to_parse:
+                    if cache_directory is None:
+                        future = executor.submit(ExcelImporter.import_xls_file, file_name, category,
+                                                 columns_to_remove, data_directory)
+                    else:
+                        future = executor.submit(ExcelImporter.import_xls_file_cached, file_name, category,
+                                                 columns_to_remove, data_directory, cache_directory)
+                    futures[future] = position
+
+                for future in as_completed(futures):
+                    dataframes[futures[future]] = future.result()
+
+        # Combine dataframes per company (keeping the order of the file names):
+        company_to_dataframes = {company: [] for company in company_to_file_names}
+        for job in jobs:
+            company_to_dataframes[job[0]].append(dataframes[job[1]])
+
+        return {company: pd.concat(company_dataframes) for company, company_dataframes in company_to_dataframes.items()
+                if company_dataframes}
+
     @staticmethod
     def get_relevant_years(end_year):
         """Create list including 10 years and return it."""
@@ -113,10 +204,22 @@ class ExcelImporter:
     @staticmethod
     def import_spread_tables_excel(file_name):
         file_path = os.path.join("../data/", file_name)
-        return pd.read_excel(file_path, sheet_name=0, skiprows=17, header=0,nrows=15, usecols='A:D,F:I')
+        # Parsed tables are memoized per file version; return a copy, so callers can modify it:
+        return ExcelImporter.read_spread_tables_excel(file_path, os.path.getmtime(file_path)).copy()
 
     @staticmethod
     def import_risk_premiums_excel(file_name):
         file_path = os.path.join("../data/", file_name)
+        # Parsed tables are memoized per file version; return a copy, so callers can modify it:
+        return ExcelImporter.read_risk_premiums_excel(file_path, os.path.getmtime(file_path)).copy()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def read_spread_tables_excel(file_path, modification_time):
+        return pd.read_excel(file_path, sheet_name=0, skiprows=17, header=0,nrows=15, usecols='A:D,F:I')
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def read_risk_premiums_excel(file_path, modification_time):
         return pd.read_excel(file_path, sheet_name='Regional Simple Averages', skiprows=3, header=0, nrows=9,
-                             usecols='A,C')
\ No newline at end of file
+                             usecols='A,C')
@@ -0,0 +1,103 @@
+import pandas as pd
+import numpy as np
+
+class FundamentalsPanel:
+    """Ticker x metric x fiscal-year panel of fundamentals, stored as one float64 NumPy array
+    ('values[ticker, metric, year]'). Years are sorted ascending and stored as integers."""
+
+    def __init__(self, values, tickers, metrics, years):
+        values = np.asarray(values, dtype='float64')
+        if values.shape != (len(tickers), len(metrics), len(years)):
+            raise ValueError("Shape of 'values' does not match tickers/ metrics/ years.")
+
+        self.values = values
+        self.tickers = list(tickers)
+        self.metrics = list(metrics)
+        self.years = [int(year) for year in years]
+        self._ticker_positions = {ticker: position for position, ticker in enumerate(self.tickers)}
+        self._metric_positions = {metric: position for position, metric in enumerate(self.metrics)}
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def ticker_index(self, ticker):
+        return self._ticker_positions[ticker]
+
+    def metric_index(self, metric):
+        return self._metric_positions[metric]
+
+    def metric_indices(self, metrics):
+        return [self._metric_positions[metric] for metric in metrics]
+
+    def has_metric(self, metric):
+        return metric in self._metric_positions
+
+    def metric(self, metric):
+        """Function to return the values of one metric for all tickers (view with shape tickers x years)."""
+        return self.values[:, self._metric_positions[metric], :]
+
+    def select(self, tickers=None, metrics=None, years=None):
+        """Function to create a sub-panel."""
+        ticker_positions = list(range(len(self.tickers))) if tickers is None \
+            else [self._ticker_positions[ticker] for ticker in tickers]
+        metric_positions = list(range(len(self.metrics))) if metrics is None else self.metric_indices(metrics)
+        year_to_position = {year: position for position, year in enumerate(self.years)}
+        year_positions = list(range(len(self.years))) if years is None \
+            else [year_to_position[int(year)] for year in years]
+
+        values = self.values[np.ix_(ticker_positions, metric_positions, year_positions)]
+        return FundamentalsPanel(values, [self.tickers[p] for p in ticker_positions],
+                                 [self.metrics[p] for p in metric_positions], [self.years[p] for p in year_positions])
+
+    def dataset(self, ticker, transpose=False):
+        """Function to return one ticker's data in the dataset layout used throughout the project (metrics x years,
+        years as strings). With 'transpose' the layout of 'DatabaseUtils.transpose_dataset' is returned instead."""
+        dataset = pd.DataFrame(self.values[self._ticker_positions[ticker]], index=self.metrics,
+                               columns=[str(year) for year in self.years])
+        return dataset.T if transpose else dataset
+
+    def to_frame(self):
+        """Function to convert the panel to a DataFrame indexed by (ticker, fiscal_year) with one column per
+        metric."""
+        index = pd.MultiIndex.from_product([self.tickers, self.years], names=['ticker', 'fiscal_year'])
+        values = self.values.transpose(0, 2, 1).reshape(len(self.tickers) * len(self.years), len(self.metrics))
+        return pd.DataFrame(values, index=index, columns=self.metrics)
+
+    @staticmethod
+    def from_frame(frame):
+        """Function to create a panel from a DataFrame indexed by (ticker, fiscal_year) with one column per
+        metric. Missing (ticker, year) combinations are filled with NaN."""
+        tickers = list(dict.fromkeys(frame.index.get_level_values('ticker')))
+        years = sorted(set(int(year) for year in frame.index.get_level_values('fiscal_year')))
+        metrics = list(frame.columns)
+
+        values = np.full((len(tickers), len(metrics), len(years)), np.nan)
+        ticker_positions = pd.Index(tickers).get_indexer(frame.index.get_level_values('ticker'))
+        year_positions = pd.Index(years).get_indexer(frame.index.get_level_values('fiscal_year').astype('int64'))
+        values[ticker_positions, :, year_positions] = frame.to_numpy(dtype='float64')
+
+        return FundamentalsPanel(values, tickers, metrics, years)
+
+    @staticmethod
+    def from_datasets(ticker_to_dataset, metrics=None, years=None):
+        """Function to create a panel from datasets in the project's layout (metrics x years), e.g. the output of
+        'MorningstarScraper.combine_morningstar_data' or 'DatabaseUtils.create_complete_dataset'."""
+        if metrics is None:
+            metrics = list(dict.fromkeys(metric for dataset in ticker_to_dataset.values() for metric in dataset.index))
+        if years is None:
+            years = sorted(set(int(year) for dataset in ticker_to_dataset.values() for year in dataset.columns))
+
+        values = np.full((len(ticker_to_dataset), len(metrics), len(years)), np.nan)
+        metric_index = pd.Index(metrics)
+        year_index = pd.Index(years)
+
+        for ticker_position, dataset in enumerate(ticker_to_dataset.values()):
+            metric_positions = metric_index.get_indexer(dataset.index)
+            year_positions = year_index.get_indexer([int(year) for year in dataset.columns])
+            rows = metric_positions >= 0
+            columns = year_positions >= 0
+            values[ticker_position, metric_positions[rows][:, None], year_positions[columns][None, :]] = \
+                dataset.to_numpy(dtype='float64')[np.ix_(rows, columns)]
+
+        return FundamentalsPanel(values, list(ticker_to_dataset.keys()), metrics, years)
@@ -0,0 +1,45 @@
+import threading
+import time
+
+class RateLimiter:
+    """Thread-safe token bucket. Tokens are refilled continuously at 'requests_per_second' up to 'burst' tokens;
+    every request consumes one token and waits until a token is available."""
+
+    def __init__(self, requests_per_second, burst=1):
+        if requests_per_second <= 0:
+            raise ValueError("'requests_per_second' has to be positive.")
+        if burst < 1:
+            raise ValueError("'burst' has to be at least 1.")
+
+        self.requests_per_second = float(requests_per_second)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.requests_per_second)
+        self._last_refill = now
+
+    def try_acquire(self):
+        """Function to take a token without waiting. Returns True, if a token was available."""
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    def acquire(self):
+        """Function to block until a token is available and take it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_time = (1.0 - self._tokens) / self.requests_per_second
+
+            # Sleep outside of the lock, so other threads can refill/ check in the meantime:
+            time.sleep(wait_time)
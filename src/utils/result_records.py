@@ -0,0 +1,115 @@
+import numpy as np
+import pandas as pd
+
+class ResultRecord:
+    """Compact, typed result of a single valuation step (slotted, i.e. no per-instance dictionary). Fields not passed
+    to the constructor are NaN (or their value in 'DEFAULTS'). Records of many tickers are collected via
+    'ResultTable'."""
+    __slots__ = ()
+    DEFAULTS = {'nan_reason': None}
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.__slots__):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self.__slots__)} values.")
+        for field, value in zip(self.__slots__, args):
+            setattr(self, field, value)
+        for field, value in kwargs.items():
+            if field not in self.__slots__:
+                raise TypeError(f"{type(self).__name__} has no field '{field}'.")
+            setattr(self, field, value)
+        for field in self.__slots__:
+            if not hasattr(self, field):
+                setattr(self, field, self.DEFAULTS.get(field, np.nan))
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        # NaN fields are equal to each other:
+        return all(a == b or (isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b))
+                   for a, b in zip(self.to_dict().values(), other.to_dict().values()))
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__,
+                               ', '.join(f'{field}={getattr(self, field)!r}' for field in self.__slots__))
+
+
+class IntrinsicValueAssessment(ResultRecord):
+    """Latest price vs. intrinsic value after margin of safety (see 'Evaluator.assess_intrinsic_value')."""
+    __slots__ = ('latest_price', 'intrinsic_value', 'margin_of_safety_pct', 'intrinsic_value_after_mos', 'difference',
+                 'undervalued', 'nan_reason')
+
+
+class HrlrScore(ResultRecord):
+    """HRLR score and its decision parameters (see 'Evaluator.get_hrlr_score'). 'criteria' is a bitmask (bit 0:
+    1-Year Beta, bit 1: Momentum, bit 2: 1-Year Dividend Yield)."""
+    __slots__ = ('beta_one_year', 'momentum', 'dividend_yield', 'score', 'criteria', 'nan_reason')
+
+
+class PiotroskiScore(ResultRecord):
+    """Piotroski F-Score (see 'Evaluator.get_piotroski_f_score'). 'criteria' is a bitmask (bit i =
+    'Evaluator.PIOTROSKI_CRITERIA'[i])."""
+    __slots__ = ('score', 'criteria', 'nan_reason')
+
+
+class GrowthRateChoice(ResultRecord):
+    """Optimal growth rate and its source (see 'GrowthRateCalculator.determine_optimal_growth_rate')."""
+    __slots__ = ('growth_rate', 'source', 'nan_reason')
+    DEFAULTS = {'source': None, 'nan_reason': None}
+
+
+class DiscountRate(ResultRecord):
+    """Discount rate (WACC) and its components (see 'DiscountRateEstimator.estimate_discount_rate')."""
+    __slots__ = ('discount_rate', 'debt_cost_after_tax', 'equity_cost', 'equity_ratio', 'nan_reason')
+
+
+class ResultTable:
+    """Columnar collection of result records (one list per column instead of one object/ dictionary per row), e.g.
+    one row per ticker of a run. Rows may combine several records and labels like the ticker:
+
+        table.append(ticker='INTC', hrlr=hrlr_record, f_score=piotroski_record)
+
+    Fields of a record are stored as columns '<name>_<field>' (e.g. 'hrlr_score'); the table is converted to a
+    dataframe only once at the end of a run ('to_dataframe')."""
+
+    def __init__(self):
+        self._columns = {}
+        self.number_of_rows = 0
+
+    def __len__(self):
+        return self.number_of_rows
+
+    def append(self, **values):
+        """Function to append one row of labels (scalars) and records (see 'ResultRecord'). Columns missing in this
+        row (or in earlier rows) are filled with NaN."""
+        row = {}
+        for name, value in values.items():
+            if isinstance(value, ResultRecord):
+                for field in value.__slots__:
+                    row[f'{name}_{field}'] = getattr(value, field)
+            else:
+                row[name] = value
+
+        for column, value in row.items():
+            if column not in self._columns:
+                self._columns[column] = [np.nan] * self.number_of_rows
+            self._columns[column].append(value)
+        for column, column_values in self._columns.items():
+            if column not in row:
+                column_values.append(np.nan)
+        self.number_of_rows += 1
+
+    def column(self, name):
+        """Function to get a column as array (float64 for numeric columns)."""
+        values = self._columns[name]
+        try:
+            return np.asarray(values, dtype='float64')
+        except (TypeError, ValueError):
+            return np.asarray(values, dtype='object')
+
+    def to_dataframe(self, index=None):
+        """Function to convert the table to a dataframe (optionally indexed by the column 'index')."""
+        dataframe = pd.DataFrame(self._columns)
+        return dataframe if index is None else dataframe.set_index(index)
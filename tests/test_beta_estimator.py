@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.beta.beta_estimator import BetaEstimator
+from src.utils.assessment_period import AssessmentPeriod
+from src.utils.data_frequency import DataFrequency
+
+
+def create_prices(number_of_observations=800, number_of_stocks=3, seed=0):
+    rng = np.random.default_rng(seed)
+    benchmark_returns = rng.normal(0.0003, 0.01, number_of_observations)
+    stock_returns = 0.8 * benchmark_returns[:, np.newaxis] + rng.normal(0.0, 0.01, (number_of_observations,
+                                                                                    number_of_stocks))
+    dates = pd.bdate_range(end='2024-12-31', periods=number_of_observations)
+    benchmark_prices = pd.DataFrame({'Adj Close': 100 * np.exp(np.cumsum(benchmark_returns))}, index=dates)
+    stock_prices = pd.DataFrame(50 * np.exp(np.cumsum(stock_returns, axis=0)), index=dates,
+                                columns=['S{}'.format(number) for number in range(number_of_stocks)])
+    return stock_prices, benchmark_prices
+
+
+def test_rolling_betas_match_estimate_beta_for_last_window():
+    stock_prices, benchmark_prices = create_prices()
+    rolling_betas = BetaEstimator.estimate_rolling_betas(stock_prices, benchmark_prices, DataFrequency.DAILY,
+                                                         [AssessmentPeriod.ONE_YEAR])[AssessmentPeriod.ONE_YEAR]
+
+    for ticker in stock_prices.columns:
+        beta = BetaEstimator.estimate_beta(stock_prices[[ticker]].rename(columns={ticker: 'Adj Close'}),
+                                           benchmark_prices, AssessmentPeriod.ONE_YEAR, DataFrequency.DAILY)
+        assert rolling_betas[ticker].iloc[-1] == pytest.approx(beta, rel=1e-9)
+
+
+def test_rolling_betas_with_leading_nans():
+    stock_prices, benchmark_prices = create_prices()
+    # Late IPO: no prices for the first 50 observations:
+    stock_prices.iloc[:50, 0] = np.nan
+    rolling_betas = BetaEstimator.estimate_rolling_betas(stock_prices, benchmark_prices, DataFrequency.DAILY,
+                                                         [AssessmentPeriod.ONE_YEAR])[AssessmentPeriod.ONE_YEAR]
+
+    data_points_required = BetaEstimator.determine_required_datapoints(AssessmentPeriod.ONE_YEAR,
+                                                                       DataFrequency.DAILY)
+    late_ipo_betas = rolling_betas['S0']
+    # Only windows without missing prices have a beta:
+    assert late_ipo_betas.notna().sum() == len(stock_prices) - 50 - data_points_required + 1
+    assert late_ipo_betas.iloc[:50 + data_points_required - 1].isna().all()
+
+    beta = BetaEstimator.estimate_beta(stock_prices[['S0']].rename(columns={'S0': 'Adj Close'}), benchmark_prices,
+                                       AssessmentPeriod.ONE_YEAR, DataFrequency.DAILY)
+    betas = BetaEstimator.estimate_betas(stock_prices, benchmark_prices['Adj Close'], AssessmentPeriod.ONE_YEAR,
+                                         DataFrequency.DAILY)
+    assert late_ipo_betas.iloc[-1] == pytest.approx(beta, rel=1e-9)
+    assert late_ipo_betas.iloc[-1] == pytest.approx(betas['S0'], rel=1e-9)
+    # The other stocks are unaffected:
+    assert rolling_betas['S1'].notna().sum() == len(stock_prices) - data_points_required + 1
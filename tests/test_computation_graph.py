@@ -0,0 +1,42 @@
+import pytest
+
+from src.utils.computation_graph import ComputationGraph
+
+
+def test_nodes_are_recomputed_only_if_inputs_change():
+    graph = ComputationGraph()
+    graph.set_input('a', 1)
+    graph.set_input('b', 2)
+    graph.add_node('total', lambda a, b: a + b, ['a', 'b'])
+    graph.add_node('double', lambda total: 2 * total, ['total'])
+
+    assert graph.get('double') == 6
+    graph.set_input('b', 2)
+    assert graph.get('double') == 6
+    assert graph.computation_counts == {'total': 1, 'double': 1}
+
+    graph.set_input('a', 3)
+    assert graph.get('double') == 10
+    assert graph.computation_counts == {'total': 2, 'double': 2}
+
+
+def test_cycle_raises_value_error_naming_the_cycle():
+    graph = ComputationGraph()
+    graph.set_input('a', 1)
+    graph.add_node('x', lambda a, z: a + z, ['a', 'z'])
+    graph.add_node('y', lambda x: x, ['x'])
+    graph.add_node('z', lambda y: y, ['y'])
+    graph.add_node('result', lambda x: x, ['x'])
+
+    with pytest.raises(ValueError, match='x -> z -> y -> x'):
+        graph.get('result')
+    with pytest.raises(ValueError, match='y -> x -> z -> y'):
+        graph.get('y')
+
+
+def test_self_reference_is_a_cycle():
+    graph = ComputationGraph()
+    graph.add_node('x', lambda x: x, ['x'])
+
+    with pytest.raises(ValueError, match='x -> x'):
+        graph.get('x')
@@ -0,0 +1,39 @@
+import datetime
+import os
+
+import pandas as pd
+import pytest
+
+from src.database.damodaran_store import DamodaranStore
+
+
+def create_tables():
+    spreads = pd.DataFrame({'greater_than': [-100000.0, 2.0], 'lower_equal_than': [2.0, 100000.0],
+                            'rating': ['B', 'A'], 'spread': [0.05, 0.02]})
+    return spreads, spreads.copy(), pd.DataFrame({'region': ['North America'], 'ERP': [0.05]})
+
+
+@pytest.fixture
+def store(tmp_path):
+    DamodaranStore.clear_memo()
+    yield DamodaranStore(str(tmp_path))
+    DamodaranStore.clear_memo()
+
+
+def test_save_snapshot_rejects_non_iso_vintages(store):
+    with pytest.raises(ValueError, match='jan-excel'):
+        store.save_snapshot(*create_tables(), vintage='jan-excel')
+    assert store.vintages() == []
+
+
+def test_get_tables_ignores_non_iso_directories(store):
+    vintage = (datetime.date.today() - datetime.timedelta(days=3)).isoformat()
+    store.save_snapshot(*create_tables(), vintage=vintage)
+    # Directory of an older version of the store (sorts after the ISO dates):
+    os.makedirs(os.path.join(store.store_directory, 'jan-excel'))
+    for table, table_name in zip(create_tables(), DamodaranStore.TABLE_NAMES):
+        table.to_pickle(os.path.join(store.store_directory, 'jan-excel', table_name + '.pkl'))
+
+    assert store.vintages() == [vintage]
+    assert store.get_tables(max_age_days=30)[0].equals(create_tables()[0])
+    assert store.get_tables()[2].equals(create_tables()[2])
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.intrinsic_value.credit_spread_index import CreditSpreadIndex
+from src.intrinsic_value.discount_rate_estimator import DiscountRateEstimator
+from src.utils.company_type import CompanyType
+
+# Layout of Damodaran's spread table for non-financial companies (see 'DamodaranScraper.modify_damodaran_data'):
+BOUNDS = [-100000, 0.2, 0.65, 0.8, 1.25, 1.5, 1.75, 2, 2.25, 2.5, 3, 4.25, 5.5, 6.5, 8.5, 100000]
+SPREADS = pd.DataFrame({'greater_than': BOUNDS[:-1], 'lower_equal_than': BOUNDS[1:],
+                        'rating': ['D2/D', 'C2/C', 'Ca2/CC', 'Caa/CCC', 'B3/B-', 'B2/B', 'B1/B+', 'Ba2/BB',
+                                   'Ba1/BB+', 'Baa2/BBB', 'A3/A-', 'A2/A', 'A1/A+', 'Aa2/AA', 'Aaa/AAA'],
+                        'spread': [0.1900, 0.1545, 0.1170, 0.0900, 0.0570, 0.0470, 0.0380, 0.0300, 0.0260, 0.0200,
+                                   0.0162, 0.0142, 0.0123, 0.0092, 0.0070]})
+
+
+def lookup_spread_baseline(spreads, interest_coverage_ratio):
+    """Row loop of the original 'estimate_debt_cost_after_tax' (before the interval index)."""
+    spread = np.nan
+    for row in range(len(spreads)):
+        upper_bound = spreads.iloc[row, 1]
+        lower_bound = spreads.iloc[row, 0]
+        if (interest_coverage_ratio > lower_bound) and (interest_coverage_ratio <= upper_bound):
+            spread = spreads.iloc[row, 3]
+    return spread
+
+
+def test_credit_spread_index_matches_baseline_loop():
+    rng = np.random.default_rng(0)
+    # Random ratios, all bracket bounds and values right next to them:
+    ratios = np.concatenate([rng.uniform(-5, 15, 500), BOUNDS[1:-1], np.nextafter(BOUNDS[1:-1], np.inf),
+                             np.nextafter(BOUNDS[1:-1], -np.inf)])
+    # Unsorted table (the index sorts its brackets):
+    shuffled_spreads = SPREADS.sample(frac=1, random_state=0)
+
+    expected = np.array([lookup_spread_baseline(SPREADS, ratio) for ratio in ratios])
+    np.testing.assert_array_equal(CreditSpreadIndex(shuffled_spreads).lookup(ratios), expected)
+
+    for ratio, spread in zip(ratios, expected):
+        debt_cost = DiscountRateEstimator.estimate_debt_cost_after_tax(CompanyType.NON_FINANCIAL, SPREADS, SPREADS,
+                                                                       21.0, ratio, 0.03)
+        assert debt_cost == pytest.approx((0.03 + spread) * (1 - 0.21))
+
+
+def test_credit_spread_index_without_matching_bracket():
+    index = CreditSpreadIndex(SPREADS)
+    assert np.isnan(index.lookup([np.nan, -200000.0, 200000.0])).all()
+    assert list(index.lookup_ratings([np.nan, 10.0])) == [None, 'Aaa/AAA']
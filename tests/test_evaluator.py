@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('matplotlib')
+
+from src.evaluation.evaluator import Evaluator
+from src.evaluation.scoring_rules import ScoringRule, ScoringRuleSet
+from src.utils.calculation_utils import CalculationUtils
+from src.utils.fundamentals_panel import FundamentalsPanel
+
+
+def test_assess_intrinsic_value_without_intrinsic_value_is_undecided():
+    stock_prices = pd.DataFrame({'Adj Close': [10.0, 11.0, 12.0]})
+    assessment = Evaluator.assess_intrinsic_value(stock_prices, np.nan, 0.2, quiet=True)
+
+    assert assessment.undervalued is None
+    assert assessment.nan_reason == 'intrinsic value NaN'
+
+
+def test_assess_intrinsic_value_after_margin_of_safety():
+    stock_prices = pd.DataFrame({'Adj Close': [10.0, 11.0, 12.0]})
+    assessment = Evaluator.assess_intrinsic_value(stock_prices, 20.0, 0.2, quiet=True)
+
+    assert assessment.intrinsic_value_after_mos == pytest.approx(16.0)
+    assert assessment.difference == pytest.approx(4.0)
+    assert assessment.undervalued is True
+    assert assessment.nan_reason is None
+
+
+def assess_metrics_baseline(dataset):
+    """Hard-coded thresholds of the original 'assess_metrics' (before the scoring rules)."""
+    median_growth_rates = CalculationUtils.calculate_median_growth_rates(dataset)
+    median_values = CalculationUtils.calculate_median_values(dataset)
+
+    growth_rate_points = median_growth_rates.apply(lambda row: np.sum(row > 0), axis=1)
+    thresholds = [('payout_ratio', np.less, 80), ('interest_coverage_ratio', np.greater, 1.5),
+                  ('operating_margin_pct', np.greater, 10), ('net_margin_pct', np.greater, 10),
+                  ('gross_margin_pct', np.greater, 10), ('return_on_equity_pct', np.greater, 8),
+                  ('return_on_assets_pct', np.greater, 8), ('return_on_invested_capital_pct', np.greater, 8),
+                  ('free_cash_flow_to_revenue', np.greater, 5), ('current_ratio', np.greater, 1),
+                  ('debt_to_equity_ratio', np.less, 1)]
+    median_value_points = [np.sum(compare(median_values.loc[metric, :], threshold))
+                           for metric, compare, threshold in thresholds]
+    return list(growth_rate_points), median_value_points
+
+
+def create_dataset(rng, metrics, number_of_years=10, nan_share=0.15):
+    values = rng.uniform(-20, 150, (number_of_years, len(metrics)))
+    values[rng.random(values.shape) < nan_share] = np.nan
+    return pd.DataFrame(values, index=[str(year) for year in range(2014, 2014 + number_of_years)], columns=metrics)
+
+
+def test_assess_metrics_matches_baseline_thresholds():
+    rng = np.random.default_rng(0)
+    metrics = CalculationUtils.GROWTH_RATE_METRICS + CalculationUtils.MEDIAN_VALUE_METRICS
+
+    for _ in range(50):
+        dataset = create_dataset(rng, metrics)
+        median_growth_rates, median_values = Evaluator.assess_metrics(dataset)
+        growth_rate_points, median_value_points = assess_metrics_baseline(dataset)
+
+        assert list(median_growth_rates['points']) == growth_rate_points
+        assert list(median_values['points']) == median_value_points
+
+
+def test_assess_metrics_names_missing_metric():
+    rng = np.random.default_rng(1)
+    metrics = CalculationUtils.GROWTH_RATE_METRICS + CalculationUtils.MEDIAN_VALUE_METRICS
+    dataset = create_dataset(rng, metrics)
+    rules = ScoringRuleSet([ScoringRule('price_to_book_ratio', '<', 1)])
+
+    with pytest.raises(KeyError, match='price_to_book_ratio'):
+        Evaluator.assess_metrics(dataset, median_value_rules=rules)
+
+
+def create_price_data(rng, number_of_days):
+    prices = 50.0 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, number_of_days)))
+    return pd.DataFrame({'Adj Close': prices}, index=pd.bdate_range(end='2024-12-31', periods=number_of_days))
+
+
+def test_hrlr_record_names_nan_parameters():
+    rng = np.random.default_rng(0)
+    stock_prices = create_price_data(rng, 300)
+
+    # Too short benchmark history (beta NaN) and no dividends:
+    record = Evaluator.get_hrlr_score(stock_prices, create_price_data(rng, 100), np.nan, quiet=True, as_record=True)
+    assert np.isnan(record.beta_one_year) and np.isnan(record.dividend_yield)
+    assert record.nan_reason == 'beta NaN, dividend yield NaN'
+
+    record = Evaluator.get_hrlr_score(stock_prices, create_price_data(rng, 300), 1.0, quiet=True, as_record=True)
+    assert record.nan_reason is None
+
+
+def create_piotroski_dataset(rng):
+    metrics = ['net_income_mil', 'operating_cash_flow_mil', 'return_on_assets_pct', 'debt_to_equity_ratio',
+               'current_ratio', 'shares_mil', 'gross_margin_pct', 'asset_turnover']
+    return pd.DataFrame(rng.uniform(-5, 100, (3, len(metrics))), index=['2021', '2022', '2023'], columns=metrics)
+
+
+def test_piotroski_record_names_nan_inputs():
+    dataset = create_piotroski_dataset(np.random.default_rng(0))
+    assert Evaluator.get_piotroski_f_score(dataset, quiet=True, as_record=True).nan_reason is None
+
+    dataset.loc['2022', 'current_ratio'] = np.nan
+    dataset.loc['2023', 'net_income_mil'] = np.nan
+    record = Evaluator.get_piotroski_f_score(dataset, quiet=True, as_record=True)
+    assert record.nan_reason == 'net_income_mil NaN, current_ratio NaN'
+    # Same score as the dataframe result:
+    points = Evaluator.get_piotroski_f_score(dataset, quiet=True)['Points']
+    assert record.score == points['F-Score']
+
+
+def test_quiet_hrlr_score_prints_nothing(capsys):
+    rng = np.random.default_rng(1)
+    Evaluator.get_hrlr_score(create_price_data(rng, 300), create_price_data(rng, 100), 1.0, quiet=True)
+
+    assert capsys.readouterr().out == ''
+
+
+def test_piotroski_f_scores_match_scalar_f_score():
+    rng = np.random.default_rng(2)
+    metrics = ['net_income_mil', 'operating_cash_flow_mil', 'return_on_assets_pct', 'debt_to_equity_ratio',
+               'current_ratio', 'shares_mil', 'gross_margin_pct', 'asset_turnover']
+    # Coarse values, so rounded year-over-year comparisons tie often; some NaN:
+    values = np.round(rng.uniform(-2, 4, (40, len(metrics), 5)), 2)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    panel = FundamentalsPanel(values, ['T{}'.format(i) for i in range(40)], metrics, range(2019, 2024))
+
+    scores, bitmasks = Evaluator.get_piotroski_f_scores(panel)
+    all_scores, all_bitmasks = Evaluator.get_piotroski_f_scores(panel, all_years=True)
+    criteria = Evaluator.decode_piotroski_bitmasks(all_bitmasks)
+    assert all_scores.shape == all_bitmasks.shape == (40, 4)
+    np.testing.assert_array_equal(scores, all_scores[:, -1])
+    np.testing.assert_array_equal(bitmasks, all_bitmasks[:, -1])
+
+    for ticker_position, ticker in enumerate(panel.tickers):
+        dataset = panel.dataset(ticker, transpose=True)
+        for year_position in range(1, len(panel.years)):
+            record = Evaluator.get_piotroski_f_score(dataset.iloc[:year_position + 1], quiet=True, as_record=True)
+            points = Evaluator.get_piotroski_f_score(dataset.iloc[:year_position + 1], quiet=True)['Points']
+
+            assert all_scores[ticker_position, year_position - 1] == record.score
+            assert all_bitmasks[ticker_position, year_position - 1] == record.criteria
+            # Bit i is the criterion 'PIOTROSKI_CRITERIA'[i]:
+            assert list(criteria[ticker_position, year_position - 1]) == \
+                   [points[criterion] == 1 for criterion in Evaluator.PIOTROSKI_CRITERIA]
+
+
+def test_hrlr_scores_match_scalar_hrlr_score():
+    rng = np.random.default_rng(3)
+    benchmark_prices = create_price_data(rng, 400)
+    stock_prices = pd.concat([create_price_data(rng, 400)['Adj Close'].rename(f'S{i}') for i in range(12)], axis=1)
+    latest_dividends = pd.Series(rng.uniform(0.0, 4.0, 12), index=stock_prices.columns)
+
+    scores = Evaluator.get_hrlr_scores(stock_prices, benchmark_prices, latest_dividends[::-1])
+    assert list(scores.index) == list(stock_prices.columns)
+
+    for ticker in stock_prices.columns:
+        record = Evaluator.get_hrlr_score(stock_prices[[ticker]].rename(columns={ticker: 'Adj Close'}),
+                                          benchmark_prices, latest_dividends[ticker], quiet=True, as_record=True)
+        assert scores.loc[ticker, 'beta_one_year'] == pytest.approx(record.beta_one_year, rel=1e-9)
+        assert scores.loc[ticker, 'momentum'] == pytest.approx(record.momentum)
+        assert scores.loc[ticker, 'dividend_yield'] == pytest.approx(record.dividend_yield)
+        assert scores.loc[ticker, 'score'] == record.score
+
+
+def test_hrlr_dividend_yield_threshold_is_three_percent():
+    rng = np.random.default_rng(4)
+    benchmark_prices = create_price_data(rng, 300)
+    stock_prices = create_price_data(rng, 300)
+    latest_price = stock_prices['Adj Close'].iloc[-1]
+
+    # Dividend yields as fractions: 3% and above earn the point, below does not:
+    for dividend_yield, dividend_point in [(0.03, 1), (0.05, 1), (0.0299, 0), (0.0, 0)]:
+        latest_dividends = dividend_yield * latest_price
+        record = Evaluator.get_hrlr_score(stock_prices, benchmark_prices, latest_dividends, quiet=True,
+                                          as_record=True)
+        scores = Evaluator.get_hrlr_scores(stock_prices.rename(columns={'Adj Close': 'S0'}), benchmark_prices,
+                                           [latest_dividends])
+        assert (record.criteria >> 2) & 1 == dividend_point
+        assert scores.loc['S0', 'score'] == record.score
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.intrinsic_value.intrinsic_value_estimator import IntrinsicValueEstimator
+
+
+def apply_discounted_cash_flow_model_baseline(metric_series, current_shares, growth_rate, discount_rates,
+                                              terminal_growth_rate, prediction_years):
+    """Loop of the original 'apply_discounted_cash_flow_model' (intrinsic value per share and discount rate)."""
+    intrinsic_values = []
+    for discount_rate in discount_rates:
+        predicted_values = [np.nanmedian(metric_series)]
+        discounted_values = []
+        for year in range(1, prediction_years + 1):
+            predicted_values.append(predicted_values[-1] * (1 + growth_rate))
+            discounted_values.append(predicted_values[-1] / (1 + discount_rate) ** year)
+        terminal_value = IntrinsicValueEstimator.calculate_terminal_value(predicted_values[0], discount_rate,
+                                                                          growth_rate, terminal_growth_rate,
+                                                                          prediction_years)
+        intrinsic_values.append((np.sum(discounted_values[1:]) + terminal_value) / current_shares)
+    return intrinsic_values
+
+
+@pytest.mark.parametrize('number_of_discount_rates', [1, 3, 21])
+def test_discounted_cash_flow_model_matches_baseline_and_grid(number_of_discount_rates):
+    rng = np.random.default_rng(number_of_discount_rates)
+    discount_rates = list(np.round(np.linspace(0.06, 0.14, number_of_discount_rates), 4))
+
+    for prediction_years in [1, 5, 10]:
+        values = rng.uniform(50, 500, 10)
+        values[rng.random(10) < 0.2] = np.nan
+        metric_series = pd.Series(values, index=[str(year) for year in range(2014, 2024)])
+        growth_rate = rng.uniform(-0.05, 0.2)
+
+        result = IntrinsicValueEstimator.apply_discounted_cash_flow_model(metric_series, 120.0, growth_rate,
+                                                                          discount_rates, 0.02, prediction_years)
+        expected = apply_discounted_cash_flow_model_baseline(metric_series, 120.0, growth_rate, discount_rates, 0.02,
+                                                             prediction_years)
+        grid = IntrinsicValueEstimator.apply_discounted_cash_flow_model_grid(
+            metric_series.to_numpy(), 120.0, [growth_rate], discount_rates, [0.02], [prediction_years])
+
+        assert list(result.index) == [str(round(rate * 100, 1)) + ' %' for rate in discount_rates]
+        np.testing.assert_allclose(result['IV_DCF'].to_numpy(), expected, rtol=1e-12)
+        np.testing.assert_allclose(grid.values[0, :, 0, 0, 0], expected, rtol=1e-12)
+
+
+def test_discounted_cash_flow_model_with_nan_median():
+    metric_series = pd.Series([np.nan] * 5, index=[str(year) for year in range(2019, 2024)])
+    with pytest.warns(RuntimeWarning):
+        assert np.isnan(IntrinsicValueEstimator.apply_discounted_cash_flow_model(metric_series, 10.0, 0.05, [0.09],
+                                                                                 0.02, 10))
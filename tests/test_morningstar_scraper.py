@@ -0,0 +1,77 @@
+import pytest
+
+from src.database import morningstar_scraper
+from src.database.morningstar_scraper import MorningstarScraper
+from src.database.response_cache import ResponseCache
+from src.utils.data_category import DataCategory
+
+
+class CountingRateLimiter:
+    def __init__(self):
+        self.acquisitions = 0
+
+    def acquire(self):
+        self.acquisitions += 1
+
+
+@pytest.fixture
+def requests_sent(monkeypatch):
+    """Replaces the Morningstar session; every request is recorded and answered with a small payload."""
+    sent = []
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {'dataList': []}
+
+    class Session:
+        headers = {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *arguments):
+            pass
+
+        def get(self, url, params=None):
+            sent.append(url)
+            return Response()
+
+    monkeypatch.setattr(morningstar_scraper.requests, 'Session', Session)
+    return sent
+
+
+def test_rate_limiter_is_acquired_only_for_requests(tmp_path, requests_sent):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('0P000002X8', DataCategory.GROWTH, MorningstarScraper.PAYLOAD_VERSION, {'dataList': [1]})
+    rate_limiter = CountingRateLimiter()
+
+    data = MorningstarScraper.scrape_morningstar_data_batch(['0P000002X8', '0P000003X9'], rate_limiter=rate_limiter,
+                                                             cache=cache)
+
+    # One cached payload, all other payloads are requested (one token each):
+    assert data['0P000002X8'][0] == {'dataList': [1]}
+    assert len(requests_sent) == 2 * len(DataCategory) - 1
+    assert rate_limiter.acquisitions == len(requests_sent)
+
+
+def test_entry_expiring_during_scrape_does_not_bypass_rate_limiter(tmp_path, requests_sent, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    for category in DataCategory:
+        cache.put('0P000002X8', category, MorningstarScraper.PAYLOAD_VERSION, {'dataList': [1]})
+    # Every entry is valid at the first check and expired at every later one:
+    checked_paths = set()
+
+    def is_expired(path, stat=None):
+        expired = path in checked_paths
+        checked_paths.add(path)
+        return expired
+
+    monkeypatch.setattr(cache, '_is_expired', is_expired)
+    rate_limiter = CountingRateLimiter()
+
+    MorningstarScraper.scrape_morningstar_data_batch(['0P000002X8'], rate_limiter=rate_limiter, cache=cache)
+
+    assert rate_limiter.acquisitions == len(requests_sent)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('yfinance')
+pytest.importorskip('matplotlib')
+
+from src.database.synthetic_data_generator import SyntheticDataGenerator
+from src.pipeline.pipeline_stages import PipelineStages
+from src.utils.company_region import CompanyRegion
+from src.utils.company_type import CompanyType
+
+# Trading days of a real '10y' Yahoo Finance history:
+TEN_YEAR_TRADING_DAYS = 2515
+
+
+def create_damodaran_tables():
+    spreads = pd.DataFrame({'greater_than': [-100000.0, 2.0, 5.0], 'lower_equal_than': [2.0, 5.0, 100000.0],
+                            'rating': ['B', 'A', 'AA'], 'spread': [0.05, 0.02, 0.01]})
+    risk_premiums = pd.DataFrame({'region': [region.value for region in CompanyRegion],
+                                  'ERP': [0.05] * len(CompanyRegion)})
+    return spreads, spreads, risk_premiums
+
+
+def test_default_settings_value_ten_year_price_history():
+    rng = np.random.default_rng(0)
+    payloads = SyntheticDataGenerator.generate_morningstar_payloads(rng)
+    stock_prices = SyntheticDataGenerator.generate_price_data(rng, TEN_YEAR_TRADING_DAYS)
+    benchmark_prices = SyntheticDataGenerator.generate_price_data(rng, TEN_YEAR_TRADING_DAYS)
+    # Holidays of the benchmark's exchange (dropped by the alignment):
+    benchmark_prices = benchmark_prices.drop(benchmark_prices.index[::250])
+
+    task = {'ticker': 'T0000', 'exchange': 'XSYN', 'company_type': CompanyType.NON_FINANCIAL,
+            'company_region': CompanyRegion.NORTH_AMERICA}
+    result = PipelineStages.value_company(task, '0PSYN00000', payloads, stock_prices, benchmark_prices,
+                                          create_damodaran_tables())
+
+    assert np.isfinite(result['beta'])
+    assert result['discount_rate_nan_reason'] != 'beta NaN'
+
+
+
+def test_undervalued_is_undecided_without_intrinsic_value():
+    rng = np.random.default_rng(1)
+    task = {'ticker': 'T0001', 'exchange': 'XSYN', 'company_type': CompanyType.NON_FINANCIAL,
+            'company_region': CompanyRegion.NORTH_AMERICA}
+    # No equity risk premiums, hence no discount rate & intrinsic value:
+    spreads_nonfinancials, spreads_financials, _ = create_damodaran_tables()
+    risk_premiums = pd.DataFrame({'region': pd.Series([], dtype='object'), 'ERP': pd.Series([], dtype='float64')})
+    result = PipelineStages.value_company(task, '0PSYN00001', SyntheticDataGenerator.generate_morningstar_payloads(rng),
+                                          SyntheticDataGenerator.generate_price_data(rng, TEN_YEAR_TRADING_DAYS),
+                                          SyntheticDataGenerator.generate_price_data(rng, TEN_YEAR_TRADING_DAYS),
+                                          (spreads_nonfinancials, spreads_financials, risk_premiums))
+
+    assert np.isnan(result['intrinsic_value_dcf'])
+    assert result['undervalued'] is None
@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('yfinance')
+
+from src.database.price_store import PriceStore
+from src.database.yahoo_finance_scraper import YahooFinanceScraper
+
+
+def create_prices(values, end='2024-12-31'):
+    return pd.DataFrame({'Adj Close': np.asarray(values, dtype='float64')},
+                        index=pd.bdate_range(end=end, periods=len(values), name='Date'))
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Replaces the Yahoo Finance download by a settable 'remote' history ('since' is inclusive)."""
+    remote = {}
+
+    def scrape_price_data(ticker, period, interval):
+        return remote[ticker].copy()
+
+    def scrape_price_data_since(ticker, start, interval):
+        prices = remote[ticker]
+        return prices[prices.index >= pd.Timestamp(start)].copy()
+
+    monkeypatch.setattr(YahooFinanceScraper, 'scrape_price_data', staticmethod(scrape_price_data))
+    monkeypatch.setattr(YahooFinanceScraper, 'scrape_price_data_since', staticmethod(scrape_price_data_since))
+    return remote
+
+
+def test_update_replaces_partial_last_bar(tmp_path, downloads):
+    store = PriceStore(str(tmp_path))
+    downloads['ABC'] = create_prices([10.0, 11.0, 12.0], end='2024-12-30')
+    assert store.update('ABC') == 3
+
+    # The last bar was fetched intraday; the final close differs, one new bar follows:
+    downloads['ABC'] = create_prices([10.0, 11.0, 12.5, 13.0])
+    assert store.update('ABC') == 1
+    np.testing.assert_array_equal(store.get_price_data('ABC')['Adj Close'].to_numpy(), [10.0, 11.0, 12.5, 13.0])
+
+
+def test_update_rewrites_readjusted_history(tmp_path, downloads):
+    store = PriceStore(str(tmp_path))
+    downloads['ABC'] = create_prices([10.0, 11.0, 12.0, 13.0], end='2024-12-30')
+    store.update('ABC')
+
+    # Dividend: Yahoo Finance re-adjusts the whole history:
+    readjusted = [9.5, 10.45, 11.4, 12.35, 13.0]
+    downloads['ABC'] = create_prices(readjusted)
+    assert store.update('ABC') == 1
+
+    stored_prices = store.get_price_data('ABC')
+    np.testing.assert_allclose(stored_prices['Adj Close'].to_numpy(), readjusted)
+    assert list(stored_prices.index) == list(downloads['ABC'].index)
+
+
+class CountingRateLimiter:
+    def __init__(self):
+        self.acquisitions = 0
+
+    def acquire(self):
+        self.acquisitions += 1
+
+
+def test_every_download_acquires_the_rate_limiter(tmp_path, downloads):
+    store = PriceStore(str(tmp_path))
+    rate_limiter = CountingRateLimiter()
+    downloads['ABC'] = create_prices([10.0, 11.0, 12.0, 13.0], end='2024-12-30')
+    store.update('ABC', rate_limiter=rate_limiter)
+    assert rate_limiter.acquisitions == 1
+
+    # Re-adjusted history: overlap download & complete download:
+    downloads['ABC'] = create_prices([9.5, 10.45, 11.4, 12.35, 13.0])
+    store.update('ABC', rate_limiter=rate_limiter)
+    assert rate_limiter.acquisitions == 3
+
+
+def test_write_is_atomic(tmp_path):
+    store = PriceStore(str(tmp_path))
+    store.append('ABC', create_prices([10.0, 11.0]))
+    store.append('ABC', create_prices([10.0, 11.0, 12.0], end='2025-01-01'))
+
+    directory = os.path.join(str(tmp_path), '1d', 'ABC')
+    assert sorted(os.listdir(directory)) == [PriceStore.VALUES_FILE_NAME, PriceStore.DATES_FILE_NAME]
+    assert len(store.get_price_data('ABC')) == 3
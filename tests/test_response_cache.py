@@ -0,0 +1,59 @@
+import json
+import os
+import time
+
+from src.database.response_cache import ResponseCache
+from src.utils.data_category import DataCategory
+
+
+def test_put_walks_cache_only_when_bound_is_exceeded(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path), max_size_bytes=10 ** 9)
+    scans = []
+    original_scan = cache._scan
+    monkeypatch.setattr(cache, '_scan', lambda: scans.append(1) or original_scan())
+
+    for number in range(200):
+        cache.put('ID{}'.format(number), DataCategory.GROWTH, 1, {'values': list(range(50))})
+
+    # One initial scan for the running size total, no eviction:
+    assert len(scans) == 1
+    assert cache.size() == sum(os.path.getsize(os.path.join(directory, name))
+                               for directory, _, names in os.walk(str(tmp_path)) for name in names)
+
+
+def test_put_keeps_cache_below_bound(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.put('ID0', DataCategory.GROWTH, 1, {'values': list(range(50))})
+    entry_size = cache.size()
+
+    cache = ResponseCache(str(tmp_path), max_size_bytes=entry_size * 10)
+    for number in range(1, 100):
+        cache.put('ID{}'.format(number), DataCategory.GROWTH, 1, {'values': list(range(50))})
+        assert cache.size() <= entry_size * 10
+
+    # The most recently stored entries survive:
+    assert cache.get('ID99', DataCategory.GROWTH, 1) == {'values': list(range(50))}
+
+
+def test_expiry_via_modification_time(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl_seconds=60)
+    cache.put('ID0', DataCategory.GROWTH, 1, {'value': 1})
+    assert cache.get('ID0', DataCategory.GROWTH, 1) == {'value': 1}
+
+    # Reads must not refresh the entry; age it by moving its modification time back:
+    path = cache._path(ResponseCache.make_key('ID0', DataCategory.GROWTH, 1))
+    os.utime(path, (time.time(), time.time() - 120))
+    assert not cache.contains('ID0', DataCategory.GROWTH, 1)
+    assert cache.get('ID0', DataCategory.GROWTH, 1) is None
+    assert ResponseCache(str(tmp_path), ttl_seconds=60, offline=True).get('ID0', DataCategory.GROWTH, 1) == {'value': 1}
+
+    with open(path, 'r', encoding='utf-8') as file:
+        assert json.load(file)['payload'] == {'value': 1}
+
+
+def test_contains_missing_entry_without_ttl(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    assert not cache.contains('ID0', DataCategory.GROWTH, 1)
+
+    cache.put('ID0', DataCategory.GROWTH, 1, {'value': 1})
+    assert cache.contains('ID0', DataCategory.GROWTH, 1)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+pytest.importorskip('yfinance')
+pytest.importorskip('matplotlib')
+
+from src.database.identifier_index import IdentifierIndex
+from src.database.morningstar_scraper import MorningstarScraper
+from src.pipeline.pipeline_stages import PipelineStages
+from src.pipeline.screening_pipeline import ResultWriter, ScreeningPipeline
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    """Replaces all requests: identifiers are derived from the ticker, fetches return no data (rows fail with
+    'no fundamentals')."""
+    monkeypatch.setattr(MorningstarScraper, 'scrape_morningstar_stock_identifier',
+                        staticmethod(lambda stock_ticker, exchange_ticker: '0P{:0>8}'.format(stock_ticker)))
+    monkeypatch.setattr(PipelineStages, 'fetch_fundamentals', staticmethod(lambda *arguments: None))
+    monkeypatch.setattr(PipelineStages, 'fetch_prices', staticmethod(lambda *arguments: None))
+
+
+def create_tasks(number_of_tasks):
+    return [PipelineStages.parse_ticker('XSYN:T{:04d}'.format(number)) for number in range(number_of_tasks)]
+
+
+def test_identifier_index_is_saved_once_per_run(tmp_path, monkeypatch, offline):
+    index_path = str(tmp_path / 'identifiers.json')
+    identifier_index = IdentifierIndex(index_path)
+    saves = []
+    monkeypatch.setattr(IdentifierIndex, 'save', lambda index: saves.append(len(index)))
+
+    pipeline = ScreeningPipeline(None, None, identifier_index=identifier_index, requests_per_second=1000.0)
+    pipeline.run(create_tasks(20), str(tmp_path / 'results.jsonl'))
+    assert saves == [20]
+
+    # Nothing new to save:
+    pipeline.run(create_tasks(20), str(tmp_path / 'results.jsonl'))
+    assert saves == [20]
+    with open(str(tmp_path / 'results.jsonl'), 'r', encoding='utf-8') as file:
+        assert [json.loads(line)['error'] for line in file] == ['no fundamentals'] * 20
+
+
+def test_writer_error_is_raised_after_all_workers_finished(tmp_path, monkeypatch, offline):
+    def write(writer, row):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(ResultWriter, 'write', write)
+    # More tasks than both bounded queues hold:
+    pipeline = ScreeningPipeline(None, None, requests_per_second=1000.0, queue_size=2)
+    with pytest.raises(OSError, match='disk full'):
+        pipeline.run(create_tasks(20), str(tmp_path / 'results.jsonl'))
+
+
+def test_statistics_are_reset_per_run(tmp_path, offline):
+    pipeline = ScreeningPipeline(None, None, requests_per_second=1000.0)
+    pipeline.run(create_tasks(5), str(tmp_path / 'results.jsonl'))
+    statistics = pipeline.run(create_tasks(3), str(tmp_path / 'results.jsonl'))
+
+    assert (statistics['tickers'], statistics['valued'], statistics['failed']) == (3, 0, 3)